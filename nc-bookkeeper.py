@@ -9,9 +9,11 @@ import argparse
 
 from src import Logger
 from src.config import Settings, TomlPanelConfig, TomlAppConfig
-from src.main_frame import MainFrame
+from src.profiler import StartupProfiler
+from src.instrument import Instrumentation
 
-import wx
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 3
 
 
 class CheckAppConfig(TomlAppConfig):
@@ -31,6 +33,126 @@ class CheckAppConfig(TomlAppConfig):
         return self.is_valid
 
 
+def add_batch_commands(parser):
+    """
+    Add the batch subcommands, these do not use wx so no window is opened.
+    """
+    subparsers = parser.add_subparsers(
+        dest='command', metavar='COMMAND',
+        help="Run a batch command instead of the application.")
+    db_parser = argparse.ArgumentParser(add_help=False)
+    db_parser.add_argument(
+        '--db', action='append', default=None, dest='db', metavar='PATH',
+        help=("A database file to use, repeat for more than one, the "
+              "default is the user's."))
+    db_parser.add_argument(
+        '-j', '--jobs', type=int, default=1, dest='jobs',
+        help="The number of databases to process in parallel.")
+    cmd = subparsers.add_parser(
+        'export', parents=[db_parser],
+        help="Stream the values as CSV or JSON Lines to stdout.")
+    cmd.add_argument(
+        '-y', '--year', type=int, default=None, dest='year',
+        help="Only export this fiscal year, the default is all years.")
+    cmd.add_argument(
+        '-f', '--format', choices=('csv', 'jsonl'), default='csv',
+        dest='format', help="The output format, the default is csv.")
+    cmd.add_argument(
+        '--batch-size', type=int, default=None, dest='batch_size',
+        help="The rows read from the database at a time.")
+    cmd = subparsers.add_parser(
+        'import', parents=[db_parser],
+        help="Read values from an exported file into the current year.")
+    cmd.add_argument('file', help="The CSV or JSON Lines file to import.")
+    cmd = subparsers.add_parser(
+        'load', parents=[db_parser],
+        help=("Bulk load historical values for any fiscal years from a CSV "
+              "spreadsheet."))
+    cmd.add_argument('file', help="The CSV file to load.")
+    cmd.add_argument(
+        '--chunk-size', type=int, default=5000, dest='chunk_size',
+        help="The values inserted at a time, the default is 5000.")
+    subparsers.add_parser(
+        'report', parents=[db_parser],
+        help="Write a summary of each fiscal year.")
+    subparsers.add_parser(
+        'rollover', parents=[db_parser],
+        help="Close the current fiscal year and start the next one.")
+    cmd = subparsers.add_parser(
+        'archive', parents=[db_parser],
+        help=("Move the values of audited fiscal years to read-only "
+              "archive files."))
+    cmd.add_argument(
+        '-y', '--year', type=int, default=None, dest='year',
+        help="Only archive this fiscal year, the default is all audited.")
+    cmd.add_argument(
+        '-r', '--restore', type=int, default=None, dest='restore',
+        help="Move an archived fiscal year back into the database.")
+    cmd = subparsers.add_parser(
+        'backup', parents=[db_parser],
+        help="Take a compressed snapshot of the live database.")
+    cmd.add_argument(
+        '-k', '--keep', type=int, default=None, dest='keep',
+        help="The number of snapshots kept, the default is 7.")
+    cmd.add_argument(
+        '--verify', action='store_true', default=False, dest='verify',
+        help="Check the snapshots instead of taking one.")
+    cmd = subparsers.add_parser(
+        'sync', parents=[db_parser],
+        help="Move the changes between two copies of the books.")
+    cmd.add_argument(
+        'action', choices=('export', 'apply', 'status', 'new-site'),
+        help=("Write the changes to stdout, apply a changeset, show the "
+              "sync state or give a file copy a new site id."))
+    cmd.add_argument('file', nargs='?', default=None,
+                     help="The changeset to apply.")
+    cmd.add_argument(
+        '-p', '--peer', default='default', dest='peer',
+        help="A name for the copy the changes are exported for.")
+    cmd.add_argument(
+        '--since', type=int, default=None, dest='since',
+        help=("Export the changes after this sequence, 0 exports all, the "
+              "default is those not sent to the peer."))
+    cmd = subparsers.add_parser(
+        'digest', parents=[db_parser],
+        help="Show the digests of the values or compare two copies.")
+    cmd.add_argument(
+        '-y', '--year', type=int, default=None, dest='year',
+        help="Show the month digests of this fiscal year.")
+    cmd.add_argument(
+        '-c', '--compare', default=None, dest='compare', metavar='PATH',
+        help=("Another copy or a compressed snapshot to compare with, the "
+              "values that differ are listed."))
+    subparsers.add_parser(
+        'vacuum', parents=[db_parser],
+        help="Compact the database files.")
+    cmd = subparsers.add_parser(
+        'bench', help="Benchmark the database on synthetic data.")
+    cmd.add_argument(
+        '-r', '--repeat', type=int, default=10, dest='repeat',
+        help="The number of times to run each benchmark, default is 10.")
+    cmd.add_argument(
+        '-s', '--sizes', type=int, nargs='+', default=(1, 10, 50),
+        dest='sizes', help="The number of fiscal years in each database.")
+    cmd.add_argument(
+        '-b', '--bench', nargs='+', default=None, dest='bench',
+        help="Only run these benchmarks, default is all of them.")
+    cmd.add_argument(
+        '--seed', type=int, default=0, dest='seed',
+        help="The seed of the synthetic data, default is 0.")
+
+
+def finish_profile(profiler, settings):
+    """
+    Called after the first paint of the main frame to write the profile
+    report to the log directory.
+    """
+    profiler.end_span('first_paint')
+    log_dir = os.path.dirname(settings.user_log_fullpath)
+    path = profiler.write_report(log_dir)
+    print(f"Startup profile written to {path}", file=sys.stderr)
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
         description=("Non-commercial organization bookkeeping application."))
@@ -43,39 +165,84 @@ if __name__ == "__main__":
     parser.add_argument(
         '-F', '--file-dump', action='store_true', default=False,
         dest='file_dump', help=("Dump the generated panel factory files."))
+    parser.add_argument(
+        '-P', '--profile', nargs='?', const='spans', default=None,
+        choices=('spans', 'cprofile'), dest='profile',
+        help=("Profile the startup and write a report to the log directory. "
+              "Use 'cprofile' to also dump cProfile data."))
+    parser.add_argument(
+        '-S', '--statistics', action='store_true', default=False,
+        dest='statistics', help=("Collect database timing statistics, "
+                                 "see Tools->Statistics."))
+    add_batch_commands(parser)
     options = parser.parse_args()
     settings = Settings()
+    profiler = StartupProfiler()
     status = 0
 
+    if options.profile:
+        profiler.enable(cprofile=options.profile == 'cprofile')
+
+    if options.statistics:
+        Instrumentation().enable()
+
     if options.debug:
         print(f"DEBUG--options: {options}", file=sys.stderr)
         settings.debug = True
 
-    if options.run:
+    if options.command:
+        from src.core.batch import BatchCommands
+
+        settings.create_dirs()
+        Logger().config(logger_name=settings.logger_name,
+                        file_path=settings.user_log_fullpath,
+                        max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUPS)
+        status = BatchCommands(options).run()
+    elif options.run:
         settings.create_dirs()
         Logger().config(logger_name=settings.logger_name,
-                        file_path=settings.user_log_fullpath)
+                        file_path=settings.user_log_fullpath, queued=True,
+                        max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUPS)
         tpc = TomlPanelConfig()
         tac = TomlAppConfig()
 
-        if not tpc.is_valid:
+        with profiler.span('toml_panel_validation'):
+            tpc_valid = tpc.is_valid
+
+        if tpc_valid:
+            with profiler.span('toml_app_validation'):
+                tac_valid = tac.is_valid
+
+        if not tpc_valid:
             print(tpc.get_err_msg, file=sys.stderr)
             print(f"See {tpc.user_log_fullpath}, for more information.",
                   file=sys.stderr)
             status = 1
-        elif not tac.is_valid:
+        elif not tac_valid:
             print(tac.get_err_msg, file=sys.stderr)
             print(f"See {tac.user_log_fullpath}, for more information.",
                   file=sys.stderr)
             status = 2
         else:
+            import wx
+            from src.main_frame import MainFrame
+
             # Try to run application.
-            app = wx.App()
-            mf = MainFrame(options=options)
+            with profiler.span('wx_app'):
+                app = wx.App()
+
+            with profiler.span('main_frame'):
+                mf = MainFrame(options=options)
+
             icon_path = os.path.join(settings.base_dir(), 'images',
                                      'bookkeeper-48x48.ico')
             mf.SetIcon(wx.Icon(icon_path))
+            profiler.start_span('first_paint')
             mf.Show(True)
+
+            if profiler.enabled:
+                wx.CallAfter(finish_profile, profiler, settings)
+
             app.MainLoop()
     else:
         parser.print_help()
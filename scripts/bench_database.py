@@ -0,0 +1,276 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Benchmark the database layer on synthetic databases.
+#
+__docformat__ = "restructuredtext en"
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+import statistics
+import subprocess
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from src.config import Settings
+from scripts.synthetic_data import SyntheticData
+
+
+class BenchDatabase:
+    """
+    Time the database methods against synthetic databases of different
+    sizes, in the same way as asv each benchmark is a `time_*` method that
+    is run `repeat` times between an untimed `setup_*` and `teardown_*` if
+    there are any. The databases are kept in memory so the disk does not
+    skew the results. When headless the wx-free core is used and the
+    benchmarks that need the panels are skipped.
+    """
+    SIZES = (1, 10, 50)
+    RESULTS_DIR = os.path.join(BASE_DIR, '.benchmarks')
+    _GUI_BENCHMARKS = ('populate_panels', 'save_to_database')
+
+    def __init__(self, options):
+        self.options = options
+        self.headless = getattr(options, 'headless', False)
+
+        if self.headless:
+            from src.core.bahai_database import Database
+        else:
+            from src.bahai_database import Database
+
+        self.db = Database()
+        self.db.data_backend = Settings.BACKEND_MEMORY
+        self.rng = random.Random(options.seed)
+
+    @property
+    def benchmarks(self) -> list:
+        return sorted(name[5:] for name in dir(self)
+                      if name.startswith('time_') and not (
+                          self.headless and name[5:] in self._GUI_BENCHMARKS))
+
+    def run(self) -> dict:
+        """
+        Run every benchmark on every size.
+
+        :returns: The results as they are written to the JSON file.
+        :rtype: dict
+        """
+        names = [name for name in self.benchmarks
+                 if not self.options.bench or name in self.options.bench]
+        results = {name: {} for name in names}
+
+        for years in self.options.sizes:
+            self.sd = SyntheticData(years, seed=self.options.seed)
+            self.db.data_name = f"bench-{years}"
+            self.sd.build(self.db)
+
+            if not self.headless:
+                self.db._mf = self.sd.make_frame()
+
+            for name in names:
+                results[name][str(years)] = self.bench(name)
+
+            self.db.close_memory_db()
+
+        return {'meta': self.meta(), 'results': results}
+
+    def bench(self, name: str) -> dict:
+        """
+        Run one benchmark `repeat` times.
+
+        :returns: The statistics of the run times in seconds.
+        :rtype: dict
+        """
+        setup = getattr(self, f"setup_{name}", None)
+        func = getattr(self, f"time_{name}")
+        teardown = getattr(self, f"teardown_{name}", None)
+        times = []
+
+        for count in range(self.options.repeat):
+            if setup: setup()
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+            if teardown: teardown()
+
+        return {'min': min(times), 'mean': statistics.mean(times),
+                'median': statistics.median(times),
+                'stdev': statistics.stdev(times) if len(times) > 1 else 0,
+                'repeat': len(times)}
+
+    def meta(self) -> dict:
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+                capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = 'unknown'
+
+        return {'commit': commit, 'seed': self.options.seed,
+                'sizes': list(self.options.sizes),
+                'repeat': self.options.repeat,
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'date': time.strftime('%Y-%m-%dT%H:%M:%S%z')}
+
+    #
+    # Benchmarks
+    #
+
+    def setup_create_db(self):
+        self.db.data_name = 'bench-create'
+        self.db.close_memory_db()
+
+    def time_create_db(self):
+        asyncio.run(self.db.create_db())
+
+    def teardown_create_db(self):
+        self.db.close_memory_db()
+        self.db.data_name = f"bench-{self.sd.years}"
+
+    def time_populate_panels(self):
+        asyncio.run(self.db.populate_panels())
+
+    def setup_save_to_database(self):
+        self.db._mf.panels[self.sd.PANEL].set_values(
+            self.sd.values(self.rng))
+
+    def time_save_to_database(self):
+        asyncio.run(self.db.save_to_database(
+            self.sd.PANEL, self.db._mf.panels[self.sd.PANEL]))
+
+    def setup_save_data(self):
+        self.data = self.sd.values(self.rng)
+
+    def time_save_data(self):
+        asyncio.run(self.db.save_data(self.sd.PANEL, self.data))
+
+    def time_select_from_config_data_table(self):
+        asyncio.run(self.db.select_from_config_data_table(
+            dict.fromkeys(self.sd.field_names), self.sd.current_year))
+
+    def setup_insert_into_config_data_table(self):
+        self.data = self.sd.values(self.rng)
+
+    def time_insert_into_config_data_table(self):
+        asyncio.run(self.db.insert_into_config_data_table(
+            self.sd.current_year, self.rng.randrange(1, 20), self.data))
+
+    def setup_update_config_data_table(self):
+        rows = asyncio.run(self.db.select_from_config_data_table(
+            dict.fromkeys(self.sd.field_names), self.sd.current_year))
+        values = self.sd.values(self.rng)
+        self.data = [(row[0], values[row[1]]) for row in rows]
+
+    def time_update_config_data_table(self):
+        asyncio.run(self.db.update_config_data_table(
+            self.sd.current_year, 1, self.data))
+
+
+def compare(old: dict, new: dict, factor: float) -> list:
+    """
+    Compare two result files.
+
+    :param dict old: The base line results.
+    :param dict new: The new results.
+    :param float factor: A ratio of new to old over this is a regression.
+    :returns: A list of (<benchmark>, <size>, <old>, <new>, <ratio>,
+              <regression>) tuples for the benchmarks in both.
+    :rtype: list
+    """
+    items = []
+
+    for name, sizes in sorted(new['results'].items()):
+        for size, stats in sorted(sizes.items(), key=lambda i: int(i[0])):
+            base = old['results'].get(name, {}).get(size)
+
+            if base:
+                ratio = stats['min'] / base['min'] if base['min'] else 0
+                items.append((name, size, base['min'], stats['min'], ratio,
+                              ratio > factor))
+
+    return items
+
+
+def report(results: dict) -> None:
+    print(f"{'Benchmark':<36}{'Years':>6}{'Min ms':>10}{'Mean ms':>10}")
+    print("-" * 62)
+
+    for name, sizes in sorted(results['results'].items()):
+        for size, stats in sorted(sizes.items(), key=lambda i: int(i[0])):
+            print(f"{name:<36}{size:>6}{stats['min'] * 1000:>10.2f}"
+                  f"{stats['mean'] * 1000:>10.2f}")
+
+
+def report_compare(items: list) -> None:
+    print(f"{'Benchmark':<36}{'Years':>6}{'Old ms':>10}{'New ms':>10}"
+          f"{'Ratio':>8}")
+    print("-" * 70)
+
+    for name, size, old, new, ratio, regression in items:
+        flag = '  REGRESSION' if regression else ''
+        print(f"{name:<36}{size:>6}{old * 1000:>10.2f}{new * 1000:>10.2f}"
+              f"{ratio:>8.2f}{flag}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=("Benchmark the database layer on synthetic databases "
+                     "and store the results as JSON."))
+    parser.add_argument(
+        '-r', '--repeat', type=int, default=10, dest='repeat',
+        help="The number of times to run each benchmark, default is 10.")
+    parser.add_argument(
+        '-s', '--sizes', type=int, nargs='+', default=BenchDatabase.SIZES,
+        dest='sizes', help=("The number of fiscal years in each synthetic "
+                            "database, default is 1 10 50."))
+    parser.add_argument(
+        '-b', '--bench', nargs='+', default=None, dest='bench',
+        help="Only run these benchmarks, default is all of them.")
+    parser.add_argument(
+        '--seed', type=int, default=0, dest='seed',
+        help="The seed of the synthetic data, default is 0.")
+    parser.add_argument(
+        '-o', '--output', default=None, dest='output',
+        help=("The JSON file to write, default is "
+              ".benchmarks/<commit>.json."))
+    parser.add_argument(
+        '-c', '--compare', default=None, dest='compare',
+        help="A JSON results file to compare the new results to.")
+    parser.add_argument(
+        '-f', '--factor', type=float, default=1.2, dest='factor',
+        help=("A slow down over this factor is a regression, default "
+              "is 1.2."))
+    options = parser.parse_args()
+    results = BenchDatabase(options).run()
+    output = options.output
+
+    if not output:
+        os.makedirs(BenchDatabase.RESULTS_DIR, exist_ok=True)
+        output = os.path.join(BenchDatabase.RESULTS_DIR,
+                              f"{results['meta']['commit']}.json")
+
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    report(results)
+    print(f"\nResults written to {output}")
+    status = 0
+
+    if options.compare:
+        with open(options.compare, 'r') as f:
+            old = json.load(f)
+
+        items = compare(old, results, options.factor)
+        print()
+        report_compare(items)
+        status = int(any(item[-1] for item in items))
+
+    sys.exit(status)
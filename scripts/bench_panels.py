@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Benchmark the two panel backends against each other.
+#
+__docformat__ = "restructuredtext en"
+
+import os
+import sys
+import time
+import argparse
+import statistics
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+import wx
+
+from src.config import Settings, TomlPanelConfig
+from src.panel_factory import PanelFactory
+from src.panel_builder import PanelBuilder
+from src import main_frame
+
+
+class BenchPanels:
+    """
+    Time creating every panel with the PanelFactory, which generates and
+    compiles code, and with the PanelBuilder, which creates the widgets
+    directly. The panels are created in a hidden frame.
+    """
+
+    def __init__(self, options):
+        self.options = options
+        self.frame = wx.Frame(None)
+        self.parent = wx.Panel(self.frame)
+
+    def run(self):
+        results = {}
+
+        for name, klass in (('code', PanelFactory), ('direct', PanelBuilder)):
+            results[name] = self.bench(klass)
+
+        self.report(results)
+
+    def bench(self, klass):
+        """
+        Create all the panels `count` times.
+
+        :returns: A dict of {<panel>: [<seconds>, ...], ...} with a
+                  'total' key for all the panels including the parse.
+        :rtype: dict
+        """
+        times = {'total': []}
+
+        for count in range(self.options.count):
+            sf = klass()
+            start = time.perf_counter()
+            sf.parse()
+
+            for panel in list(sf.class_name_keys):
+                p_start = time.perf_counter()
+                obj = self.create(sf, panel)
+                times.setdefault(panel, []).append(
+                    time.perf_counter() - p_start)
+                obj.Destroy()
+
+            times['total'].append(time.perf_counter() - start)
+
+        return times
+
+    def create(self, sf, panel):
+        if isinstance(sf, PanelBuilder):
+            obj = sf.create_panel(panel, self.parent)
+        else:
+            ns = vars(main_frame)
+            exec(compile(sf.get_panel_code(panel), f"<{panel}>", 'exec'), ns)
+            obj = ns[sf.get_class_name(panel)](self.parent)
+
+        return obj
+
+    def report(self, results):
+        print(f"{'Panel':<20}{'Backend':<10}{'Mean ms':>10}{'Min ms':>10}")
+        print("-" * 50)
+        panels = sorted(set(results['code']) | set(results['direct']))
+
+        for panel in panels:
+            for name, times in results.items():
+                values = times.get(panel)
+
+                if values:
+                    print(f"{panel:<20}{name:<10}"
+                          f"{statistics.mean(values) * 1000:>10.2f}"
+                          f"{min(values) * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=("Benchmark the panel backends on the default config."))
+    parser.add_argument(
+        '-c', '--count', type=int, default=10, dest='count',
+        help="The number of times to create each panel, default is 10.")
+    options = parser.parse_args()
+    Settings().create_dirs()
+    tpc = TomlPanelConfig()
+
+    if not tpc.is_valid:
+        print(tpc.get_err_msg, file=sys.stderr)
+        sys.exit(1)
+
+    app = wx.App()
+    BenchPanels(options).run()
+    sys.exit(0)
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+#
+# scripts/synthetic_data.py
+#
+# Create synthetic databases for the benchmarks and tests.
+#
+__docformat__ = "restructuredtext en"
+
+import os
+import sys
+import random
+import asyncio
+import datetime
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from src.config import BaseSystemData
+from src.core.utilities import make_name, panel_fields
+
+
+class StaticText:
+    """
+    Stands in for a wx.StaticText, only the class name and label are used
+    by the database code.
+    """
+
+    def __init__(self, label: str):
+        self._label = label
+
+    def GetLabel(self) -> str:
+        return self._label
+
+    def GetLabelText(self) -> str:
+        return self._label
+
+
+class TextCtrl:
+    """
+    Stands in for a wx.TextCtrl.
+    """
+
+    def __init__(self, value: str='', financial: bool=True):
+        self._value = value
+        self.financial = financial
+
+    def GetValue(self) -> str:
+        return self._value
+
+    def SetValue(self, value: str) -> None:
+        self._value = value
+
+
+class SyntheticPanel:
+    """
+    A panel made of label and text control pairs without wx.
+    """
+
+    def __init__(self, fields: list):
+        """
+        :param list fields: A list of (<label>, <financial>) tuples.
+        """
+        self.initializing = False
+        self._children = []
+
+        for label, financial in fields:
+            self._children.append(StaticText(label))
+            self._children.append(TextCtrl(financial=financial))
+
+    def GetChildren(self) -> list:
+        return self._children
+
+    def set_values(self, values: dict) -> None:
+        """
+        Set the text controls as if a user typed in the values.
+
+        :param dict values: The values as in {<field name>: <value>, ...}.
+        """
+        for label, ctrl in zip(self._children[::2], self._children[1::2]):
+            field = make_name(label.GetLabelText())
+
+            if field in values:
+                ctrl.SetValue(values[field])
+
+
+class SyntheticFrame:
+    """
+    Stands in for the MainFrame, the database code only uses the panels
+    and the status bar.
+    """
+
+    def __init__(self, panels: dict):
+        self.panels = panels
+        self.statusbar_message = ''
+        self.statusbar_warning = ''
+        self.statusbar_error = ''
+
+
+class SyntheticData:
+    """
+    Deterministically fill a database with `years` fiscal years of 19
+    months of all the fields on the budget panel. The same seed always
+    gives the same database, including the time stamps.
+
+    .. note::
+
+       The fiscal years are `first_year` to `first_year + years - 1`, the
+       last one is the current year, and the year after it is added as the
+       next year the same way the application does.
+    """
+    PANEL = 'budget'
+    MONTHS = 19
+    FIRST_YEAR = 182
+    STAMP = datetime.datetime(2025, 3, 20, tzinfo=datetime.timezone.utc)
+
+    def __init__(self, years: int, seed: int=0, first_year: int=FIRST_YEAR,
+                 config_path: str=None):
+        """
+        :param int years: The number of fiscal years with data.
+        :param int seed: The random seed for the values.
+        :param int first_year: The first Badí' year.
+        :param str config_path: The panel config to take the fields from,
+                                the default is the local config.
+        """
+        assert years > 0, f"There must be at least one year, found {years}."
+        self.years = years
+        self.seed = seed
+        self.first_year = first_year
+        self._config_path = config_path
+        self._fields = None
+
+    @property
+    def current_year(self) -> int:
+        return self.first_year + self.years - 1
+
+    @property
+    def fields(self) -> list:
+        """
+        The (<label>, <financial>) tuples of the budget panel, duplicate
+        field names are only used once.
+
+        :rtype: list
+        """
+        if self._fields is None:
+            bsd = BaseSystemData()
+            path = (self._config_path if self._config_path
+                    else bsd.local_config_fullpath)
+            doc = bsd.parse_toml(path)
+            assert not isinstance(doc, int), f"Could not parse {path}."
+            names = set()
+            self._fields = []
+
+            for label, financial in panel_fields(
+                    doc[self.PANEL]['widgets']):
+                name = make_name(label)
+
+                if name not in names:
+                    names.add(name)
+                    self._fields.append((label, financial))
+
+        return self._fields
+
+    @property
+    def field_names(self) -> list:
+        return [make_name(label) for label, financial in self.fields]
+
+    def make_panel(self) -> SyntheticPanel:
+        return SyntheticPanel(self.fields)
+
+    def make_frame(self) -> SyntheticFrame:
+        return SyntheticFrame({self.PANEL: self.make_panel()})
+
+    def values(self, rng: random.Random) -> dict:
+        """
+        One month of values, financial values are in cents.
+
+        :param random.Random rng: The random generator to use.
+        :returns: The values as in {<field name>: <value>, ...}.
+        :rtype: dict
+        """
+        return {make_name(label): (str(rng.randrange(0, 1000000))
+                                   if financial else str(rng.randrange(100)))
+                for label, financial in self.fields}
+
+    def build(self, db) -> None:
+        """
+        Create the schema and fill the database.
+
+        :param BaseDatabase db: The database, usually set to the memory
+                                data backend.
+        """
+        asyncio.run(self._build(db))
+
+    async def _build(self, db) -> None:
+        rng = random.Random(self.seed)
+        db.clock.freeze(self.STAMP)
+
+        try:
+            await db.create_db()
+            # year, month, day, current, work_on, audit
+            years = [(year, 1, 1, int(year == self.current_year),
+                      int(year == self.current_year), 0)
+                     for year in range(self.first_year,
+                                       self.current_year + 2)]
+            await db.insert_into_fiscal_year_table(years)
+            await db._insert_into_month_table()
+            await db.insert_into_field_type_table(self.field_names)
+            await db._do_insert_query(*await self._data_rows(db, rng))
+        finally:
+            db.clock.unfreeze()
+
+    async def _data_rows(self, db, rng: random.Random) -> tuple:
+        now = db.clock.isoformat()
+        fy_pks = {item[1]: item[0]
+                  for item in await db.select_from_fiscal_year_table()}
+        m_pks = {item[2]: item[0]
+                 for item in await db.select_from_month_table()}
+        f_pks = {item[1]: item[0]
+                 for item in await db.select_from_field_type_table(
+                     dict.fromkeys(self.field_names))}
+        query = (
+            f"INSERT INTO {db._T_DATA} (value, fy1fk, fy2fk, mfk, ffk, "
+            "c_time, m_time) VALUES (?, ?, ?, ?, ?, ?, ?);")
+        rows = []
+
+        for year in range(self.first_year, self.current_year + 1):
+            for month in range(1, self.MONTHS + 1):
+                for field, value in self.values(rng).items():
+                    rows.append((value, fy_pks[year], fy_pks[year+1],
+                                 m_pks[month], f_pks[field], now, now))
+
+        return query, rows
@@ -5,7 +5,10 @@
 __docformat__ = "restructuredtext en"
 
 import sys
+import queue
+import atexit
 import logging
+import logging.handlers
 
 
 __all__ = ('Logger',)
@@ -18,13 +21,14 @@ class Logger:
     """
     _DEFAULT_FORMAT = ("%(asctime)s %(levelname)s %(name)s %(module)s "
                        "%(funcName)s [line:%(lineno)d] %(message)s")
+    _listeners = []
 
     def __init__(self, format_str=None):
         self._format = format_str if format_str else self._DEFAULT_FORMAT
         self.logger = None
 
     def config(self, logger_name=None, file_path=None, level=logging.INFO,
-               initial_msg=True):
+               initial_msg=True, queued=False, max_bytes=0, backup_count=0):
         """
         Config the logger.
 
@@ -38,17 +42,27 @@ class Logger:
         :type level: int
         :param initial_msg: Print the inital log message. The default is True.
         :type initial_msg: bool
+        :param queued: If `True` the file is written to by a background
+                       thread so the caller never blocks on the file I/O.
+                       The default is False.
+        :type queued: bool
+        :param max_bytes: Rotate the log file when it reaches this size. The
+                          default is 0, never rotate.
+        :type max_bytes: int
+        :param backup_count: The number of rotated log files to keep. The
+                             default is 0.
+        :type backup_count: int
         """
         if logger_name and file_path:
             self.logger = logging.getLogger(logger_name)
             self.logger.setLevel(level)
-            handler = logging.FileHandler(file_path)
-            formatter = logging.Formatter(self._format)
-            handler.setFormatter(formatter)
+            handler = self._file_handler(file_path, queued, max_bytes,
+                                         backup_count)
             self.logger.addHandler(handler)
         elif file_path:  # Creates a file root logger.
-            logging.basicConfig(filename=file_path, format=self._format,
-                                level=level, force=True)
+            handler = self._file_handler(file_path, queued, max_bytes,
+                                         backup_count)
+            logging.basicConfig(handlers=[handler], level=level, force=True)
             self.logger = logging.getLogger()
         else:  # Creates a stdout root logger.
             logging.basicConfig(stream=sys.stdout, format=self._format,
@@ -63,6 +77,58 @@ class Logger:
         if initial_msg:
             log.info("Logging start for %s.", logger_name)
 
+    def _file_handler(self, file_path, queued, max_bytes, backup_count):
+        """
+        Create the handler that writes to the log file.
+
+        :param file_path: The path to the logging file.
+        :type file_path: str
+        :param queued: If `True` return a `QueueHandler` whose records are
+                       written to the file by a `QueueListener` thread.
+        :type queued: bool
+        :param max_bytes: Rotate the log file when it reaches this size.
+        :type max_bytes: int
+        :param backup_count: The number of rotated log files to keep.
+        :type backup_count: int
+        :returns: The handler to add to the logger.
+        :rtype: logging.Handler
+        """
+        if max_bytes:
+            handler = logging.handlers.RotatingFileHandler(
+                file_path, maxBytes=max_bytes, backupCount=backup_count)
+        else:
+            handler = logging.FileHandler(file_path)
+
+        handler.setFormatter(logging.Formatter(self._format))
+
+        if queued:
+            log_queue = queue.SimpleQueue()
+            listener = logging.handlers.QueueListener(
+                log_queue, handler, respect_handler_level=True)
+            listener.start()
+
+            if not self._listeners:
+                atexit.register(self.stop)
+
+            self._listeners.append(listener)
+            handler = logging.handlers.QueueHandler(log_queue)
+            # The listener's handler does the formatting, without this
+            # basicConfig would format the records a first time.
+            handler.setFormatter(logging.Formatter('%(message)s'))
+
+        return handler
+
+    def stop(self):
+        """
+        Stop all the queued logging threads, any records still in the queues
+        are written to the log files first. This is called at exit, but can
+        be called earlier.
+        """
+        while self._listeners:
+            listener = self._listeners.pop()
+            listener.stop()
+            [h.close() for h in listener.handlers]
+
     @property
     def level(self):
         assert self.logger, "The 'config()' method must be called first."
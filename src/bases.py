@@ -8,22 +8,7 @@ import os
 import re
 from wx.lib.scrolledpanel import ScrolledPanel
 
-
-def find_dict(value: list) -> dict:
-    """
-    Fine the dict in the Toml data that is in the widget value list.
-
-    :param list value: A list that defines a widget from a TOML file.
-    :return: A dict with attributes that define a widget.
-    :rtype: dict
-    """
-    for item in value:
-        if isinstance(item, dict):
-            break
-        else:
-            item = {}
-
-    return item
+from .core.utilities import find_dict
 
 
 def version() -> str:
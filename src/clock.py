@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+#
+# src/clock.py
+#
+__docformat__ = "restructuredtext en"
+
+import datetime
+from contextlib import contextmanager
+
+
+class TransactionClock:
+    """
+    Provides the time stamps written to the `c_time` and `m_time` columns.
+
+    Inside a unit of work every call to `now()` returns the same time stamp,
+    so a single save only asks the underlying clock for the time once. The
+    clock can be injected into the database classes, and frozen, so that
+    tests and benchmarks get repeatable time stamps.
+    """
+
+    def __init__(self, now_func=None):
+        """
+        :param now_func: A callable that takes a `tzinfo` object and returns
+                         a datetime like object. The default is the standard
+                         library `datetime.datetime.now`.
+        :type now_func: callable
+        """
+        self._now_func = now_func if now_func else datetime.datetime.now
+        self._frozen = None
+        self._current = None
+        self._depth = 0
+
+    @contextmanager
+    def unit_of_work(self, tzinfo=None):
+        """
+        A context manager that holds one time stamp for everything done
+        inside it. Nested units of work share the outermost time stamp.
+
+        :param tzinfo: The timezone to create the time stamp in.
+        :type tzinfo: datetime.tzinfo
+        :returns: The time stamp used for this unit of work.
+        :rtype: datetime.datetime or badidatetime.datetime
+        """
+        if self._depth == 0:
+            self._current = self._make_now(tzinfo)
+
+        self._depth += 1
+
+        try:
+            yield self._current
+        finally:
+            self._depth -= 1
+
+            if self._depth == 0:
+                self._current = None
+
+    def now(self, tzinfo=None):
+        """
+        Get the current time stamp.
+
+        :param tzinfo: The timezone to create the time stamp in. This is
+                       ignored inside a unit of work or if frozen.
+        :type tzinfo: datetime.tzinfo
+        :returns: The current time stamp.
+        :rtype: datetime.datetime or badidatetime.datetime
+        """
+        if self._current is not None:
+            now = self._current
+        else:
+            now = self._make_now(tzinfo)
+
+        return now
+
+    def isoformat(self, tzinfo=None) -> str:
+        """
+        Get the current time stamp as an ISO string used in the database.
+
+        :param tzinfo: The timezone to create the time stamp in.
+        :type tzinfo: datetime.tzinfo
+        :returns: The ISO formatted time stamp.
+        :rtype: str
+        """
+        return self.now(tzinfo).isoformat()
+
+    def freeze(self, value) -> None:
+        """
+        Freeze the clock at the given time stamp.
+
+        :param value: The time stamp that will always be returned.
+        :type value: datetime.datetime or badidatetime.datetime
+        """
+        self._frozen = value
+
+    def unfreeze(self) -> None:
+        """
+        Let the clock run again.
+        """
+        self._frozen = None
+
+    @property
+    def in_unit_of_work(self) -> bool:
+        return self._depth > 0
+
+    def _make_now(self, tzinfo):
+        return self._frozen if self._frozen is not None else self._now_func(
+            tzinfo)
@@ -5,16 +5,19 @@
 __docformat__ = "restructuredtext en"
 
 import os
-import re
+import copy
+import json
+import hashlib
 import logging
 import shutil
+import tempfile
 from datetime import datetime
 from appdirs import AppDirs
 
 import tomlkit as tk
 
-from .bases import find_dict
-from .utilities import Borg
+from .core.utilities import find_dict, Borg
+from .panel_index import PanelIndex
 
 
 class Settings(AppDirs, Borg):
@@ -31,6 +34,18 @@ class Settings(AppDirs, Borg):
     _LOCAL_CONFIG = os.path.join(_BASE_DIR, 'config')
     _DATA_FILE = 'data.sqlite3'
     _PANEL_FACTORY_DIR = 'factory'
+    _JOURNAL_DIR = 'field-edit-journal'
+    _ARCHIVE_DIR = 'archive'
+    _BACKUP_DIR = 'backups'
+    # Where the database is stored.
+    BACKEND_FILE = 'file'      # The user data directory.
+    BACKEND_MEMORY = 'memory'  # A shared-cache in-memory database.
+    BACKEND_TMPFS = 'tmpfs'    # A RAM backed file system.
+    _BACKENDS = (BACKEND_FILE, BACKEND_MEMORY, BACKEND_TMPFS)
+    _DATA_BACKEND = BACKEND_FILE
+    _DATA_NAME = None
+    _DATA_PATH = None  # A database file used instead of the user's.
+    _TMPFS_DIR = '/dev/shm'
     _CONFIG_FILES = {'local': {'bahai': 'default_bahai.toml',
                                'generic': 'default_generic.toml'},
                      'user': {'bahai': 'bahai.toml',
@@ -54,6 +69,12 @@ class Settings(AppDirs, Borg):
         self.__app_toml = 'nc-bookkeeper.toml'
         self._log = logging.getLogger(self.logger_name)
 
+        # Used to run the tests and benchmarks against RAM.
+        backend = os.environ.get('NCB_DATA_BACKEND')
+
+        if backend:
+            self.data_backend = backend
+
     def create_dirs(self):
         if not self._DEBUG:
             if not os.path.exists(self.user_data_dir):
@@ -71,9 +92,12 @@ class Settings(AppDirs, Borg):
             if not os.path.exists(self.cached_factory_dir):
                 os.makedirs(self.cached_factory_dir, mode=0o775, exist_ok=True)
 
+            if not os.path.exists(self.user_journal_dir):
+                os.makedirs(self.user_journal_dir, mode=0o775, exist_ok=True)
+
             paths = (self.user_data_dir, self.user_config_dir,
                      self.user_cache_dir, self.user_log_dir,
-                     self.cached_factory_dir)
+                     self.cached_factory_dir, self.user_journal_dir)
         else:
             if not os.path.exists(self._debug_data_dir):
                 os.makedirs(self._debug_data_dir, mode=0o775, exist_ok=True)
@@ -84,6 +108,9 @@ class Settings(AppDirs, Borg):
             if not os.path.exists(self.cached_factory_dir):
                 os.makedirs(self.cached_factory_dir, mode=0o775, exist_ok=True)
 
+            if not os.path.exists(self.user_journal_dir):
+                os.makedirs(self.user_journal_dir, mode=0o775, exist_ok=True)
+
             paths = (self._debug_data_dir, self._debug_log_dir)
 
         self._log.info("Created, if necessary, the following paths: %s", paths)
@@ -96,6 +123,61 @@ class Settings(AppDirs, Borg):
     def debug(self, value: bool):
         self._DEBUG = value
 
+    @property
+    def data_backend(self) -> str:
+        return self._DATA_BACKEND
+
+    @data_backend.setter
+    def data_backend(self, value: str):
+        """
+        Set where the database is stored. SQLite's ':memory:' is accepted
+        as a synonym for 'memory'.
+
+        :param str value: One of 'file', 'memory', ':memory:', or 'tmpfs'.
+        """
+        value = self.BACKEND_MEMORY if value == ':memory:' else value
+        assert value in self._BACKENDS, (
+            f"Invalid data backend '{value}', must be one of "
+            f"{self._BACKENDS}.")
+        Settings._DATA_BACKEND = value
+
+    @property
+    def data_name(self) -> str:
+        """
+        The name of the in-memory or tmpfs database, different names give
+        separate databases. The default is the data file name.
+        """
+        return self._DATA_NAME if self._DATA_NAME else self.data_file_name
+
+    @data_name.setter
+    def data_name(self, value: str):
+        Settings._DATA_NAME = value
+
+    @property
+    def data_path(self) -> str:
+        """
+        A database file to use instead of the one in the user data
+        directory, this is how the batch commands work on other books.
+        Only used with the file backend.
+        """
+        return self._DATA_PATH
+
+    @data_path.setter
+    def data_path(self, value: str):
+        Settings._DATA_PATH = os.path.abspath(value) if value else None
+
+    @property
+    def data_is_uri(self) -> bool:
+        """
+        True if `user_data_fullpath` is an SQLite URI.
+        """
+        return self.data_backend == self.BACKEND_MEMORY
+
+    @property
+    def tmpfs_dir(self) -> str:
+        return (self._TMPFS_DIR if os.path.isdir(self._TMPFS_DIR)
+                else tempfile.gettempdir())
+
     @staticmethod
     def base_dir():
         return Settings._BASE_DIR
@@ -136,11 +218,46 @@ class Settings(AppDirs, Borg):
 
     @property
     def user_data_fullpath(self):
-        if self.debug:
+        if self.data_backend == self.BACKEND_MEMORY:
+            return f"file:{self.data_name}?mode=memory&cache=shared"
+        elif self.data_backend == self.BACKEND_TMPFS:
+            return os.path.join(self.tmpfs_dir,
+                                f"{self.app_name}-{self.data_name}")
+        elif self.data_path:
+            return self.data_path
+        elif self.debug:
             return os.path.join(self._debug_data_dir, self.data_file_name)
         else:
             return os.path.join(self.user_data_dir, self.data_file_name)
 
+    @property
+    def user_archive_dir(self):
+        """
+        Where the archived fiscal years are kept, next to the database.
+        There is none for the memory backend.
+        """
+        if self.data_is_uri:
+            path = None
+        else:
+            path = os.path.join(os.path.dirname(self.user_data_fullpath),
+                                self._ARCHIVE_DIR)
+
+        return path
+
+    @property
+    def user_backup_dir(self):
+        """
+        Where the database snapshots are kept, next to the database. There
+        is none for the memory backend.
+        """
+        if self.data_is_uri:
+            path = None
+        else:
+            path = os.path.join(os.path.dirname(self.user_data_fullpath),
+                                self._BACKUP_DIR)
+
+        return path
+
     @property
     def user_config_fullpath(self):
         if self.debug:
@@ -169,6 +286,16 @@ class Settings(AppDirs, Borg):
         else:
             return os.path.join(self.user_cache_dir, self.panel_factory_name)
 
+    @property
+    def user_journal_dir(self):
+        """
+        Where the field edit journals are kept, one file for each panel.
+        """
+        if self.debug:
+            return os.path.join(self._debug_data_dir, self._JOURNAL_DIR)
+        else:
+            return os.path.join(self.user_cache_dir, self._JOURNAL_DIR)
+
     @property
     def local_config_fullpath(self):
         return os.path.join(self._LOCAL_CONFIG, self.__local_toml)
@@ -184,6 +311,9 @@ class BaseSystemData(Settings):
     in all the types of config sub-classes.
     """
     SYS_FILES = {'data': None, 'panel_config': None, 'app_config': None}
+    # Files that passed validation but have not been parsed yet.
+    _DEFERRED = {}
+    _CACHE_EXT = '.cache'
     # Error conditions
     ERR_FILE_NOT_FOUND = 1    # Cannot find file
     ERR_TOML_ERROR = 2        # TOML error, maybe corrupted
@@ -201,7 +331,7 @@ class BaseSystemData(Settings):
         :returns: The TOML document.
         :rtype: tk.toml_document.TOMLDocument
         """
-        return self.SYS_FILES.get('panel_config')
+        return self._get_sys_file('panel_config')
 
     @panel_config.setter
     def panel_config(self, value):
@@ -210,16 +340,34 @@ class BaseSystemData(Settings):
 
         :param tk.toml_document.TOMLDocument value: The TOML doc.
         """
+        self._DEFERRED.pop('panel_config', None)
         self.SYS_FILES['panel_config'] = value
 
     @property
     def app_config(self):
-        return self.SYS_FILES.get('app_config')
+        return self._get_sys_file('app_config')
 
     @app_config.setter
     def app_config(self, value):
+        self._DEFERRED.pop('app_config', None)
         self.SYS_FILES['app_config'] = value
 
+    def _get_sys_file(self, key: str):
+        """
+        Get one of the TOML docs, parsing it now if its validation was
+        satisfied by the cache.
+
+        :param str key: One of the `SYS_FILES` keys.
+        :returns: The TOML document or None if not available.
+        :rtype: tk.toml_document.TOMLDocument or None
+        """
+        if key in self._DEFERRED:
+            filepath, raw_doc = self._DEFERRED.pop(key)
+            doc = self._parse_raw(raw_doc, filepath)
+            self.SYS_FILES[key] = None if isinstance(doc, int) else doc
+
+        return self.SYS_FILES.get(key)
+
     def parse_toml(self, filepath: str):
         """
         Open and read the specified TOML file.
@@ -228,32 +376,143 @@ class BaseSystemData(Settings):
         :return: TOML doc if no error or a tuple (errmsg, errcode) if an error.
         :rtype: TOLM doc or int
         """
-        error = doc = None
+        raw_doc, error = self._read_raw(filepath)
+        return error if error else self._parse_raw(raw_doc, filepath)
+
+    def validate_file(self, filepath: str, key: str=None):
+        """
+        Validate a TOML file parsing it at most once. The content hash and
+        the parse status are kept in a sidecar file, if the hash matches a
+        known-good entry the parse is skipped and deferred until the doc is
+        first used.
+
+        :param str filepath: The file to validate.
+        :param str key: The `SYS_FILES` key to store the doc in. If None the
+                        doc is not kept.
+        :returns: None if valid else the error code.
+        :rtype: None or int
+        """
+        raw_doc, error = self._read_raw(filepath)
+
+        if not error:
+            digest = self._digest(raw_doc)
+            cache = self._read_cache(filepath)
+
+            if cache.get('hash') == digest:
+                error = cache.get('error')
+
+                if not error and key:
+                    self.SYS_FILES[key] = None
+                    self._DEFERRED[key] = (filepath, raw_doc)
+            else:
+                doc = self._parse_raw(raw_doc, filepath)
+                error = doc if isinstance(doc, int) else None
+
+                if not error and key:
+                    self._DEFERRED.pop(key, None)
+                    self.SYS_FILES[key] = doc
+
+                self._write_cache(filepath, digest, error)
+
+        return error
+
+    def is_known_good(self, filepath: str) -> bool:
+        """
+        Check the file against the cache without parsing it.
+
+        :param str filepath: The file to check.
+        :returns: True if the file's hash matches a known-good entry.
+        :rtype: bool
+        """
+        raw_doc, error = self._read_raw(filepath, log=False)
+        cache = self._read_cache(filepath)
+        return (not error and cache.get('hash') == self._digest(raw_doc)
+                and cache.get('error') is None)
+
+    def _read_raw(self, filepath: str, log: bool=True) -> tuple:
+        """
+        Read the raw text of a file.
+
+        :param str filepath: The file to open and read.
+        :param bool log: Log an error if the file is not found.
+        :returns: A tuple of (raw_doc, error).
+        :rtype: tuple
+        """
+        raw_doc = error = None
 
         try:
             with open(filepath, 'r') as f:
                 raw_doc = f.read()
         except FileNotFoundError as e:
-            msg = self.ERR_MESSAGES[self.ERR_FILE_NOT_FOUND].format(filepath)
-            self._log.error(msg[:-1] + ", %s", e)
+            if log:
+                msg = self.ERR_MESSAGES[self.ERR_FILE_NOT_FOUND].format(
+                    filepath)
+                self._log.error(msg[:-1] + ", %s", e)
+
             error = self.ERR_FILE_NOT_FOUND
+
+        return raw_doc, error
+
+    def _parse_raw(self, raw_doc: str, filepath: str):
+        """
+        Parse the raw text of a TOML file.
+
+        :param str raw_doc: The raw text.
+        :param str filepath: The file the text came from, used in errors.
+        :return: TOML doc if no error or the error code.
+        :rtype: TOLM doc or int
+        """
+        error = doc = None
+
+        if raw_doc != "":
+            try:
+                doc = tk.parse(raw_doc)
+            except tk.exceptions.TOMLKitError as e:
+                msg = self.ERR_MESSAGES[self.ERR_TOML_ERROR].format(filepath)
+                self._log.error(msg[:-1] + ", %s", e)
+                error = self.ERR_TOML_ERROR
         else:
-            if raw_doc != "":
-                try:
-                    doc = tk.parse(raw_doc)
-                except tk.exceptions.TOMLKitError as e:
-                    msg = self.ERR_MESSAGES[
-                        self.ERR_TOML_ERROR].format(filepath)
-                    self._log.error(msg[:-1] + ", %s", e)
-                    error = self.ERR_TOML_ERROR
-            else:
-                msg = self.ERR_MESSAGES[
-                    self.ERR_ZERO_LENGTH_FILE].format(filepath)
-                self._log.error(msg)
-                error = self.ERR_ZERO_LENGTH_FILE
+            msg = self.ERR_MESSAGES[self.ERR_ZERO_LENGTH_FILE].format(filepath)
+            self._log.error(msg)
+            error = self.ERR_ZERO_LENGTH_FILE
 
         return error if error else doc
 
+    def _digest(self, raw_doc: str) -> str:
+        return hashlib.sha256(raw_doc.encode('utf-8')).hexdigest()
+
+    def _read_cache(self, filepath: str) -> dict:
+        """
+        Read the sidecar cache of a config file.
+
+        :param str filepath: The config file.
+        :returns: The cache entry or an empty dict if there is none.
+        :rtype: dict
+        """
+        try:
+            with open(f"{filepath}{self._CACHE_EXT}", 'r') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+
+        return cache if isinstance(cache, dict) else {}
+
+    def _write_cache(self, filepath: str, digest: str, error: int) -> None:
+        """
+        Write the sidecar cache of a config file. Failing to write the
+        cache only costs a parse on the next start, so it is not fatal.
+
+        :param str filepath: The config file.
+        :param str digest: The content hash of the config file.
+        :param int error: The parse error code or None if valid.
+        """
+        try:
+            with open(f"{filepath}{self._CACHE_EXT}", 'w') as f:
+                json.dump({'hash': digest, 'error': error}, f)
+        except OSError as e:
+            self._log.warning("Could not write the cache for %s, %s",
+                              filepath, e)
+
 
 class TomlMetaData(BaseSystemData):
     """
@@ -363,39 +622,84 @@ class TomlPanelConfig(BaseSystemData):
 
     @property
     def is_valid(self):
+        """
+        Test that the user panel config can be parsed, restoring it from the
+        backup or the local config if needed. Each file is parsed at most
+        once and not at all if its hash is in the cache.
+        """
         ret = True
         backup_file = f"{self.user_config_fullpath}.bak"
-        count = 0
 
-        while self._has_user_config and count < 2:
-            count += 1
-            self._read_file(self.user_config_fullpath)
+        if self._has_user_config:
+            self.__error = self.validate_file(self.user_config_fullpath,
+                                              'panel_config')
 
             if self.__error:
                 self.__err_msg = self.ERR_MESSAGES[self.__error].format(
-                    self.local_config_fullpath)
-
-                if count < 2:
-                    self._log.warning(
-                        "Error: %s is corrupted, using the backup file.",
+                    self.user_config_fullpath)
+                self._log.warning(
+                    "Error: %s is corrupted, using the backup file.",
+                    self.user_config_fullpath)
+                ret = self._restore_from_backup(backup_file)
+
+                if not ret:
+                    self._log.error(
+                        "Error: %s and its backup are corrupted, using the "
+                        "local panel config, the panel edits are lost.",
                         self.user_config_fullpath)
-                    self._copy_file(backup_file, self.user_config_fullpath)
-                else:
-                    ret = False
-                    break
+                    ret = self._restore_from_local(backup_file)
         else:
-            if self._has_local_config:
-                self._copy_file(self.local_config_fullpath,
-                                self.user_config_fullpath)
-                self._copy_file(self.local_config_fullpath, backup_file)
-                self._read_file(self.user_config_fullpath)
-
-                if self.__error:  # All these errors are critical.
-                    self.__err_msg = self.ERR_MESSAGES[self.__error].format(
-                        self.user_config_fullpath)
-                    ret = False
+            ret = self._restore_from_local(backup_file)
+
+        return ret
+
+    def _restore_from_backup(self, backup_file):
+        """
+        Copy the backup over the user panel config if the backup is good.
+        Since the content is then the same the cache entry is copied too,
+        so the user config is not parsed again.
+
+        :param str backup_file: The backup file.
+        :returns: True if the user config was restored.
+        :rtype: bool
+        """
+        ret = False
+
+        if self.validate_file(backup_file) is None:
+            self._copy_file(backup_file, self.user_config_fullpath)
+            self._copy_file(f"{backup_file}{self._CACHE_EXT}",
+                            f"{self.user_config_fullpath}{self._CACHE_EXT}")
+            self.__error = self.validate_file(self.user_config_fullpath,
+                                              'panel_config')
+            ret = self.__error is None
+
+        return ret
+
+    def _restore_from_local(self, backup_file):
+        """
+        Copy the local panel config to the user config and the backup.
+
+        :param str backup_file: The backup file.
+        :returns: True if the user config was created and is valid.
+        :rtype: bool
+        """
+        ret = False
+
+        if self._has_local_config:
+            self._copy_file(self.local_config_fullpath,
+                            self.user_config_fullpath)
+            self._copy_file(self.local_config_fullpath, backup_file)
+            self.__error = self.validate_file(self.user_config_fullpath,
+                                              'panel_config')
+
+            if self.__error:  # All these errors are critical.
+                self.__err_msg = self.ERR_MESSAGES[self.__error].format(
+                    self.user_config_fullpath)
             else:
-                ret = False
+                self._copy_file(
+                    f"{self.user_config_fullpath}{self._CACHE_EXT}",
+                    f"{backup_file}{self._CACHE_EXT}")
+                ret = True
 
         return ret
 
@@ -403,6 +707,29 @@ class TomlPanelConfig(BaseSystemData):
     def get_err_msg(self):
         return self.__err_msg
 
+    def write_file(self) -> None:
+        """
+        Write the panel config in memory to the user panel config and its
+        backup, for example after fields were edited.
+
+        :raises OSError: If a file could not be written.
+        """
+        data = tk.dumps(self.panel_config)
+
+        for filepath in (self.user_config_fullpath,
+                         f"{self.user_config_fullpath}.bak"):
+            try:
+                with open(filepath, 'w') as f:
+                    f.write(data)
+            except OSError as e:
+                self._log.error("Could not write the file %s, %s",
+                                filepath, e)
+                raise e
+            else:
+                # The data was dumped from a TOML doc so it is known to be
+                # good.
+                self._write_cache(filepath, self._digest(data), None)
+
     def _read_file(self, filepath):
         """
         Open and read the local panel file.
@@ -431,6 +758,10 @@ class TomlAppConfig(BaseSystemData):
     """
     _FILE_LIST = ('user_app_config_fullpath',)
     _DEFAULT_SCREEN_SIZE = [570, 830]
+    _DEFAULT_BACKUP = {'enabled': True, 'interval': 24, 'keep': 7,
+                       'pages': 256}
+    PANEL_CODE = 'code'
+    PANEL_DIRECT = 'direct'
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -457,41 +788,31 @@ class TomlAppConfig(BaseSystemData):
     def is_valid(self):
         """
         Test the app config file that it can be parsed and that it exists.
-        This property always returns True.
+        A missing or corrupted file is recreated. The file is parsed at most
+        once and not at all if its hash is in the cache.
         """
         ret = True
 
-        if self._has_user_config:
-            ret = self.__loop_has_user_config()
-        else:
+        if not self._has_user_config:
             self._create_app_config()
-            ret = self.__loop_has_user_config()
-
-        return ret
 
-    def __loop_has_user_config(self):
-        count = 0
-        ret = True
+        self.__error = self.validate_file(self.user_app_config_fullpath,
+                                          'app_config')
 
-        while self._has_user_config and count < 2:
-            count += 1
-            self._read_file(self.user_app_config_fullpath)
+        if self.__error:
+            self.__err_msg = self.ERR_MESSAGES[self.__error].format(
+                self.user_app_config_fullpath)
+            self._log.warning("Error: %s is corrupted, recreating file.",
+                              self.user_app_config_fullpath)
+            self._create_app_config()
+            self.__error = self.validate_file(self.user_app_config_fullpath,
+                                              'app_config')
 
             if self.__error:
-                self.__err_msg = self.ERR_MESSAGES[self.__error].format(
-                    self.user_app_config_fullpath)
-
-                if count < 2:
-                    self._log.warning(
-                        "Error: %s is corrupted, recreating file.",
-                        self.user_app_config_fullpath)
-                    self._create_app_config()
-                    count = 0
-                else:
-                    self._log.critical("The %s is corrupted beyond repair "
-                                       "contact the developer.",
-                                       self.user_app_config_fullpath)
-                    ret = False
+                self._log.critical("The %s is corrupted beyond repair "
+                                   "contact the developer.",
+                                   self.user_app_config_fullpath)
+                ret = False
 
         return ret
 
@@ -499,6 +820,43 @@ class TomlAppConfig(BaseSystemData):
     def get_err_msg(self):
         return self.__err_msg
 
+    @property
+    def panel_builder(self):
+        """
+        The backend used to create the panels. The default 'code' generates
+        and compiles code with the PanelFactory, 'direct' creates the
+        widgets with the PanelBuilder. Set in the app config with:
+
+            [panel_builder]
+            backend = "direct"
+        """
+        doc = self.app_config or {}
+        backend = doc.get('panel_builder', {}).get('backend', self.PANEL_CODE)
+
+        if backend not in (self.PANEL_CODE, self.PANEL_DIRECT):
+            self._log.warning("Invalid panel builder '%s', using '%s'.",
+                              backend, self.PANEL_CODE)
+            backend = self.PANEL_CODE
+
+        return backend
+
+    @property
+    def backup(self) -> dict:
+        """
+        The database backup settings, any missing are the defaults. Set in
+        the app config with:
+
+            [backup]
+            enabled = true
+            interval = 24  # Hours between snapshots.
+            keep = 7       # Snapshots kept.
+            pages = 256    # Pages copied in each step.
+        """
+        doc = self.app_config or {}
+        backup = dict(self._DEFAULT_BACKUP)
+        backup.update(doc.get('backup', {}))
+        return backup
+
     def _read_file(self, filepath):
         """
         Open and read the local panel file.
@@ -573,13 +931,20 @@ class TomlAppConfig(BaseSystemData):
                    f"file, {str(e)}")
             self._log.critical(msg)
             raise e
+        else:
+            # The data was dumped from a TOML doc so it is known to be good.
+            self._write_cache(self.user_app_config_fullpath,
+                              self._digest(data), None)
 
 
 class TomlCreatePanel(BaseSystemData):
     """
     Create an updated panel Toml file.
+
+    The panel being edited is held in a `PanelIndex` so each edit only
+    touches the widgets involved, the Toml doc is rebuilt when
+    `current_panel` is read after a change.
     """
-    _KEY_NUM = re.compile(r"^.*_(?P<count>\d+)$")
     _last_removed = None
     __panel = None
 
@@ -591,17 +956,27 @@ class TomlCreatePanel(BaseSystemData):
         """
         Returns the Toml doc of the current panel.
         """
-        return self.__panel
+        return self.__panel.commit() if self.__panel else None
 
     @current_panel.setter
     def current_panel(self, current):
         """
-        Make a copy of the Toml doc of the current panel.
+        Make a deep copy of the Toml doc of the current panel, the index
+        changes the widget arrays in place so they must not be shared with
+        the panel config.
 
         :param  current: The current panel's Toml doc.
         :type current: tomlkit.toml_document.TOMLDocument
         """
-        self.__panel = current.copy()
+        self.__panel = PanelIndex(copy.deepcopy(current))
+        self._last_removed = None
+
+    @property
+    def panel_index(self):
+        """
+        The index of the panel that is currently being worked on.
+        """
+        return self.__panel
 
     @property
     def all_field_names(self):
@@ -643,39 +1018,32 @@ class TomlCreatePanel(BaseSystemData):
 
         return items
 
-    def add_name(self, name, key_num=None):
+    def add_name(self, name, before=None):
         """
-        Add the named StaticText and it companion the TextCtrl to the end
-        Toml file. If `key_num` is provided the `key_num is the y coordinate
-        and 0 will be the y continent.
+        Add the named StaticText and it companion the TextCtrl. The
+        GridBagSizer row is set when the panel is committed.
 
         :param str name: The value name of the StaticText widget.
-        :param int key_num: The key number to use.
+        :param str before: The name of the field to add the new field before.
+                           The default is after the last field.
         """
-        assert self.__panel, "Current panel not set."
-
-        if key_num is None:
-            x, y = self._find_widget_gbs_pos(key_num=self._next_widget_num)
-        else:
-            x, y = (key_num, 0)
-
-        key_num = self._next_widget_num
-        key = self._make_key(key_num)
-        self.__panel[key] = [
+        assert self.__panel is not None, "Current panel not set."
+        static_text = [
             'StaticText', 'w_fg_color_1',
             {'args': ['self', 'ID_ANY', name],
              'min': [-1, -1],
              'add': [0, 'ALIGN_BOTTOM | LEFT | RIGHT | TOP', 6],
-             'pos': [x, y],
+             'pos': [0, 0],
              'span': [1, 1]}]
-        key = self._make_key(key_num+1)
-        self.__panel[key] = [
+        text_ctrl = [
             'TextCtrl', 'w_bg_color_1', 'w_fg_color_1',
             {'args': ['self', 'ID_ANY', ''], 'style': 'TE_RIGHT',
              'min': [-1, -1],
              'add': [0, 'ALIGN_CENTER_VERTICAL | LEFT | RIGHT | TOP', 6],
-             'pos': [x, y+1],
+             'pos': [0, 1],
              'span': [1, 1]}]
+        self.__panel.insert([tk.item(static_text), tk.item(text_ctrl)],
+                            before)
 
     def remove_name(self, name):
         """
@@ -684,133 +1052,56 @@ class TomlCreatePanel(BaseSystemData):
 
         :param name: The value name of the StaticText widget.
         :type name: str
+        :returns: A record that can be passed to `restore_name`.
+        :rtype: tuple
         """
-        for key, item in self.__panel.items():
-            list_ = find_dict(item).get('args', [])
-            if name in list_: break
-
-        self._remove_two_consecutive_keys(key)
-        self._last_removed = (key, name)
-
-    def undo_name(self, name):
-        """
-        Undo a removed field.
-
-        :param name: The value name of the StaticText widget.
-        :type name: str
-        """
-        ret = None
-
-        if self._last_removed:
-            old_key, name = self._last_removed
-            self._create_hole(old_key+1)
+        record = self.__panel.remove(name)
+        self._last_removed = (name, record)
+        return record
 
-            #self.add_name(name, row_count)
-            self._last_removed = None
-            new_key = self._make_key(self._next_widget_num())
-
-        return ret
-
-    def _remove_two_consecutive_keys(self, key):
+    def restore_name(self, record):
         """
-        Remove two consecutive keys using the first key as a starting
-        point. This works because we are removing the StaticText widget
-        by name then the TextCtrl that will be right after it.
+        Put a removed field back where it was.
 
-        :param key: The Toml key.
-        :type key: str
+        :param tuple record: The record returned by `remove_name`.
         """
-        key_num = self._find_key_num(key)
-        self.__panel.pop(key, None)
-        second_key = self._make_key(key_num+1)
-        self.__panel.pop(second_key, None)
+        self.__panel.restore(record)
 
-    def _reorder(self, panel):
+    def move_name(self, name, before=None):
         """
-        Re order the items in the Toml doc.
+        Move the named field.
 
-        :param panel: This is the Toml doc for the panel that is being
-                      worked on.
-        :type panel: Toml doc
-        :return: A reordered Toml doc.
-        :rtype: Toml doc
+        :param str name: The value name of the StaticText widget.
+        :param str before: The name of the field to move before. The default
+                           is after the last field.
+        :returns: The record of the old location.
+        :rtype: tuple
         """
-        keys = sorted(list(panel))
-        doc = tk.document()
+        return self.__panel.move(name, before)
 
-        for idx, key in enumerate(keys):
-            value = panel[key]
-            doc[self._make_key(idx)] = value
-
-        return doc
-
-    def _create_hole(self, start):
+    def rename_name(self, old, new):
         """
-        Create a hole in the widget panel. All widgets after the hole
-        will get its key bumped up by two.
+        Rename a field.
 
-        :param start: Where to start the reordering. Should be the widget
-                      set that will be after the hole.
-        :type start: int
+        :param str old: The current name of the StaticText widget.
+        :param str new: The new name of the StaticText widget.
         """
-        doc = tk.document()
-
-        for key, value in self.__panel.item():
-            old_num = self._find_key_num(key)
-
-            if old_num != start:
-                doc[key] = value
-            else:
-                new_key = self._make_key(old_num+1)
-                doc[new_key] = value
+        self.__panel.rename(old, new)
 
-        self.__panel = doc
-
-    @property
-    def _next_widget_num(self):
+    def undo_name(self, name):
         """
-        Get the next widget key to be used when adding a new widget.
+        Undo the last removed field.
 
-        :return: The next widget number.
-        :rtype: int
+        :param name: The value name of the StaticText widget.
+        :type name: str
+        :returns: True if the field was restored.
+        :rtype: bool
         """
-        last_key = list(self.__panel.keys())[-1]
-        return self._find_key_num(last_key) + 1
+        ret = False
 
-    def _find_widget_gbs_pos(self, *, name=None, key_num=None):
-        """
-        Find the GridBagSizer position for either the name or the key number.
+        if self._last_removed and self._last_removed[0] == name:
+            self.restore_name(self._last_removed[1])
+            self._last_removed = None
+            ret = True
 
-        :param name: The value name of the StaticText widget.
-        :type name: str
-        :param key_num: The number of the widget key.
-        :type key_num: int
-        """
-        assert name or key_num is not None, (
-            f"Either the name '{name}' or the key_num '{key_num}' must "
-            "be set.")
-        pos = ()
-
-        if name:
-            for value in self.__panel.value():
-                dict_ = find_dict(value)
-
-                if name in dict_['args']:
-                    pos = dict_['pos']
-                    break
-                elif key_num is not None:
-                    value = self.__panel.get(self._make_key(key_num), [])
-                    assert value, "An invalid key_num was provided."
-                    dict_ = find_dict(value)
-                    pos = dict_['pos']
-                    break
-
-        return pos
-
-    def _find_key_num(self, key):
-        sre = self._KEY_NUM.search(key)
-        assert sre is not None, f"There was an invalid key: {key}."
-        return int(sre.group('count'))
-
-    def _make_key(self, key_num):
-        return f"widget_{key_num:>02}"
+        return ret
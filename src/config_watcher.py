@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+#
+# src/config_watcher.py
+#
+__docformat__ = "restructuredtext en"
+
+import os
+import threading
+from collections import namedtuple
+
+from .config import BaseSystemData
+
+# file:    'panel_config' or 'app_config'.
+# section: The top level table, for example a panel name or 'app_size'.
+# key:     The key in the table, for example 'size', or None if the whole
+#          section was added or removed.
+# doc:     The new doc of the file, it is not in use until it is applied.
+ConfigChange = namedtuple('ConfigChange', ('file', 'section', 'key', 'doc'),
+                          defaults=(None,))
+
+
+class ConfigWatcher(BaseSystemData):
+    """
+    Watch the user panel and app config files for external edits.
+
+    The files are polled on a background thread. Only a `stat` is done on
+    each poll, the file is read and hashed when its mtime or size changed,
+    and it is parsed only when the hash changed. The new doc is compared to
+    a plain copy of the doc in memory, taken on the main thread when the
+    watcher starts and when a doc is applied. A write made by the app itself
+    has its hash in the cache, so it only refreshes the copy and does not
+    cause any notifications. This uses the borg pattern so there is only
+    ever one watcher thread.
+
+    .. note::
+
+       Subscribers are called on the watcher thread, wx code must use
+       `wx.CallAfter`. The watcher never reads or swaps the docs in memory
+       on its thread, the new doc is passed with each change and the
+       subscriber calls `apply` on the main thread.
+    """
+    DEFAULT_INTERVAL = 2.0  # Seconds
+    _FILES = {'panel_config': 'user_config_fullpath',
+              'app_config': 'user_app_config_fullpath'}
+    _interval = DEFAULT_INTERVAL
+    _subscribers = []
+    _state = {}
+    _snapshots = {}
+    _lock = threading.Lock()
+    _stop = threading.Event()
+    _thread = None
+
+    def __init__(self, interval: float=None, *args, **kwargs):
+        """
+        :param float interval: The seconds between polls, the default is
+                               `DEFAULT_INTERVAL`.
+        """
+        super().__init__(*args, **kwargs)
+
+        if interval is not None:
+            ConfigWatcher._interval = interval
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def subscribe(self, callback, file: str=None, section: str=None) -> None:
+        """
+        Subscribe to changes.
+
+        :param callable callback: Called with a `ConfigChange`.
+        :param str file: Only changes to 'panel_config' or 'app_config', the
+                         default is both.
+        :param str section: Only changes to this section, for example a
+                            panel name or 'app_size'.
+        """
+        assert file in (None, *self._FILES), f"Invalid file name '{file}'."
+
+        with self._lock:
+            self._subscribers.append((file, section, callback))
+
+    def unsubscribe(self, callback) -> None:
+        with self._lock:
+            self._subscribers[:] = [sub for sub in self._subscribers
+                                    if sub[2] != callback]
+
+    def start(self) -> None:
+        """
+        Start watching, the current files are the base line. This must be
+        called on the main thread.
+        """
+        if not self.running:
+            for file in self._FILES:
+                self._snapshot(file, self._get_sys_file(file))
+                self._poll(file)
+
+            self._stop.clear()
+            ConfigWatcher._thread = threading.Thread(
+                target=self._run, name='ConfigWatcher', daemon=True)
+            self._thread.start()
+            self._log.info("Watching the config files every %s seconds.",
+                           self._interval)
+
+    def stop(self) -> None:
+        self._stop.set()
+
+        if self.running:
+            self._thread.join(self._interval + 1)
+
+        ConfigWatcher._thread = None
+
+    def check(self) -> list:
+        """
+        Check the files once and notify the subscribers of any changes.
+
+        :returns: The changes that were found.
+        :rtype: list
+        """
+        changes = []
+
+        for file in self._FILES:
+            changes.extend(self._poll(file))
+
+        for change in changes:
+            self._dispatch(change)
+
+        return changes
+
+    def apply(self, file: str, doc, keep: tuple=()) -> None:
+        """
+        Swap in the new doc of a file. This must be called on the main
+        thread, which is the only one using the docs.
+
+        :param str file: Either 'panel_config' or 'app_config'.
+        :param doc: The new doc from a `ConfigChange`.
+        :type doc: tomlkit.toml_document.TOMLDocument
+        :param tuple keep: The sections whose doc in memory is kept, for
+                           example a panel with unsaved edits.
+        """
+        assert file in self._FILES, f"Invalid file name '{file}'."
+        old = self._get_sys_file(file)
+
+        for section in keep:
+            if old is not None and section in old:
+                doc[section] = old[section].copy()
+            elif section in doc:
+                del doc[section]
+
+        setattr(self, file, doc)
+        self._snapshot(file, doc)
+        self._log.info("Applied the edit to %s.", file)
+
+    #
+    # Internal methods
+    #
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            try:
+                self.check()
+            except Exception as e:
+                self._log.error("The config watcher failed, %s", e,
+                                exc_info=True)
+
+    def _snapshot(self, file: str, doc) -> None:
+        """
+        Keep a plain copy of a doc to compare the edits to.
+        """
+        snapshot = doc.unwrap() if doc is not None else {}
+
+        with self._lock:
+            self._snapshots[file] = snapshot
+
+    def _poll(self, file: str) -> list:
+        """
+        Check one file, the first time a file is seen it is only recorded.
+        """
+        path = getattr(self, self._FILES[file])
+        changes = []
+
+        try:
+            st = os.stat(path)
+        except OSError:
+            return changes
+
+        stat = (st.st_mtime_ns, st.st_size)
+        old = self._state.get(file)
+
+        if old and old[0] == stat:
+            return changes
+
+        raw_doc, error = self._read_raw(path, log=False)
+
+        if error:
+            return changes
+
+        digest = self._digest(raw_doc)
+        self._state[file] = (stat, digest)
+
+        if old and old[1] != digest:
+            doc = self._parse_raw(raw_doc, path)
+
+            if isinstance(doc, int):
+                self._log.warning("Ignoring the invalid edit to %s.", path)
+            elif self._read_cache(path).get('hash') == digest:
+                # Written by the app itself.
+                self._snapshot(file, doc)
+            else:
+                with self._lock:
+                    snapshot = self._snapshots.get(file, {})
+
+                changes = self._diff(file, snapshot, doc)
+
+                if changes:
+                    self._write_cache(path, digest, None)
+                    self._log.info("Read %s, %s change(s).", path,
+                                   len(changes))
+
+        return changes
+
+    def _diff(self, file: str, old: dict, doc) -> list:
+        """
+        Find the sections and keys that changed between the plain copy of
+        the old doc and the new doc.
+        """
+        new = doc.unwrap()
+        changes = []
+
+        for section in sorted(old.keys() | new.keys()):
+            old_sec = old.get(section)
+            new_sec = new.get(section)
+
+            if old_sec == new_sec:
+                continue
+
+            if isinstance(old_sec, dict) and isinstance(new_sec, dict):
+                for key in sorted(old_sec.keys() | new_sec.keys()):
+                    if old_sec.get(key) != new_sec.get(key):
+                        changes.append(ConfigChange(file, section, key, doc))
+            else:
+                changes.append(ConfigChange(file, section, None, doc))
+
+        return changes
+
+    def _dispatch(self, change: ConfigChange) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+
+        for file, section, callback in subscribers:
+            if file in (None, change.file) and section in (None,
+                                                           change.section):
+                try:
+                    callback(change)
+                except Exception as e:
+                    self._log.error("Config change subscriber failed, %s",
+                                    e, exc_info=True)
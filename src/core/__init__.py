@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+#
+# src/core/__init__.py
+#
+"""
+The data and service core of the application, the database schema, the
+fiscal year logic, value conversion, and the queries. Nothing in this
+package may import wx so that scripts, batch jobs, and tests can open the
+books without starting a wx application. The GUI classes are thin adapters
+that mix the panel handling into these classes.
+"""
+__docformat__ = "restructuredtext en"
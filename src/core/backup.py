@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+#
+# src/core/backup.py
+#
+__docformat__ = "restructuredtext en"
+
+import os
+import gzip
+import time
+import shutil
+import sqlite3
+import threading
+import tempfile
+from datetime import datetime, timezone
+
+from ..config import Settings
+from ..instrument import Instrumentation
+
+
+class BackupManager(Settings):
+    """
+    Take snapshots of the live database with the SQLite backup API.
+
+    The pages are copied a few at a time with a pause between the steps so
+    the app can keep using the database, writes made during a backup only
+    restart it. Each snapshot is checked with `PRAGMA quick_check`,
+    compressed and kept in the backup directory next to the database, the
+    oldest are removed when there are more than `keep`. Snapshots are
+    taken on a background thread every `interval` seconds, counted from
+    the newest snapshot so the schedule survives restarts. This uses the
+    borg pattern so there is only ever one backup thread.
+    """
+    DEFAULT_INTERVAL = 24 * 60 * 60  # Seconds
+    DEFAULT_KEEP = 7
+    DEFAULT_PAGES = 256
+    DEFAULT_SLEEP = 0.05  # Seconds between the steps.
+    DEFAULT_RETRY = 60    # Seconds to wait for a new database.
+    _EXT = '.sqlite3.gz'
+    _interval = DEFAULT_INTERVAL
+    _keep = DEFAULT_KEEP
+    _pages = DEFAULT_PAGES
+    _backup_lock = threading.Lock()
+    _stop = threading.Event()
+    _thread = None
+
+    def __init__(self, interval: float=None, keep: int=None,
+                 pages: int=None, *args, **kwargs):
+        """
+        :param float interval: The seconds between snapshots.
+        :param int keep: The number of snapshots kept.
+        :param int pages: The pages copied in each step.
+        """
+        super().__init__(*args, **kwargs)
+
+        if interval is not None:
+            assert interval > 0, (
+                f"The interval must be positive, found {interval}.")
+            BackupManager._interval = interval
+
+        if keep is not None:
+            assert keep > 0, (
+                f"At least one snapshot must be kept, found {keep}.")
+            BackupManager._keep = keep
+
+        if pages is not None:
+            assert pages > 0, (
+                f"The pages per step must be positive, found {pages}.")
+            BackupManager._pages = pages
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def snapshots(self) -> list:
+        """
+        The snapshots of the database, oldest first.
+
+        :rtype: list
+        """
+        path = self.user_backup_dir
+        prefix = f"{self._stem}-"
+
+        if path and os.path.isdir(path):
+            names = sorted(name for name in os.listdir(path)
+                           if name.startswith(prefix)
+                           and name.endswith(self._EXT))
+        else:
+            names = []
+
+        return [os.path.join(path, name) for name in names]
+
+    def start(self) -> None:
+        """
+        Start taking snapshots on a background thread.
+        """
+        if not self.running:
+            self._stop.clear()
+            BackupManager._thread = threading.Thread(
+                target=self._run, name='BackupManager', daemon=True)
+            self._thread.start()
+            self._log.info("Backing up %s every %s seconds.",
+                           self.user_data_fullpath, self._interval)
+
+    def stop(self) -> None:
+        """
+        Stop the thread, a backup in progress is abandoned.
+        """
+        self._stop.set()
+
+        if self.running:
+            self._thread.join(self.DEFAULT_SLEEP * 10 + 1)
+
+        BackupManager._thread = None
+
+    def backup(self) -> str:
+        """
+        Take a snapshot now.
+
+        :returns: The full path to the compressed snapshot.
+        :rtype: str
+        :raises sqlite3.DatabaseError: If the snapshot fails its check.
+        """
+        assert self.user_backup_dir, (
+            "The memory data backend cannot be backed up.")
+        assert os.path.exists(self.user_data_fullpath), (
+            f"The database {self.user_data_fullpath} does not exist.")
+
+        with self._backup_lock:
+            start = time.perf_counter()
+            os.makedirs(self.user_backup_dir, exist_ok=True)
+            stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%fZ')
+            path = os.path.join(self.user_backup_dir,
+                                f"{self._stem}-{stamp}{self._EXT}")
+            fd, tmp = tempfile.mkstemp(suffix='.sqlite3',
+                                       dir=self.user_backup_dir)
+            os.close(fd)
+
+            try:
+                with Instrumentation().measure('backup') as result:
+                    result['rows'] = self._copy(tmp)
+
+                check = self._quick_check(tmp)
+
+                if check != 'ok':
+                    raise sqlite3.DatabaseError(
+                        f"The snapshot of {self.user_data_fullpath} failed "
+                        f"its check, {check}.")
+
+                self._compress(tmp, path)
+            finally:
+                os.remove(tmp)
+
+            self.rotate()
+
+        self._log.info("Backed up %s to %s in %0.4f seconds.",
+                       self.user_data_fullpath, path,
+                       time.perf_counter() - start)
+        return path
+
+    def verify(self, path: str) -> str:
+        """
+        Check a compressed snapshot.
+
+        :param str path: The snapshot.
+        :returns: 'ok' or the problems found.
+        :rtype: str
+        """
+        fd, tmp = tempfile.mkstemp(suffix='.sqlite3')
+
+        try:
+            with os.fdopen(fd, 'wb') as dst, gzip.open(path, 'rb') as src:
+                shutil.copyfileobj(src, dst)
+
+            check = self._quick_check(tmp)
+        except (OSError, EOFError, sqlite3.DatabaseError) as e:
+            check = str(e)
+        finally:
+            os.remove(tmp)
+
+        return check
+
+    def rotate(self) -> list:
+        """
+        Remove the oldest snapshots over `keep`.
+
+        :returns: The snapshots removed.
+        :rtype: list
+        """
+        removed = self.snapshots[:-self._keep]
+
+        for path in removed:
+            os.remove(path)
+            self._log.info("Removed the old snapshot %s.", path)
+
+        return removed
+
+    #
+    # Internal methods
+    #
+
+    @property
+    def _stem(self) -> str:
+        return os.path.splitext(os.path.basename(self.user_data_fullpath))[0]
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._next_wait()):
+            if not os.path.exists(self.user_data_fullpath):
+                continue
+
+            try:
+                self.backup()
+            except InterruptedError:
+                self._log.info("The backup was stopped.")
+            except Exception as e:
+                self._log.error("The backup failed, %s", e, exc_info=True)
+                self._stop.wait(self._interval)
+
+    def _next_wait(self) -> float:
+        """
+        The seconds until the next snapshot is due.
+        """
+        snapshots = self.snapshots
+        wait = 0
+
+        if not os.path.exists(self.user_data_fullpath):
+            wait = self.DEFAULT_RETRY
+        elif snapshots:
+            wait = max(0, os.path.getmtime(snapshots[-1]) + self._interval
+                       - time.time())
+
+        return wait
+
+    def _copy(self, target: str) -> int:
+        """
+        Copy the database a step at a time.
+
+        :returns: The number of pages copied.
+        :rtype: int
+        """
+        pages = []
+        src = sqlite3.connect(self.user_data_fullpath)
+        dst = sqlite3.connect(target)
+
+        def progress(status, remaining, total):
+            if self._stop.is_set() and threading.current_thread() is (
+                    self._thread):
+                raise InterruptedError("The backup was stopped.")
+
+            pages[:] = [total]
+
+        try:
+            src.backup(dst, pages=self._pages, progress=progress,
+                       sleep=self.DEFAULT_SLEEP)
+        finally:
+            dst.close()
+            src.close()
+
+        return pages[0] if pages else 0
+
+    def _quick_check(self, path: str) -> str:
+        con = sqlite3.connect(path)
+
+        try:
+            return '\n'.join(row[0] for row in con.execute(
+                "PRAGMA quick_check;"))
+        finally:
+            con.close()
+
+    def _compress(self, source: str, path: str) -> None:
+        tmp = f"{path}.tmp"
+
+        with open(source, 'rb') as src, gzip.open(tmp, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+
+        os.replace(tmp, path)
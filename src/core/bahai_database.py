@@ -0,0 +1,597 @@
+# -*- coding: utf-8 -*-
+#
+# src/core/bahai_database.py
+#
+__docformat__ = "restructuredtext en"
+
+from .base_database import BaseDatabase
+from .utilities import ordered_month
+from ..clock import TransactionClock
+from ..lazy_import import call_once
+
+import datetime
+import badidatetime
+
+
+@call_once
+def enable_geocoder():
+    """
+    Enable the badidatetime geocoder the first time a location is looked up
+    instead of at import time.
+    """
+    badidatetime.enable_geocoder()
+
+
+class Database(BaseDatabase):
+    """
+    Create, and update the database for the Bahá'í Bookkeeping application.
+    """
+    CONFIG_DATA_BATCH = 1000  # Rows fetched at a time by iter_config_data.
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+    def _default_clock(self):
+        """
+        The default clock creates short form Badí' date times.
+
+        :returns: The default clock object.
+        :rtype: TransactionClock
+        """
+        return TransactionClock(
+            lambda tz: badidatetime.datetime.now(tz, short=True))
+
+    async def select_from_fiscal_year_table(self, *, year: int=None,
+                                            month: int=None, day: int=None,
+                                            current: int=None,
+                                            work_on: int=None, audit: int=None
+                                            ) -> list:
+        """
+        Select from the `fiscal_year` table. Only the year is needed to
+        select the correct row of data.
+
+        :param int year: The `year` is used to query for a given year.
+        :param int month: The `month` is used to query a given month in
+                          all years.
+        :param int day: The `day` is used to query for a given day in
+                        all years and months.
+        :param int current: This will return the current fiscal year if `1`
+                            or the next year if `0`. If set to `None`
+                            (default) then do a query for the provided year.
+        :param int work_on: The `work_on` is used to switch the fiscal year
+                            that is being worked on..
+        :param int audit: The `audit` is used to query all years audited or
+                          not audited.
+        :returns: The `fiscal_year` table data for the year requested.
+        :rtype: list
+        """
+        assert (year, month, day, current,
+                work_on, audit).count(None) in (5, 6), (
+            "Can only query for one of (year, month, day, current, audit, "
+            "work_on) or none meaning all.")
+
+        if year:       # Get just the one year.
+            where = f"WHERE year={year}"
+        elif month:    # Get all years with this month.
+            where = f"WHERE month={month}"
+        elif day:      # Get all years and month with this day.
+            where = f"WHERE day={day}"
+        elif current:  # Get the current fiscal year.
+            where = f"WHERE current={current}"
+        elif work_on:  # Switch years to work on.
+            where = f"WHERE work_on={work_on}"
+        elif audit:    # Get all years that have or have not been audited.
+            where = f"WHERE audit={audit}"
+        else:          # Get all fiscal years.
+            where = ""
+
+        query = (f"SELECT * FROM {self._T_FISCAL_YEAR} {where};")
+        return await self._do_select_query(query)
+
+    async def insert_into_fiscal_year_table(self, data: list) -> None:
+        """
+        Insert a row of data into the `fiscal_year` table.
+
+        :param list data: The data to be inserted.
+        """
+        now = self.clock.isoformat(self.tzinfo)
+        items = [t + (now, now) for t in data]  # Add the times to the end.
+        query = (f"INSERT INTO {self._T_FISCAL_YEAR} (year, month, day, "
+                 "current, work_on, audit, c_time, m_time) "
+                 "VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+        await self._do_insert_query(query, items)
+
+    async def update_fiscal_year_table(self, data: list) -> None:
+        """
+        Update the `fiscal_year` table. Only the year and current values
+        are needed to do updates.
+
+        :param list data: The data to be updated.
+
+        .. note::
+
+           Incoming data:
+           From the fiscal year table:
+           [(year, month, day, current, work_on, audit, current), ...]
+           From the fiscal panel:
+           [(current_fiscal_year, work_on_this_fiscal_year,
+             audit_complete), ...]
+        """
+        now = self.clock.isoformat(self.tzinfo)
+        query = (f"UPDATE {self._T_FISCAL_YEAR} "
+                 "SET current = :current, work_on = :work_on, audit = :audit, "
+                 "m_time = :m_time WHERE year = :year")
+        items = [{'year': item[0], 'current': item[3], 'work_on': item[4],
+                  'audit': item[5], 'm_time': now} for item in data]
+        await self._do_update_query(query, items)
+
+    #
+    # Month SELECT and INSERT methods.
+    #
+
+    async def select_from_month_table(self, *, name: str=None, order: int=None
+                                      ) -> list:
+        """
+        Select from the `month` table.
+        """
+        assert ((name and not order) or (not name and order)
+                or (not name and not order)), (
+                "Cannot query for both the 'name' and 'order'.")
+
+        if name:
+            where = f"WHERE month={name}"
+        elif order:
+            where = f"WHERE ord={order}"
+        else:
+            where = ""
+
+        query = (f"SELECT * FROM {self._T_MONTH} {where}")
+        return await self._do_select_query(query)
+
+    async def insert_into_month_table(self, months: dict) -> None:
+        """
+        Insert into the `month` table.
+
+        :param list months: A dict where the key is the order of the month
+                            and the value is the month name.
+        """
+        now = self.clock.isoformat(self.tzinfo)
+        data = [(name, order, now, now) for order, name in months.items()]
+        query = (f"INSERT INTO {self._T_MONTH} (month, ord, c_time, m_time) "
+                 "VALUES (?, ?, ?, ?)")
+        await self._do_insert_query(query, data)
+
+    #
+    # Field Names SELECT, INSERT and, UPDATE methods.
+    #
+
+    async def select_from_field_type_table(self, data: dict) -> list:
+        """
+        Select from the field_type table.
+
+        :param dict data: The data from the Organization Information panel in
+                          the form of: {<field name>: <value>,...}.
+        :returns: The values read from the FieldType table in the form of
+                  [(<pk>, <field>, <rids>, <c_time>, <m_time>), ...].
+        :rtype: list of tuples
+        """
+        assert data, f"There must be valid data, found '{data}'."
+        fields = '", "'.join(data)
+        query = (f'SELECT * FROM {self._T_FIELD_TYPE} WHERE field IN '
+                 f'("{fields}");')
+        return await self._do_select_query(query)
+
+    async def insert_into_field_type_table(self, fields: set) -> None:
+        """
+        Insert fields into the field_type table.
+
+        :param set fields: The fields from any panel in the form of:
+                           {<field name>,...}.
+        """
+        now = self.clock.isoformat(self.tzinfo)
+        data = [(field, now, now) for field in fields]
+        query = (f"INSERT INTO {self._T_FIELD_TYPE} (field, c_time, m_time) "
+                 "VALUES (?, ?, ?)")
+        await self._do_insert_query(query, data)
+
+    #
+    # Data SELECT, INSERT and, UPDATE methods.
+    #
+
+    async def select_from_config_data_table(self, data: dict,
+                                            year: int=None) -> list:
+        """
+        Reads a row or rows from the `data` table. An archived year is read
+        from its archive, without a year only the database is read.
+
+        :param int year: A Baha'i year used to select the current fiscal year.
+        :param dict data: The data from the any panel in the form of:
+                          {<field name>: <value>,...}.
+        :returns: A list of rows from the Data table.
+        :rtype: list
+
+        .. note::
+
+           Produces output as follows for the `organization` panel:
+           [(1, 'locale_name', 'Some Community', 182, 183,
+             '0182-02-12T05:26:40.963200+00:00',
+             '0182-02-12T05:26:40.963200+00:00'),
+            (2, 'locality_prefix', 0, 182, 183,
+             '0182-02-12T05:26:40.963200+00:00',
+             '0182-02-12T05:26:40.963200+00:00'),
+            (3, 'location_city_name', 'Some City', 182, 183,
+             '0182-02-12T05:27:17.251199+00:00',
+             '0182-02-12T05:27:17.251199+00:00'),
+            (4, 'start_of_fiscal_year', '0182-02-19', 182, 183,
+             '0182-02-12T05:27:17.251199+00:00',
+             '0182-02-12T05:27:17.251199+00:00'),
+            (5, 'total_membership', '35', 182, 183,
+             '0182-02-12T05:27:17.251199+00:00',
+             '0182-02-12T05:27:17.251199+00:00'),
+            (6, 'treasurer', 'Joe Shmow', 182, 183,
+             '0182-02-12T05:27:17.251199+00:00',
+             '0182-02-12T05:27:17.251199+00:00')
+           ]
+        """
+        field_names = list(data.keys())
+        fields = '", "'.join(field_names)
+        table, archives = self._config_data_source(year)
+
+        if year:
+            params = (year, year+1)
+            query = (
+                "SELECT d.pk, f.field, d.value, y1.year, y2.year, "
+                "       d.c_time, d.m_time "
+                f"FROM {table} AS d "
+                f"JOIN {self._T_FIELD_TYPE} AS f ON f.pk = d.ffk "
+                f"     AND f.field IN (\"{fields}\") "
+                f"JOIN {self._T_FISCAL_YEAR} AS y1 ON y1.pk = d.fy1fk "
+                "      AND y1.year = ? "
+                f"JOIN {self._T_FISCAL_YEAR} AS y2 ON y2.pk = d.fy2fk "
+                "      AND y2.year = ? "
+                )
+        else:
+            params = ()
+            query = (
+                "SELECT d.pk, f.field, d.value, d.c_time, d.m_time "
+                f"FROM {self._T_DATA} AS d "
+                f"JOIN {self._T_FIELD_TYPE} AS f ON f.pk = d.ffk "
+                f"     AND f.field IN (\"{fields}\");"
+                )
+
+        return await self._do_select_query(query, params, archives)
+
+    async def insert_into_config_data_table(self, year: int, month: int,
+                                            data: dict) -> None:
+        """
+        Insert values into the Data table.
+
+        .. note::
+
+           Incoming data:
+           {<field_name>: value, ...}
+
+        :param int year: A Baha'i year of the transaction.
+        :param int month: A Baha'i month of the transaction. This is the order
+                          of the Baha'i month not the name.
+        :param dict data: The data from the any panel  in the form of:
+                          {<field name>: <value>,...}.
+        """
+        fy1 = await self.select_from_fiscal_year_table(current=1)
+
+        if fy1:
+            now = self.clock.isoformat(self.tzinfo)
+            f_items = await self.select_from_field_type_table(data)
+            f_month = await self.select_from_month_table(order=month)
+            fy2 = await self.select_from_fiscal_year_table(year=fy1[0][1]+1)
+
+            query = (
+                f"INSERT INTO {self._T_DATA} (value, fy1fk, fy2fk, mfk, ffk, "
+                "c_time, m_time) VALUES (:value, :fy1fk, :fy2fk, :mfk, :ffk, "
+                ":c_time, :m_time);"
+                )
+            values = []
+
+            for item in f_items:
+                pk, field, c_time, m_time = item
+                mfk = f_month[0][0]
+                fy1fk = fy1[0][0]  # We want the FK not the year.
+                fy2fk = fy2[0][0]  # We want the FK not the year.
+                values.append({'value': data[field], 'fy1fk': fy1fk,
+                               'fy2fk': fy2fk, 'mfk': mfk, 'ffk': pk,
+                               'c_time': now, 'm_time': now})
+
+            await self._do_insert_query(query, values)
+        else:
+            self._log.error("No current fiscal_year data in the database.")
+
+    async def update_config_data_table(self, year: int, month: int, data: list,
+                                       panel: str=None) -> None:
+        """
+        Update the `data` table. Each value that changes gets a row in the
+        journal in the same transaction.
+
+        .. note::
+
+           Incoming data:
+           {pk: value, <field_name>: value, ...}
+
+        :param int year: A Baha'i year of the transaction.
+        :param int month: A Baha'i month of the transaction. This is the order
+                          of the Baha'i month not the name.
+        :param list data: The data from the any panel  in the form of:
+                          [(pk, <value>), ...}.
+        :param str panel: The panel the data is from, for the journal.
+        """
+        m_time = self.clock.isoformat(self.tzinfo)
+        query = (f"UPDATE {self._T_DATA} SET value = :value, "
+                 "m_time = :m_time WHERE pk = :pk;")
+        items = [{'pk': pk, 'value': value, 'm_time': m_time}
+                 for pk, value in data]
+        await self._do_update_query(query, items, panel=panel)
+
+    #
+    # Batch SELECT methods.
+    #
+
+    async def select_all_config_data(self, year: int=None) -> list:
+        """
+        Select the values of every field for one or all fiscal years,
+        archived years included.
+
+        :param int year: A Baha'i year, the default is all years.
+        :returns: The values in the form of [(<year>, <month order>,
+                  <month name>, <field name>, <value>), ...] ordered by
+                  year, month and field.
+        :rtype: list
+        """
+        values = []
+
+        for query, params, archives in await self._all_config_data_queries(
+                year):
+            values += await self._do_select_query(query, params, archives)
+
+        return values
+
+    async def iter_config_data(self, year: int=None,
+                               batch_size: int=CONFIG_DATA_BATCH):
+        """
+        Iterate over the same rows as `select_all_config_data` in batches,
+        the rows are fetched from the cursor as they are needed so only one
+        batch is ever in memory.
+
+        :param int year: A Baha'i year, the default is all years.
+        :param int batch_size: The number of rows in each batch.
+        :returns: An async generator of lists of rows.
+        :rtype: AsyncGenerator
+        """
+        assert batch_size > 0, (
+            f"The batch size must be positive, found {batch_size}.")
+
+        for query, params, archives in await self._all_config_data_queries(
+                year):
+            async with self._connect_archives(archives) as db:
+                async with db.execute(query, params) as cursor:
+                    while rows := await cursor.fetchmany(batch_size):
+                        yield rows
+
+    async def _all_config_data_queries(self, year: int=None) -> list:
+        """
+        The queries for one or all years. When years have been archived
+        each year is read on its own to keep them in order.
+
+        :returns: A list of (<query>, <params>, <archives>) tuples.
+        :rtype: list
+        """
+        if year or not self.archived_years:
+            years = (year,)
+        else:
+            years = [item[0] for item in await self._do_select_query(
+                f"SELECT year FROM {self._T_FISCAL_YEAR} ORDER BY year;")]
+
+        return [self._all_config_data_query(year) for year in years]
+
+    def _all_config_data_query(self, year: int=None) -> tuple:
+        table, archives = self._config_data_source(year)
+        where = "WHERE y.year = ? " if year else ""
+        params = (year,) if year else ()
+        query = (
+            "SELECT y.year, m.ord, m.month, f.field, d.value "
+            f"FROM {table} AS d "
+            f"JOIN {self._T_FISCAL_YEAR} AS y ON y.pk = d.fy1fk "
+            f"JOIN {self._T_MONTH} AS m ON m.pk = d.mfk "
+            f"JOIN {self._T_FIELD_TYPE} AS f ON f.pk = d.ffk "
+            f"{where}ORDER BY y.year, m.ord, f.field, d.pk;"
+            )
+        return query, params, archives
+
+    def _config_data_source(self, year: int=None) -> tuple:
+        """
+        Find the `config_data` table that holds a year.
+
+        :param int year: A Baha'i year, None is the hot database.
+        :returns: The table name and the archived years to attach.
+        :rtype: tuple
+        """
+        if year and year in self.archived_years:
+            source = f"arc_{int(year)}.{self._T_DATA}", (year,)
+        else:
+            source = self._T_DATA, ()
+
+        return source
+
+    async def select_year_summary(self) -> list:
+        """
+        Summarize each fiscal year, the values of archived years are
+        counted in their archives.
+
+        :returns: A list of (<year>, <current>, <work_on>, <audit>,
+                  <number of values>) tuples ordered by year.
+        :rtype: list
+        """
+        query = (
+            "SELECT y.year, y.current, y.work_on, y.audit, COUNT(d.pk) "
+            f"FROM {self._T_FISCAL_YEAR} AS y "
+            f"LEFT JOIN {self._T_DATA} AS d ON d.fy1fk = y.pk "
+            "GROUP BY y.pk ORDER BY y.year;"
+            )
+        summary = await self._do_select_query(query)
+        counts = {}
+
+        for year in self.archived_years:
+            counts[year] = (await self._do_select_query(
+                f"SELECT COUNT(*) FROM arc_{year}.{self._T_DATA};",
+                archives=(year,)))[0][0]
+
+        return [item[:4] + (item[4] + counts.get(item[0], 0),)
+                for item in summary]
+
+    #
+    # Journal SELECT methods.
+    #
+
+    async def select_journal(self, year: int, month: int=None,
+                             field: str=None) -> list:
+        """
+        Select the changes made to the values of a fiscal year.
+
+        :param int year: A Baha'i year.
+        :param int month: Only the changes to this month order.
+        :param str field: Only the changes to this field.
+        :returns: The changes in the form of [(<year>, <month order>,
+                  <field name>, <old value>, <new value>, <panel>,
+                  <m_time>), ...] oldest first.
+        :rtype: list
+        """
+        where, params = ["y.year = ?"], [year]
+
+        if month is not None:
+            where.append("m.ord = ?")
+            params.append(month)
+
+        if field is not None:
+            where.append("f.field = ?")
+            params.append(field)
+
+        query = (
+            "SELECT y.year, m.ord, f.field, j.old, j.new, j.panel, j.m_time "
+            f"FROM {self._T_JOURNAL} AS j "
+            f"JOIN {self._T_FISCAL_YEAR} AS y ON y.pk = j.fy1fk "
+            f"JOIN {self._T_MONTH} AS m ON m.pk = j.mfk "
+            f"JOIN {self._T_FIELD_TYPE} AS f ON f.pk = j.ffk "
+            f"WHERE {' AND '.join(where)} ORDER BY j.pk;"
+            )
+        # The times may have different UTC offsets, so they are not
+        # ordered as strings.
+        return sorted(await self._do_select_query(query, tuple(params)),
+                      key=lambda item: self._utc_timestamp(item[6]))
+
+    async def select_value_at(self, year: int, month: int, field: str,
+                              when: str) -> str:
+        """
+        Find the value a field had at a point in time.
+
+        :param int year: A Baha'i year.
+        :param int month: The order of the Baha'i month.
+        :param str field: The field name.
+        :param when: An ISO date and time in the same form as the
+                     `c_time` and `m_time` columns or a date time object,
+                     the times are compared in UTC.
+        :type when: str or datetime
+        :returns: The value or None if it had not been entered yet.
+        :rtype: str
+        """
+        when = self._utc_timestamp(when)
+        history = await self.select_journal(year, month, field)
+        table, archives = self._config_data_source(year)
+        query = (
+            "SELECT d.value, d.c_time "
+            f"FROM {table} AS d "
+            f"JOIN {self._T_FISCAL_YEAR} AS y ON y.pk = d.fy1fk "
+            f"JOIN {self._T_MONTH} AS m ON m.pk = d.mfk "
+            f"JOIN {self._T_FIELD_TYPE} AS f ON f.pk = d.ffk "
+            "WHERE y.year = ? AND m.ord = ? AND f.field = ?;"
+            )
+        current = await self._do_select_query(query, (year, month, field),
+                                              archives)
+        value = None
+
+        if current and self._utc_timestamp(current[0][1]) <= when:
+            # Before the first change it held the value it was entered with.
+            value = history[0][3] if history else current[0][0]
+
+        for item in history:
+            if self._utc_timestamp(item[6]) <= when:
+                value = item[4]
+
+        return value
+
+    #
+    # Miscellaneous methods
+    #
+
+    @staticmethod
+    def _utc_timestamp(value) -> float:
+        """
+        Convert a stored time to UTC seconds so times with different UTC
+        offsets can be compared. A time without an offset is taken as UTC.
+
+        :param value: An ISO date and time, Badí' or Gregorian, or a date
+                      time object.
+        :type value: str or datetime
+        :returns: The seconds since the epoch.
+        :rtype: float
+        """
+        if isinstance(value, str):
+            try:
+                value = badidatetime.datetime.fromisoformat(value)
+            except (AssertionError, ValueError):
+                # A Gregorian year past the end of the Badí' calendar.
+                value = datetime.datetime.fromisoformat(value)
+
+        if value.tzinfo is None:
+            utc = (datetime.timezone.utc
+                   if isinstance(value, datetime.datetime)
+                   else badidatetime.timezone.utc)
+            value = value.replace(tzinfo=utc)
+
+        return value.timestamp()
+
+    def _find_timezone(self, address: str):
+        """
+        Find the IANA timezone name, latitude, and longitude. The
+        badidatetime geocoder is enabled on first use.
+
+        :param str address: The address, City, or town used to find the
+                            required information.
+        :returns: The IANA timezone name, latitude, and longitude.
+        :rtype: tuple
+        """
+        enable_geocoder()
+        return super()._find_timezone(address)
+
+    def _ordered_month(self):
+        """
+        Provides the order of the Badi months from the core utilities module.
+        Called in the BaseBatabase class.
+        """
+        return ordered_month()
+
+    def _convert_date_to_yymmdd(self, value):
+        """
+        Converts the ISO date string to a tuple containing the
+        (year, month, day).
+
+        :param str value: A ISO formatting date string.
+        """
+        return badidatetime.date.fromisoformat(value, short=True)
+
+    def _ymd_from_iso(self, iso: str) -> tuple:
+        """
+        Convert the ISO string to (year, month, day).
+
+        :param str iso: The ISO date string.
+        :returns: The year, month, and day from an ISO string.
+        :rtype: tuple
+        """
+        return badidatetime.date.fromisoformat(iso, short=True).b_date
@@ -0,0 +1,1174 @@
+# -*- coding: utf-8 -*-
+#
+# src/core/base_database.py
+#
+__docformat__ = "restructuredtext en"
+
+import os
+import sqlite3
+import aiosqlite
+
+from contextlib import asynccontextmanager
+from urllib.request import pathname2url
+from zoneinfo import ZoneInfo
+
+from ..config import Settings
+from ..clock import TransactionClock
+from ..instrument import Instrumentation
+from ..lazy_import import lazy_import
+from .values import ValueConversion
+from .digest import DigestTree
+
+# These are only needed when the organization's location changes.
+geocoders = lazy_import('geopy.geocoders')
+geopy_exc = lazy_import('geopy.exc')
+timezonefinder = lazy_import('timezonefinder')
+
+
+class BaseDatabase(ValueConversion, Settings):
+    """
+    This class provides the commonly used method for all basebase
+    configurations. It works on plain dicts of field values, the panels
+    are handled by the GUI adapter in `src.base_database`.
+
+    https://sqlite.org/
+    https://www.w3schools.com/sql/
+    https://docs.wxpython.org/
+    """
+    _T_FISCAL_YEAR = 'fiscal_year'
+    _T_MONTH = 'month'
+    _T_FIELD_TYPE = 'field_type'
+    _T_REPORT_TYPE = 'report_type'
+    _T_DATA = 'config_data'
+    _T_REPORT_PIVOT = 'report_pivot'
+    _T_SYNC_STATE = 'sync_state'
+    _T_CHANGE_LOG = 'change_log'
+    _T_DIGEST = 'digest'
+    _T_JOURNAL = 'journal'
+    _SCHEMA = (
+        (_T_FISCAL_YEAR,
+         'pk INTEGER NOT NULL PRIMARY KEY',  # fy1fk or fy2fk in data
+         'year INTEGER UNIQUE NOT NULL',
+         'month INTEGER NOT NULL',
+         'day INTEGER NOT NULL',
+         'current INTEGER NOT NULL',
+         'work_on INTEGER NOT NULL',
+         'audit INTEGER NOT NULL',
+         'c_time TEXT NOT NULL',
+         'm_time TEXT NOT NULL'),
+        (_T_MONTH,
+         'pk INTEGER NOT NULL PRIMARY KEY',  # mfk in data
+         'month TEXT UNIQUE NOT NULL',
+         'ord INTEGER UNIQUE NOT NULL',
+         'c_time TEXT NOT NULL',
+         'm_time TEXT NOT NULL'),
+        (_T_FIELD_TYPE,
+         'pk INTEGER NOT NULL PRIMARY KEY',  # ffk in data
+         'field TEXT UNIQUE NOT NULL',
+         'c_time TEXT NOT NULL',
+         'm_time TEXT NOT NULL'),
+        (_T_DATA,
+         'pk INTEGER NOT NULL PRIMARY KEY',  # dfk in report_pivot
+         'value TEXT NOT NULL',
+         'fy1fk INTEGER NOT NULL',
+         'fy2fk INTEGER NOT NULL',
+         'mfk INTEGER NOT NULL',
+         'ffk INTEGER NOT NULL',
+         'c_time TEXT NOT NULL',
+         'm_time TEXT NOT NULL'),
+        (_T_REPORT_TYPE,
+         'pk INTEGER NOT NULL PRIMARY KEY',  # rfk in report_pivot
+         'report TEXT UNIQUE NOT NULL',
+         'c_time TEXT NOT NULL',
+         'm_time TEXT NOT NULL'),
+        (_T_REPORT_PIVOT,
+         'rfk INTERGER NOT NULL',
+         'dfk INTEGER NOT NULL',
+         f'FOREIGN KEY (rfk) REFERENCES {_T_REPORT_TYPE} (pk)',
+         f'FOREIGN KEY (dfk) REFERENCES {_T_DATA} (pk)'),
+        (_T_SYNC_STATE,
+         'key TEXT NOT NULL PRIMARY KEY',
+         'value TEXT NOT NULL'),
+        (_T_CHANGE_LOG,  # The latest version of each synced row.
+         'pk INTEGER NOT NULL PRIMARY KEY',
+         'tbl TEXT NOT NULL',
+         'rid INTEGER NOT NULL',  # The pk of the row in tbl.
+         'uid TEXT',              # The row in all copies, config_data only.
+         'version INTEGER NOT NULL',
+         'site TEXT NOT NULL',    # The copy that made this version.
+         'seq INTEGER NOT NULL',  # Increases with every change.
+         'm_time TEXT NOT NULL',
+         'UNIQUE (tbl, rid)'),
+        (_T_DIGEST,  # The digest of each month's values.
+         'year INTEGER NOT NULL',
+         'month INTEGER NOT NULL',  # The month order.
+         'hash TEXT',               # NULL when the month is stale.
+         'PRIMARY KEY (year, month)'),
+        (_T_JOURNAL,  # Append-only, one row for each changed value.
+         'pk INTEGER NOT NULL PRIMARY KEY',
+         'fy1fk INTEGER NOT NULL',
+         'mfk INTEGER NOT NULL',
+         'ffk INTEGER NOT NULL',
+         'old TEXT',
+         'new TEXT',
+         'panel TEXT',              # NULL when not saved from a panel.
+         'm_time TEXT NOT NULL'),
+        )
+    _TABLES = [table[0] for table in _SCHEMA]
+    _TABLES.sort()
+    # Tables added after the first release, they are created when missing.
+    _ADDED_TABLES = (_T_SYNC_STATE, _T_CHANGE_LOG, _T_DIGEST, _T_JOURNAL)
+    _SYNCED = (_T_FIELD_TYPE, _T_FISCAL_YEAR, _T_DATA)  # In apply order.
+    _SITE = f"(SELECT value FROM {_T_SYNC_STATE} WHERE key = 'site')"
+    _NEXT_SEQ = f"(SELECT COALESCE(MAX(seq), 0) + 1 FROM {_T_CHANGE_LOG})"
+    _INDEXES = (
+        f"CREATE INDEX IF NOT EXISTS {_T_DATA}_key "
+        f"ON {_T_DATA} (fy1fk, mfk, ffk)",
+        f"CREATE INDEX IF NOT EXISTS {_T_CHANGE_LOG}_seq "
+        f"ON {_T_CHANGE_LOG} (seq)",
+        f"CREATE INDEX IF NOT EXISTS {_T_CHANGE_LOG}_uid "
+        f"ON {_T_CHANGE_LOG} (tbl, uid)",
+        f"CREATE INDEX IF NOT EXISTS {_T_JOURNAL}_value "
+        f"ON {_T_JOURNAL} (fy1fk, mfk, ffk, m_time)",
+        )
+    _EMPTY_FIELDS = ('', '0')
+    _EXCLUDE_PANELS = ('fiscal',)
+    _ORGANIZATION_FIELDS = ('locale_name', 'locality_prefix',
+                            'location_city_name', 'start_of_fiscal_year',
+                            'total_membership', 'treasurer', 'iana_name',
+                            'latitude', 'longitude')
+    _FIELDS_NOT_ADDED = ()  # Fields not in the field_table.
+    _MAX_FIELD_LEN = 40  # Max length of fields allowed in the field_table.
+    # Connections that keep the in-memory databases alive.
+    _MEMORY_KEEPERS = {}
+    _ARCHIVE_EXT = '.sqlite3'
+
+    def __init__(self, *args, **kwargs):
+        clock = kwargs.pop('clock', None)
+        super().__init__(*args, **kwargs)
+        self._org_data = {}
+        self._fiscal_data = []
+        self._tzinfo = None
+        self.clock = clock if clock else self._default_clock()
+
+    #
+    # Schema methods
+    #
+
+    async def create_db(self):
+        """
+        Create the database based on the fields currently defined.
+        """
+        if (self.data_is_uri or not os.path.exists(self.user_data_fullpath)
+            or not await self.has_schema):
+            async with self._connect() as db:
+                for params in self._SCHEMA:
+                    table = params[0]
+                    fields = ', '.join([field for field in params[1:]])
+                    query = f"CREATE TABLE IF NOT EXISTS {table}({fields})"
+                    await db.execute(query)
+                    await db.commit()
+
+                await self._create_sync_log(db)
+                await self._create_digests(db)
+                await self._create_journal(db)
+
+    async def _create_sync_log(self, db) -> None:
+        """
+        Create the change log triggers, give this copy its site id and log
+        the rows that were added before there was a change log.
+
+        :param aiosqlite.Connection db: An open connection.
+        """
+        for query in self._INDEXES + self._sync_log_triggers():
+            await db.execute(query)
+
+        await db.execute(
+            f"INSERT OR IGNORE INTO {self._T_SYNC_STATE} (key, value) "
+            "VALUES ('site', lower(hex(randomblob(16))));")
+
+        # Rows from before the log get a uid made from what they hold, so
+        # copies of the same file that were upgraded apart still agree.
+        uid = (f"'b:' || (SELECT year FROM {self._T_FISCAL_YEAR} WHERE pk = "
+               f"t.fy1fk) || ':' || (SELECT ord FROM {self._T_MONTH} WHERE "
+               f"pk = t.mfk) || ':' || (SELECT field FROM "
+               f"{self._T_FIELD_TYPE} WHERE pk = t.ffk) || ':' || t.c_time")
+
+        for table in self._SYNCED:
+            await db.execute(
+                f"INSERT INTO {self._T_CHANGE_LOG} (tbl, rid, uid, version, "
+                f"site, seq, m_time) SELECT '{table}', t.pk, "
+                f"{uid if table == self._T_DATA else 'NULL'}, 1, "
+                f"{self._SITE}, {self._NEXT_SEQ}, t.m_time FROM {table} AS t "
+                f"WHERE t.pk NOT IN (SELECT rid FROM {self._T_CHANGE_LOG} "
+                f"WHERE tbl = '{table}');")
+
+        await db.commit()
+
+    def _sync_log_triggers(self) -> tuple:
+        """
+        The triggers that record local changes to the synced tables,
+        changes being applied from another copy are recorded by the
+        `SyncManager` instead.
+        """
+        triggers = []
+
+        for table in self._SYNCED:
+            uid = (f"{self._SITE} || ':' || {self._NEXT_SEQ}"
+                   if table == self._T_DATA else "NULL")
+            insert = (
+                f"INSERT OR REPLACE INTO {self._T_CHANGE_LOG} (tbl, rid, "
+                f"uid, version, site, seq, m_time) VALUES ('{table}', "
+                f"NEW.pk, {uid}, 1, {self._SITE}, {self._NEXT_SEQ}, "
+                "NEW.m_time);")
+            update = (
+                f"UPDATE {self._T_CHANGE_LOG} SET version = version + 1, "
+                f"site = {self._SITE}, seq = {self._NEXT_SEQ}, "
+                f"m_time = NEW.m_time WHERE tbl = '{table}' "
+                "AND rid = NEW.pk;")
+
+            for event, body in (('INSERT', insert), ('UPDATE', update)):
+                triggers.append(
+                    f"CREATE TRIGGER IF NOT EXISTS {table}_{event.lower()}"
+                    f"_log AFTER {event} ON {table} WHEN NOT EXISTS (SELECT "
+                    f"1 FROM {self._T_SYNC_STATE} WHERE key = 'applying') "
+                    f"BEGIN {body} END;")
+
+        return tuple(triggers)
+
+    async def _create_digests(self, db) -> None:
+        """
+        Create the triggers that mark the month digests stale and hash the
+        months that were added before there were digests.
+
+        :param aiosqlite.Connection db: An open connection.
+        """
+        for query in self._digest_triggers():
+            await db.execute(query)
+
+        await db.execute(
+            f"INSERT OR IGNORE INTO {self._T_DIGEST} (year, month, hash) "
+            f"SELECT DISTINCT y.year, m.ord, NULL FROM {self._T_DATA} AS d "
+            f"JOIN {self._T_FISCAL_YEAR} AS y ON y.pk = d.fy1fk "
+            f"JOIN {self._T_MONTH} AS m ON m.pk = d.mfk;")
+        await DigestTree(self).refresh(db)
+        await db.commit()
+
+    def _digest_triggers(self) -> tuple:
+        """
+        The triggers that mark a month stale when one of its values is
+        inserted or changed. Deletes are left out, the only rows deleted
+        are archived ones that keep their digests.
+        """
+        def stale(row):
+            return (
+                f"INSERT OR REPLACE INTO {self._T_DIGEST} (year, month, "
+                f"hash) VALUES ((SELECT year FROM {self._T_FISCAL_YEAR} "
+                f"WHERE pk = {row}.fy1fk), (SELECT ord FROM {self._T_MONTH} "
+                f"WHERE pk = {row}.mfk), NULL);")
+
+        table = self._T_DATA
+        return (
+            f"CREATE TRIGGER IF NOT EXISTS {table}_insert_digest AFTER "
+            f"INSERT ON {table} BEGIN {stale('NEW')} END;",
+            f"CREATE TRIGGER IF NOT EXISTS {table}_update_digest AFTER "
+            f"UPDATE OF value, fy1fk, mfk, ffk ON {table} BEGIN "
+            f"{stale('OLD')} {stale('NEW')} END;",
+            )
+
+    async def _create_journal(self, db) -> None:
+        """
+        Create the triggers that keep the journal from being changed, the
+        rows are written by the trigger `_journal_panel` adds to each
+        connection that changes values.
+
+        :param aiosqlite.Connection db: An open connection.
+        """
+        journal = self._T_JOURNAL
+        # Databases made when the journal trigger was in the main schema.
+        await db.execute(f"DROP TRIGGER IF EXISTS {self._T_DATA}_journal;")
+
+        for event in ('UPDATE', 'DELETE'):
+            await db.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {journal}_no_{event.lower()} "
+                f"BEFORE {event} ON {journal} BEGIN SELECT RAISE(ABORT, "
+                f"'The {journal} is append-only.'); END;")
+
+        await db.commit()
+
+    async def _journal_panel(self, db, panel: str=None) -> None:
+        """
+        Journal the values changed on this connection. The panel is kept
+        in a TEMP table, a trigger in the main schema cannot read one so
+        the journal trigger is a TEMP trigger on the same connection. Both
+        go away when the connection is closed.
+
+        :param aiosqlite.Connection db: An open connection.
+        :param str panel: The panel recorded in the journal for the values
+                          changed.
+        """
+        table, journal = self._T_DATA, self._T_JOURNAL
+        await db.execute("CREATE TEMP TABLE IF NOT EXISTS journal_panel ("
+                         "pk INTEGER NOT NULL PRIMARY KEY, panel TEXT);")
+        await db.execute("INSERT OR REPLACE INTO temp.journal_panel (pk, "
+                         "panel) VALUES (1, ?);", (panel,))
+        await db.execute(
+            f"CREATE TEMP TRIGGER IF NOT EXISTS {table}_journal AFTER UPDATE "
+            f"OF value ON main.{table} WHEN OLD.value IS NOT NEW.value BEGIN "
+            f"INSERT INTO {journal} (fy1fk, mfk, ffk, old, new, panel, "
+            "m_time) VALUES (NEW.fy1fk, NEW.mfk, NEW.ffk, OLD.value, "
+            "NEW.value, (SELECT panel FROM temp.journal_panel), NEW.m_time); "
+            "END;")
+
+    @property
+    async def has_schema(self) -> bool:
+        """
+        Checks that the schema has been created. A database from before
+        the tables in `_ADDED_TABLES` existed is not an error, `create_db`
+        adds them.
+
+        :returns: True if the schema has been created and False if it has not
+                  been created.
+        :rtype: bool
+        """
+        query = "SELECT name FROM sqlite_master WHERE type = 'table'"
+        table_names = [table[0]
+                       for table in await self._do_select_query(query)
+                       if not table[0].startswith('sqlite_')]
+        table_names.sort()
+        check = table_names == self._TABLES
+        missing = set(self._TABLES) - set(table_names)
+
+        if check:
+            pass
+        elif (missing and missing <= set(self._ADDED_TABLES)
+              and set(table_names) <= set(self._TABLES)):
+            self._log.info("Adding the tables %s to the database.",
+                           sorted(missing))
+        else:
+            msg = ("Database table count is wrong it should be "
+                   f"'{self._TABLES}' found '{table_names}'")
+            self._log.error(msg)
+            self._status_error(msg)
+
+        return check
+
+    #
+    # Initialization methods
+    #
+
+    async def panel_data(self, name: str, data: dict, year: int) -> dict:
+        """
+        Get the values of one panel from the database. Any new fields are
+        added to the database.
+
+        :param str name: The internal name of the panel.
+        :param dict data: The fields of the panel in the form of
+                          {<field name>: <value>,...}, only the keys are
+                          used.
+        :param int year: Current fiscal year.
+        :returns: The values in the form of {<field name>: <value>,...}.
+        :rtype: dict
+        """
+        values = await self.select_from_config_data_table(data, year)
+
+        # Needed when the app has been run at least one time before.
+        if name == 'organization' and values:
+            # This stores and converts a list to a dict.
+            self.organization_data = values
+            items = self.organization_data
+        else:
+            items = {value[1]: value[2] for value in values}
+
+        if name not in self._EXCLUDE_PANELS:
+            # Add any new fields to the database.
+            await self._add_fields_to_field_type_table(data)
+
+        return items
+
+    async def load_organization_data(self, year: int) -> dict:
+        """
+        Get the organization values without a panel, as `panel_data` does
+        for the `organization` panel, so time stamps written without the
+        GUI are in the organization's timezone.
+
+        :param int year: Current fiscal year.
+        :returns: The organization data or None if there is none.
+        :rtype: dict
+        """
+        values = await self.select_from_config_data_table(
+            dict.fromkeys(self._ORGANIZATION_FIELDS), year)
+
+        if values:
+            self.organization_data = values
+
+        return self.organization_data
+
+    async def save_data(self, name: str, data: dict, year: int=None,
+                        month: int=None) -> None:
+        """
+        Save the data of one panel to the database inside a single unit of
+        work, so every row written during one save gets the same time stamp.
+
+        :param str name: The internal name of the panel.
+        :param dict data: The values in the form of
+                          {<field name>: <value>,...}.
+        :param int year: Current fiscal year, the default is to look it up.
+        :param int month: Current fiscal month.
+        :returns: None if no errors, otherwise the error message.
+        :rtype: None or str
+        """
+        with self.clock.unit_of_work(self.tzinfo):
+            if None in (year, month):
+                year, month = await self._get_current_fiscal_year()
+
+            self._fiscal_data = await self.select_from_fiscal_year_table()
+            error = await self._save_data(name, data, year, month)
+
+        return error
+
+    async def _save_data(self, name: str, data: dict, year: int,
+                         month: int) -> None:
+        """
+        Does the work for `save_data()`, this must be called inside a clock
+        unit of work.
+
+        :param str name: The internal name of the panel.
+        :param dict data: The values in the form of
+                          {<field name>: <value>,...}.
+        :param int year: Current fiscal year or None on the first run.
+        :param int month: Current fiscal month or None on the first run.
+        :returns: None if no errors, otherwise the error message.
+        :rtype: None or str
+        """
+        error = None
+
+        if name == 'organization':
+            if data:
+                # Make sure all fields were entered.
+                empty_list = [field for field, value in data.items()
+                              if value in self._EMPTY_FIELDS]
+
+                if len(empty_list) != 0:
+                    ef = ', '.join([f for f in empty_list])
+                    error = f"The '{ef}' field(s) must not be empty."
+                    self._log.warning(error)
+                else:
+                    data = self._add_location_data(data)
+
+                    if not isinstance(data, dict):
+                        error = data
+                    else:
+                        sofy = data['start_of_fiscal_year']
+                        entered_date = sofy.b_date
+                        # Need ISO date for the DB.
+                        data['start_of_fiscal_year'] = sofy.isoformat()
+                        earliest_year = self.earliest_year
+
+                        if not year or not month:
+                            self.organization_data = data
+                            await self.first_run_initialization(entered_date)
+                            year, month, day = entered_date
+                        elif year == entered_date[0]:
+                            self.organization_data = data
+                            year, month, day = entered_date
+                        elif (year + 1) == entered_date[0]:
+                            self.organization_data = data
+                            await self.entered_next_year(entered_date)
+                            year, month, day = entered_date
+                        elif (earliest_year and
+                              (earliest_year - 1) == entered_date[0]):
+                            await self.entered_previous_year(entered_date)
+                            year, month, day = entered_date
+                        else:
+                            year = month = None
+                            error = ("Cannot enter a year that is not "
+                                     "immediately before or after the "
+                                     "earliest or current year.")
+                            self._log.warning(error)
+            else:  # If no org data was entered.
+                error = ("Organization Information data must be entered "
+                         "before any other data can be entered.")
+                self._log.warning(error)
+        elif name == 'fiscal':
+            # The day needs to be there but is never used.
+            items = [(year, month, 1, data['current_fiscal_year'],
+                      data['work_on_this_fiscal_year'],
+                      data['audit_complete'])]
+            await self.update_fiscal_year_table(items)
+            year = month = None
+        elif name == 'fiscal_settings':
+            year = month = None
+        elif name == 'budget':
+            pass
+            #print(data)
+
+        if year and month:
+            error = await self._insert_update_config_data_table(
+                year, month=month, data=data, panel=name)
+
+        return error
+
+    async def first_run_initialization(self, date: tuple,
+                                       fields: dict=None):
+        """
+        The first run of the application.
+
+        .. note::
+
+           1. Insert a year marked as current.
+           2. Insert the next year.
+           3. Insert all months.
+           4. Insert fields from all panels.
+
+        :param tuple date: This is the UI entered date.
+        :param dict fields: The fields of all the panels in the form of
+                            {<field name>: <value>,...}.
+        """
+        year, month, day = date
+        # year, month, day, current, audit, work_on
+        data = [(year, month, day, 1, 1, 0), (year+1, month, day, 0, 0, 0)]
+        await self.insert_into_fiscal_year_table(data)
+        # Populate the Badí months in the database.
+        await self._insert_into_month_table()
+
+        # Populate all panel fields in the database.
+        if fields:
+            await self._add_fields_to_field_type_table(fields)
+
+    async def entered_next_year(self, date: tuple):
+        """
+        Follow up years.
+
+        .. note::
+
+           1. Update the previous current year.
+           2. Update the previous next year to the current year.
+           3. Insert a new next year.
+
+        :param tuple date: This is the UI entered date.
+        """
+        year, month, day = date
+        data = [(year-1, month, day, 0, 0, 0), (year, month, day, 1, 1, 0)]
+        await self.update_fiscal_year_table(data)
+        await self.insert_into_fiscal_year_table(
+            [(year+1, month, day, 0, 0, 0)])
+
+    async def entered_previous_year(self, date: tuple):
+        """
+        Previous up years.
+
+        .. note::
+
+           Insert previous year.
+
+        :param tuple date: This is the UI entered date.
+        """
+        await self.insert_into_fiscal_year_table([(*date, 0, 0, 0)])
+
+    async def rollover(self) -> int:
+        """
+        Close the current fiscal year, the next year becomes the current
+        year and a new next year is added.
+
+        :returns: The new current year or None if there is no current year.
+        :rtype: int
+        """
+        fy = await self.select_from_fiscal_year_table(current=1)
+
+        if fy:
+            year, month, day = fy[0][1:4]
+
+            with self.clock.unit_of_work(self.tzinfo):
+                await self.entered_next_year((year + 1, month, day))
+
+            year += 1
+        else:
+            year = None
+            self._log.error("No current fiscal_year data in the database.")
+
+        return year
+
+    async def _get_current_fiscal_year(self):
+        """
+        Get the current fiscal year.
+        """
+        fy = await self.select_from_fiscal_year_table(current=1)
+
+        if len(fy):
+            year = fy[0][1]
+            month = fy[0][2]
+        else:  # Only for first time use.
+            year = month = None
+
+        return year, month
+
+    def _get_fiscal_year_value(self, year: int, *, pk: bool=False,
+                               date: bool=False, current: bool=False,
+                               work_on: bool=False, audit: bool=False,
+                               time: bool=False):
+        """
+        Return a specific value from the `fiscal_year` table.
+
+        :param bool pk: Get the Primary Key.
+        :param bool date: Get the date, (year, month, day).
+        :param bool current: Get the current fiscal year.
+        :param bool work_on: Get which fiscal year is being worked on.
+        :param bool audit: Get the audit status for the gived year.
+        :param bool time: Get the create and modified dates and times.
+        :returns: The value asked for.
+        :rtype: int or tuple
+        """
+        # Create dict from list of raw fiscal data.
+        assert (pk, date, current, audit,
+                work_on, time).count(True) == 1, (
+                    f"Only one argument can be `True`, found ({date}, "
+                    f"{current}, {audit}, {work_on}, {time}).")
+        data = {item[1]: item for item in self._fiscal_data}
+        items = data.get(year)
+        assert items, f"Invalid year {year}, options are {list(data)}."
+
+        if pk:
+            result = items[0]
+        elif date:
+            result = (items[1], items[2], items[3])
+        elif current:
+            result = items[4]
+        elif work_on:
+            result = items[5]
+        elif audit:
+            result = items[6]
+        elif time:
+            result = (items[7], items[8])
+
+        return result
+
+    #
+    # Database access methods.
+    #
+
+    async def _add_fields_to_field_type_table(self, data: dict) -> None:
+        """
+        Add fields to the field_type table if they don't already exist.
+
+        :param dict data: The data from the Organization Information panel in
+                          the form of: {<field name>: <value>,...}.
+        """
+        items = await self.select_from_field_type_table(data)
+        old_fields = [item[1] for item in items]
+        new_fields = [fd for fd in data if (
+            len(fd) <= self._MAX_FIELD_LEN or
+            fd not in self._FIELDS_NOT_ADDED)]
+        fields = self._find_fields(new_fields, old_fields)
+
+        if fields:
+            await self.insert_into_field_type_table(fields)
+
+    async def _insert_into_month_table(self) -> None:
+        """
+        Populate the `month` table with all months.
+        """
+        items = await self.select_from_month_table()
+        months = self._ordered_month()
+
+        if not items:  # Insert all months and their order.
+            await self.insert_into_month_table(months)
+        else:  # Insert only months and their order if not in the database.
+            data = [item[1:3] for item in items]
+            con_months = [(month, order) for order, month in months.items()]
+
+            for item in data:
+                if item not in con_months:
+                    await self.insert_into_month_table(item)
+
+    async def _insert_update_config_data_table(
+        self, year: int, *, month: int=None, data: dict={},
+        panel: str=None) -> None:
+        """
+        Insert or update `data` table.
+
+        :param int year: A Baha'i year of the transaction.
+        :param int month: A Baha'i month of the transaction. This is the order
+                          of the Baha'i month not the name.
+        :param dict data: The data from the any panel  in the form of:
+                          {<field name>: <value>,...}.
+        :param str panel: The panel the data is from, for the journal.
+        :returns: None if no errors. If an error a, error message.
+        :rtype: None or str
+
+        .. note::
+
+           An archived year is read only, it must be restored with
+           `restore_year` before it can be changed.
+        """
+        if year in self.archived_years:
+            error = (f"The fiscal year {year} is archived, restore it "
+                     "before changing it.")
+            self._log.error(error)
+            return error
+
+        error = None
+        values = await self.select_from_config_data_table(data, year)
+
+        if not values:  # Do insert
+            await self.insert_into_config_data_table(year, month, data)
+        else:
+            insert_data = {}
+            update_data = []
+            #        field,    pk,      y1
+            items = {item[1]: (item[0], item[3]) for item in values}
+
+            for field, value in data.items():  # Loop through incoming data.
+                pk, y1 = items.get(field, (None, None))  # Selected data
+
+                if not pk or not y1:           # Error condition
+                    error = f"Could not find field {field} in {data}."
+                    self._log.error(error)
+                    break
+
+                if year != y1:                 # Insert
+                    insert_data[field] = value
+                else:                          # Update
+                    update_data.append((pk, value))
+
+            if insert_data:  # Do insert
+                await self.insert_into_config_data_table(
+                    year, month, insert_data)
+
+            if update_data:  # Do update
+                await self.update_config_data_table(year, month, update_data,
+                                                    panel=panel)
+
+        return error
+
+    async def _do_select_query(self, query: str, params: tuple=(),
+                               archives: tuple=()) -> list:
+        """
+        Do the actual query and return the results.
+
+        :param str query: The SQL query to do.
+        :param tuple archives: The archived years the query reads from.
+        :returns: A list of the data.
+        :rtype: list
+        """
+        with Instrumentation().measure('_do_select_query', query) as result:
+            async with self._connect_archives(archives) as db:
+                async with db.execute(query, params) as cursor:
+                    values = await cursor.fetchall()
+
+            result['rows'] = len(values)
+
+        return values
+
+    async def _do_insert_query(self, query: str, data: list) -> None:
+        """
+        Do the insert query.
+
+        :param str query: The SQL query to do.
+        :param list data: Data to insert into the Data table.
+        """
+        with Instrumentation().measure('_do_insert_query', query) as result:
+            async with self._connect() as db:
+                try:
+                    await db.executemany(query, data)
+                    await DigestTree(self).refresh(db)
+                except Exception as e:
+                    self._log.error(str(e), exc_info=True)
+                else:
+                    await db.commit()
+                    result['rows'] = len(data)
+
+    async def _do_update_query(self, query: str, data: list,
+                               panel: str=None) -> None:
+        """
+        Do the update query.
+
+        :param str query: The SQL query to do.
+        :param list data: Data to update into the Data table.
+        :param str panel: The panel recorded in the journal for the values
+                          changed.
+        """
+        with Instrumentation().measure('_do_update_query', query) as result:
+            async with self._connect() as db:
+                try:
+                    await self._journal_panel(db, panel)
+                    await db.executemany(query, data)
+                    await DigestTree(self).refresh(db)
+                except Exception as e:
+                    self._log.error(str(e), exc_info=True)
+                else:
+                    await db.commit()
+                    result['rows'] = len(data)
+
+    def _connect(self, uri: bool=False):
+        """
+        Open a connection to the database for the current data backend.
+        An in-memory database only lives while a connection to it is open,
+        so the first use opens one that is kept until `close_memory_db` is
+        called.
+
+        :param bool uri: Open a file database by URI so that URIs can be
+                         used to attach other databases.
+        :returns: The connection, use it with `async with`.
+        :rtype: aiosqlite.Connection
+        """
+        path = self.user_data_fullpath
+
+        if self.data_is_uri and path not in self._MEMORY_KEEPERS:
+            self._MEMORY_KEEPERS[path] = sqlite3.connect(path, uri=True)
+        elif uri and not self.data_is_uri:
+            path = f"file:{pathname2url(os.path.abspath(path))}"
+
+        return aiosqlite.connect(path, uri=uri or self.data_is_uri)
+
+    @asynccontextmanager
+    async def _connect_archives(self, years: tuple=()):
+        """
+        Open a connection with the archives of the given years attached
+        read-only as `arc_<year>`.
+
+        :param tuple years: The archived years.
+        :returns: The connection, use it with `async with`.
+        :rtype: aiosqlite.Connection
+        """
+        async with self._connect(uri=bool(years)) as db:
+            for year in years:
+                path = pathname2url(self.archive_fullpath(year))
+                await db.execute(f"ATTACH DATABASE ? AS arc_{int(year)};",
+                                 (f"file:{path}?mode=ro",))
+
+            yield db
+
+    def close_memory_db(self) -> None:
+        """
+        Close the in-memory database, all its data is lost.
+        """
+        keeper = self._MEMORY_KEEPERS.pop(self.user_data_fullpath, None)
+
+        if keeper:
+            keeper.close()
+
+    async def vacuum(self) -> None:
+        """
+        Rebuild the database file to reclaim free pages and update the
+        query planner statistics.
+        """
+        async with self._connect() as db:
+            await db.execute("VACUUM;")
+            await db.execute("PRAGMA optimize;")
+
+    #
+    # Archive methods
+    #
+
+    def archive_fullpath(self, year: int) -> str:
+        """
+        The archive file of a fiscal year.
+
+        :param int year: A Baha'i year.
+        :returns: The full path to the archive file.
+        :rtype: str
+        """
+        assert self.user_archive_dir, (
+            "The memory data backend cannot be archived.")
+        stem = os.path.splitext(os.path.basename(self.user_data_fullpath))[0]
+        return os.path.join(self.user_archive_dir,
+                            f"{stem}-{year}{self._ARCHIVE_EXT}")
+
+    @property
+    def archived_years(self) -> list:
+        """
+        The fiscal years that have been moved to archive files.
+
+        :rtype: list
+        """
+        path = self.user_archive_dir
+        years = []
+
+        if path and os.path.isdir(path):
+            stem = os.path.splitext(
+                os.path.basename(self.user_data_fullpath))[0]
+            prefix = f"{stem}-"
+
+            for name in os.listdir(path):
+                if (name.startswith(prefix)
+                        and name.endswith(self._ARCHIVE_EXT)):
+                    year = name[len(prefix):-len(self._ARCHIVE_EXT)]
+
+                    if year.isdigit():
+                        years.append(int(year))
+
+        years.sort()
+        return years
+
+    async def archive_year(self, year: int) -> int:
+        """
+        Move the `config_data` rows of an audited fiscal year to its own
+        archive file. The archive is written and renamed into place before
+        the rows are deleted, so an interrupted archive is finished by
+        running it again.
+
+        :param int year: A Baha'i year with `audit` set.
+        :returns: The number of rows moved.
+        :rtype: int
+        """
+        fiscal = await self._do_select_query(
+            f"SELECT pk, audit FROM {self._T_FISCAL_YEAR} WHERE year = ?;",
+            (year,))
+        assert fiscal and fiscal[0][1] == 1, (
+            f"The fiscal year {year} has not been audited.")
+        pk = fiscal[0][0]
+        path = self.archive_fullpath(year)
+
+        with Instrumentation().measure('archive_year') as result:
+            if not os.path.exists(path):
+                await self._write_archive(pk, path)
+
+            async with self._connect() as db:
+                cursor = await db.execute(
+                    f"DELETE FROM {self._T_DATA} WHERE fy1fk = ?;", (pk,))
+                result['rows'] = count = cursor.rowcount
+                await db.commit()
+
+        self._log.info("Archived %s rows of the fiscal year %s to %s.",
+                       count, year, path)
+        return count
+
+    async def _write_archive(self, pk: int, path: str) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+        table = [params for params in self._SCHEMA
+                 if params[0] == self._T_DATA][0]
+
+        async with self._connect() as db:
+            await db.execute("ATTACH DATABASE ? AS archive;", (tmp,))
+            await db.execute(f"CREATE TABLE archive.{self._T_DATA}"
+                             f"({', '.join(table[1:])});")
+            await db.execute(
+                f"INSERT INTO archive.{self._T_DATA} "
+                f"SELECT * FROM main.{self._T_DATA} WHERE fy1fk = ?;", (pk,))
+            await db.commit()
+            await db.execute("DETACH DATABASE archive;")
+
+        os.chmod(tmp, 0o444)
+        os.replace(tmp, path)
+
+    async def restore_year(self, year: int) -> int:
+        """
+        Move the rows of an archived fiscal year back into the database
+        and remove its archive file.
+
+        :param int year: An archived Baha'i year.
+        :returns: The number of rows restored.
+        :rtype: int
+        """
+        assert year in self.archived_years, (
+            f"The fiscal year {year} has not been archived.")
+        path = self.archive_fullpath(year)
+
+        archive = f"arc_{int(year)}.{self._T_DATA}"
+
+        async with self._connect_archives((year,)) as db:
+            cursor = await db.execute(
+                f"INSERT OR IGNORE INTO main.{self._T_DATA} "
+                f"SELECT * FROM {archive};")
+            count = cursor.rowcount
+            # Rows whose pk was reused since they were archived get new pks.
+            cursor = await db.execute(
+                f"INSERT INTO main.{self._T_DATA} (value, fy1fk, fy2fk, mfk, "
+                "ffk, c_time, m_time) SELECT a.value, a.fy1fk, a.fy2fk, "
+                f"a.mfk, a.ffk, a.c_time, a.m_time FROM {archive} AS a "
+                f"WHERE NOT EXISTS (SELECT 1 FROM main.{self._T_DATA} AS d "
+                "WHERE d.pk = a.pk AND d.fy1fk = a.fy1fk);")
+            count += cursor.rowcount
+            await db.commit()
+
+        os.remove(path)
+        self._log.info("Restored %s rows of the fiscal year %s from %s.",
+                       count, year, path)
+        return count
+
+    #
+    # Utilitu methods
+    #
+
+    def _find_fields(self, new: list, old: list) -> set:
+        """
+        Find the fields to select or insert.
+
+        :param list or dict new: The new fields in the form of:
+                                 [<field name>,...].
+        :param list old: The old fields in the form of: [<field name>,...].
+        :returns: A list of fields.
+        :rtype: list
+        """
+        new_fields = set(new)  # Just get the keys if a dict.
+        old_fields = set(old)
+        return new_fields - old_fields
+
+    def _add_location_data(self, data: dict) -> dict:
+        """
+        Add the location data `iana_name`, `latitude` and, `longitude` to
+        the organization data.
+
+        :param dict data: The `organization` data.
+        :returns: The updated `organization` data.
+        :rtype: dict
+        """
+        location_city_name = data['location_city_name']
+
+        if location_city_name:
+            result = self._find_timezone(location_city_name)
+
+            if isinstance(result, tuple):
+                iana, lat, lon = result
+                data['iana_name'] = iana
+                data['latitude'] = lat
+                data['longitude'] = lon
+            else:
+                data = None
+                error = result
+        else:
+            error = ("The 'location_city_name' field was not found, this "
+                     "will cause some dates to be set to the wrong timezone, "
+                     "most likely UTC:00:00.")
+            self._log.warning(error)
+            data = None
+
+        return data if isinstance(data, dict) else error
+
+    def _find_timezone(self, address: str):
+        """
+        Find the IANA timezone name, latitude, and longitude.
+
+        :param str address: The address, City, or town used to find the
+                            required information.
+        :returns: The IANA timezone name, latitude, and longitude.
+        :rtype: tuple
+        """
+        error = None
+        geolocator = geocoders.Nominatim(user_agent='nc-bookkeeper')
+
+        try:
+            location = geolocator.geocode(address)
+        except geopy_exc.GeocoderError as e:
+            error = f"Could not get information on {address}"
+            self._log.error(error + ", %s", e)
+        else:
+            error = None
+
+        if location:
+            lat = location.latitude
+            lon = location.longitude
+            tf = timezonefinder.TimezoneFinder()
+            iana = tf.timezone_at(lng=lon, lat=lat)
+        elif error:
+            iana = lat = lon = None
+        else:
+            iana = lat = lon = None
+            error = f"Cannot find the timezone for '{address}'."
+
+        return error if error else (iana, lat, lon)
+
+    #
+    # Properties
+    #
+
+    @property
+    def organization_data(self) -> dict:
+        """
+        This property gets the organization data that are used throughout
+        the application without having to do a select on the DB everytime.
+
+        :returns: The organization data as defined by {<field name>: <value>}.
+        :rtype: dict
+        """
+        return self._org_data
+
+    @organization_data.setter
+    def organization_data(self, values) -> None:
+        """
+        This property sets the organization constants that are used throughout
+        the application without having to do a select on the DB everytime.
+
+        .. note::
+
+           Only the second and three fields are stored when the incoming
+           values are a list otherwise the dict is used as is.
+
+        :param list or dict values: A list of tuples where each tuple is the
+                                    raw data for one field in the form of
+                                    (PK, <field name>, <value>, <fiscal year>,
+                                    <next year>, <c_time>, <m_time>).
+        """
+        if isinstance(values, list):
+            self._org_data = {value[1]: value[2] for value in values}
+        elif isinstance(values, dict):
+            self._org_data = values
+        else:
+            msg = ("The argument 'value' must be a 'list' or 'dict', "
+                   f"found {type(values)}.")
+            self._log.error(msg)
+            self._status_error(msg)
+            self._org_data = None
+
+        # The timezone may have changed so rebuild it on next use.
+        self._tzinfo = None
+
+    @property
+    def tzinfo(self):
+        """
+        The timezone of the organization. The `ZoneInfo` object is cached
+        until the `organization_data` changes.
+
+        :returns: The organization's timezone or UTC if not known yet.
+        :rtype: zoneinfo.ZoneInfo
+        """
+        if self._tzinfo is None:
+            org_data = self.organization_data or {}
+            iana_name = org_data.get('iana_name')
+            self._tzinfo = ZoneInfo(iana_name if iana_name else 'UTC')
+
+        return self._tzinfo
+
+    @property
+    def clock(self):
+        """
+        The clock used to time stamp all inserts and updates.
+
+        :returns: The clock object.
+        :rtype: TransactionClock
+        """
+        return self._clock
+
+    @clock.setter
+    def clock(self, clock):
+        """
+        Inject a different clock, usually a frozen one for tests and
+        benchmarks.
+
+        :param TransactionClock clock: The clock object.
+        """
+        self._clock = clock
+
+    def _default_clock(self):
+        """
+        Create the clock used when one is not injected. Sub-classes override
+        this to use their own calendar.
+
+        :returns: The default clock object.
+        :rtype: TransactionClock
+        """
+        return TransactionClock()
+
+    @property
+    def earliest_year(self):
+        """
+        Get the earliest year in the `fiscal_year` table.
+        """
+        years = [items[1] for items in self._fiscal_data]
+        return min(years) if years else None
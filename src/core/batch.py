@@ -0,0 +1,411 @@
+# -*- coding: utf-8 -*-
+#
+# src/core/batch.py
+#
+__docformat__ = "restructuredtext en"
+
+import io
+import os
+import sys
+import csv
+import json
+import asyncio
+import logging
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from ..config import Settings
+from .bahai_database import Database
+from .export import DataExporter
+from .bulk_import import BulkImporter
+from .backup import BackupManager
+from .sync import SyncManager
+from .digest import DigestTree
+
+
+class BatchCommands:
+    """
+    The command line batch commands, they use the wx-free core so no window
+    is opened. Each command is run on every database given, in parallel
+    processes if more than one job is asked for.
+
+    .. note::
+
+       Output is written as it is produced when there is one database or
+       one job. With parallel jobs the output of each database is written
+       in one piece when it is finished.
+    """
+    COMMANDS = ('export', 'import', 'load', 'report', 'rollover', 'archive',
+                'backup', 'sync', 'digest', 'vacuum', 'bench')
+    EXPORT_HEADER = DataExporter.HEADER
+
+    def __init__(self, options, out=None):
+        """
+        :param argparse.Namespace options: The parsed command line.
+        :param file out: Where the output is written, the default is
+                         `sys.stdout`.
+        """
+        assert options.command in self.COMMANDS, (
+            f"Invalid command '{options.command}'.")
+        self.options = options
+        self.out = out if out else sys.stdout
+        self._log = logging.getLogger(Settings().logger_name)
+
+    @property
+    def databases(self) -> list:
+        """
+        The databases given with `--db`, the default is the user's.
+        """
+        return getattr(self.options, 'db', None) or [None]
+
+    def run(self) -> int:
+        """
+        Run the command.
+
+        :returns: The exit status, 0 if all databases succeeded.
+        :rtype: int
+        """
+        if self.options.command == 'bench':
+            return self.bench()
+
+        jobs = getattr(self.options, 'jobs', 1)
+
+        if len(self.databases) == 1 or jobs <= 1:
+            status = 0
+
+            for path in self.databases:
+                status |= self.run_one(path, self.out)
+        else:
+            status = self._run_parallel(jobs)
+
+        return status
+
+    def run_one(self, path: str, out) -> int:
+        """
+        Run the command on one database.
+
+        :param str path: The database file or None for the user's.
+        :param file out: Where the output is written.
+        :returns: The exit status.
+        :rtype: int
+        """
+        settings = Settings()
+        settings.data_path = path
+
+        if not os.path.exists(settings.user_data_fullpath):
+            print(f"Database {settings.user_data_fullpath} does not exist.",
+                  file=sys.stderr)
+            return 1
+
+        method = getattr(self, f"do_{self.options.command}")
+        db = Database()
+
+        try:
+            status = asyncio.run(method(db, out))
+        except Exception as e:
+            self._log.error("The %s command failed on %s, %s",
+                            self.options.command,
+                            settings.user_data_fullpath, e, exc_info=True)
+            print(f"{settings.user_data_fullpath}: {e}", file=sys.stderr)
+            status = 1
+
+        return status
+
+    def _run_parallel(self, jobs: int) -> int:
+        status = 0
+
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {pool.submit(_run_job, self.options, path): path
+                       for path in self.databases}
+
+            for future in as_completed(futures):
+                result, text = future.result()
+                self.out.write(f"==> {futures[future]} <==\n{text}")
+                self.out.flush()
+                status |= result
+
+        return status
+
+    #
+    # Commands
+    #
+
+    async def do_export(self, db: Database, out) -> int:
+        """
+        Stream the values of one or all years as CSV or JSON Lines.
+        """
+        exporter = DataExporter(db, getattr(self.options, 'format', 'csv'),
+                                getattr(self.options, 'batch_size', None))
+        await exporter.export(out, self.options.year)
+        return 0
+
+    async def do_import(self, db: Database, out) -> int:
+        """
+        Read values in either export format into the current fiscal year,
+        rows for other years are skipped.
+        """
+        year = await self._current_year(db)
+
+        if year is None:
+            print("No current fiscal year in the database.", file=sys.stderr)
+            return 1
+
+        exporter = DataExporter(db)
+        groups = {}
+        skipped = 0
+
+        with open(self.options.file, newline='') as f:
+            for row in self._read_rows(f):
+                if int(row['year']) == year:
+                    groups.setdefault(int(row['month']), {})[
+                        row['field']] = exporter.to_db(row['field'],
+                                                       row['value'])
+                else:
+                    skipped += 1
+
+        count = 0
+
+        with db.clock.unit_of_work(db.tzinfo):
+            for order, data in sorted(groups.items()):
+                await db._add_fields_to_field_type_table(data)
+                error = await db._insert_update_config_data_table(
+                    year, month=order, data=data, panel='import')
+
+                if error:
+                    print(error, file=sys.stderr)
+                    return 1
+
+                count += len(data)
+
+        print(f"Imported {count} values into {year}, skipped {skipped} "
+              "rows from other years.", file=out)
+        return 0
+
+    async def _current_year(self, db: Database) -> int:
+        """
+        Get the current fiscal year and load the organization data for it,
+        without them the time stamps would be written in UTC.
+        """
+        year = (await db._get_current_fiscal_year())[0]
+
+        if year is not None:
+            await db.load_organization_data(year)
+
+        return year
+
+    def _read_rows(self, f):
+        """
+        Read an export file, JSON Lines if the first line is an object.
+        """
+        first = f.readline()
+        f.seek(0)
+
+        if first.lstrip().startswith('{'):
+            rows = (json.loads(line) for line in f if line.strip())
+        else:
+            rows = csv.DictReader(f)
+
+        return rows
+
+    async def do_load(self, db: Database, out) -> int:
+        """
+        Bulk load historical values for any years from a spreadsheet.
+        """
+        await self._current_year(db)
+        importer = BulkImporter(db, getattr(self.options, 'chunk_size',
+                                            BulkImporter.DEFAULT_CHUNK))
+
+        with open(self.options.file, newline='') as f:
+            count = await importer.load(f)
+
+        print(f"Loaded {count} values, {importer.inserted} inserted, "
+              f"{importer.updated} updated, {importer.skipped} skipped, "
+              f"{importer.fields} new fields and {importer.years} new years "
+              f"in {importer.seconds:0.3f} seconds, {importer.rate:0.0f} "
+              "rows/second.", file=out)
+        return 0
+
+    async def do_report(self, db: Database, out) -> int:
+        """
+        Write a summary of each fiscal year.
+        """
+        print(f"{'Year':<6}{'Current':>8}{'Work On':>8}{'Audit':>6}"
+              f"{'Values':>8}", file=out)
+
+        for year, current, work_on, audit, count in (
+                await db.select_year_summary()):
+            print(f"{year:<6}{current:>8}{work_on:>8}{audit:>6}{count:>8}",
+                  file=out)
+            out.flush()
+
+        return 0
+
+    async def do_rollover(self, db: Database, out) -> int:
+        """
+        Close the current fiscal year.
+        """
+        await self._current_year(db)
+        year = await db.rollover()
+
+        if year is None:
+            print("No current fiscal year in the database.", file=sys.stderr)
+            status = 1
+        else:
+            print(f"The current fiscal year is now {year}.", file=out)
+            status = 0
+
+        return status
+
+    async def do_archive(self, db: Database, out) -> int:
+        """
+        Move audited fiscal years to archive files or restore one.
+        """
+        restore = getattr(self.options, 'restore', None)
+
+        if restore:
+            count = await db.restore_year(restore)
+            print(f"Restored {count} values of {restore}.", file=out)
+            return 0
+
+        year = getattr(self.options, 'year', None)
+        archived = db.archived_years
+        years = [item[0] for item in await db.select_year_summary()
+                 if item[3] == 1 and item[0] not in archived
+                 and (year is None or item[0] == year)]
+
+        if not years:
+            print("There are no audited years to archive.", file=out)
+            return 0
+
+        for year in years:
+            count = await db.archive_year(year)
+            print(f"Archived {count} values of {year} to "
+                  f"{db.archive_fullpath(year)}.", file=out)
+            out.flush()
+
+        await db.vacuum()
+        return 0
+
+    async def do_backup(self, db: Database, out) -> int:
+        """
+        Take a snapshot of the database or check the snapshots.
+        """
+        manager = BackupManager(keep=getattr(self.options, 'keep', None))
+
+        if getattr(self.options, 'verify', False):
+            status = 0
+
+            for path in manager.snapshots:
+                check = manager.verify(path)
+                print(f"{path}: {check}", file=out)
+                status |= int(check != 'ok')
+        else:
+            path = manager.backup()
+            print(f"Backed up {db.user_data_fullpath} to {path}, "
+                  f"{os.path.getsize(path)} bytes.", file=out)
+            status = 0
+
+        return status
+
+    async def do_sync(self, db: Database, out) -> int:
+        """
+        Export or apply the changes between copies of the books.
+        """
+        await db.create_db()  # Adds the change log to older databases.
+        manager = SyncManager(db)
+        action = self.options.action
+
+        if action == 'export':
+            count = await manager.export(
+                out, self.options.peer, getattr(self.options, 'since', None))
+            print(f"Exported {count} changes for {self.options.peer}.",
+                  file=sys.stderr)
+        elif action == 'apply':
+            if not self.options.file:
+                print("A changeset file is needed.", file=sys.stderr)
+                return 1
+
+            with open(self.options.file) as f:
+                counts = await manager.apply(f)
+
+            print(", ".join(f"{value} {key}" for key, value in counts.items()),
+                  file=out)
+        elif action == 'new-site':
+            print(f"The new site id is {await manager.new_site()}.", file=out)
+        else:
+            for key, value in (await manager.status()).items():
+                print(f"{key:<40}{value}", file=out)
+
+        return 0
+
+    async def do_digest(self, db: Database, out) -> int:
+        """
+        Show the digests of the values or list where two copies differ.
+        """
+        await db.create_db()  # Adds the digests to older databases.
+        tree = DigestTree(db)
+        other = getattr(self.options, 'compare', None)
+        year = getattr(self.options, 'year', None)
+        status = 0
+
+        if other:
+            diffs = await tree.compare(other)
+
+            for item in diffs:
+                print("{},{},{}".format(*item), file=out)
+
+            print(f"{len(diffs)} values differ from {other}.",
+                  file=sys.stderr)
+            status = int(bool(diffs))
+        elif year is not None:
+            for (year, month), digest in sorted(
+                    (await tree.months(year)).items()):
+                print(f"{year}-{month:02}  {digest}", file=out)
+        else:
+            print(f"{'all':<8}{await tree.root()}", file=out)
+
+            for year, digest in sorted((await tree.years()).items()):
+                print(f"{year:<8}{digest}", file=out)
+
+        return status
+
+    async def do_vacuum(self, db: Database, out) -> int:
+        """
+        Compact the database.
+        """
+        path = db.user_data_fullpath
+        before = os.path.getsize(path)
+        await db.vacuum()
+        after = os.path.getsize(path)
+        print(f"Vacuumed {path} from {before} to {after} bytes.", file=out)
+        return 0
+
+    def bench(self) -> int:
+        """
+        Run the database benchmarks that do not need the GUI.
+        """
+        try:
+            from scripts.bench_database import BenchDatabase, report
+        except ImportError as e:
+            print(f"The benchmarks are not available, {e}", file=sys.stderr)
+            return 1
+
+        self.options.headless = True
+        results = BenchDatabase(self.options).run()
+
+        with redirect_stdout(self.out):
+            report(results)
+
+        return 0
+
+
+def _run_job(options, path: str) -> tuple:
+    """
+    Run a command on one database in a worker process.
+
+    :returns: The exit status and the output.
+    :rtype: tuple
+    """
+    out = io.StringIO()
+    status = BatchCommands(options, out=out).run_one(path, out)
+    return status, out.getvalue()
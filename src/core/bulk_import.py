@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+#
+# src/core/bulk_import.py
+#
+__docformat__ = "restructuredtext en"
+
+import csv
+import time
+import logging
+
+from ..config import Settings
+from ..instrument import Instrumentation
+from .export import financial_fields
+from .utilities import make_name
+
+
+class BulkImporter:
+    """
+    Load historical data from a spreadsheet saved as CSV without going
+    through the panels. The file is parsed a chunk at a time, missing
+    fields and fiscal years are created in bulk and the values are
+    inserted with one `executemany` per chunk, all inside one transaction
+    so a failure leaves the database as it was. Each chunk is written to a
+    temporary staging table first so the values are matched against the
+    database by (year, month, field) in SQL.
+
+    Two layouts are understood:
+
+    1. The export layout, one value per row with the columns `year`,
+       `month`, `field` and `value`.
+    2. A spreadsheet layout, one month per row with the columns `year` and
+       `month` followed by a column for each field. The column headings
+       may be field names or panel labels.
+
+    The month may be its order (1 to 19) or its name.
+
+    .. note::
+
+       A value whose year, month and field are already in the database
+       updates that row if it differs and is skipped if it is the same,
+       so loading the same file again changes nothing. When a file has a
+       key more than once the last value is used. A file with values for
+       an archived year is not loaded, the year must be restored first.
+    """
+    DEFAULT_CHUNK = 5000
+    KEY_COLUMNS = ('year', 'month')
+    _STAGE = 'temp.bulk_stage'
+
+    def __init__(self, db, chunk_size: int=DEFAULT_CHUNK,
+                 financial: set=None):
+        """
+        :param Database db: The wx-free core database.
+        :param int chunk_size: The number of values inserted at a time.
+        :param set financial: The financial field names, the default is
+                              found from the panel config.
+        """
+        assert chunk_size > 0, (
+            f"The chunk size must be positive, found {chunk_size}.")
+        self.db = db
+        self.chunk_size = chunk_size
+        self._financial = financial
+        self._log = logging.getLogger(Settings().logger_name)
+        self.reset()
+
+    def reset(self) -> None:
+        self.rows = 0
+        self.inserted = 0
+        self.updated = 0
+        self.skipped = 0
+        self.fields = 0
+        self.years = 0
+        self.seconds = 0.0
+
+    @property
+    def financial(self) -> set:
+        if self._financial is None:
+            self._financial = financial_fields()
+
+        return self._financial
+
+    @property
+    def rate(self) -> float:
+        """
+        The values read per second of the last import.
+        """
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    async def load(self, f) -> int:
+        """
+        Import a CSV file.
+
+        :param file f: The open CSV file.
+        :returns: The number of values inserted or updated.
+        :rtype: int
+        """
+        self.reset()
+        start = time.perf_counter()
+        await self.db._insert_into_month_table()
+
+        with Instrumentation().measure('bulk_import') as result:
+            with self.db.clock.unit_of_work(self.db.tzinfo):
+                async with self.db._connect() as conn:
+                    try:
+                        await self._load(conn, f)
+                    except Exception:
+                        await conn.rollback()
+                        self.reset()
+                        raise
+                    else:
+                        await conn.commit()
+
+            result['rows'] = self.rows
+
+        self.seconds = time.perf_counter() - start
+        self._log.info("Bulk imported %s values in %0.4f seconds, %d rows "
+                       "per second, %s inserted, %s updated and %s skipped.",
+                       self.rows, self.seconds, self.rate, self.inserted,
+                       self.updated, self.skipped)
+        return self.inserted + self.updated
+
+    async def _load(self, conn, f) -> None:
+        db = self.db
+        now = db.clock.isoformat(db.tzinfo)
+        months = await self._select_months(conn)
+        years = await self._select_pks(
+            conn, f"SELECT year, pk FROM {db._T_FISCAL_YEAR};")
+        fields = await self._select_pks(
+            conn, f"SELECT field, pk FROM {db._T_FIELD_TYPE};")
+        archived = set(db.archived_years)
+        data, stage = db._T_DATA, self._STAGE
+        await conn.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS {stage} (value TEXT, "
+            "fy1fk INTEGER, fy2fk INTEGER, mfk INTEGER, ffk INTEGER, "
+            "PRIMARY KEY (fy1fk, mfk, ffk));")
+        await db._journal_panel(conn, 'load')
+        key = "{0}.fy1fk = s.fy1fk AND {0}.mfk = s.mfk AND {0}.ffk = s.ffk"
+        update = (
+            f"UPDATE {data} SET value = (SELECT s.value FROM {stage} AS s "
+            f"WHERE {key.format(data)}), m_time = ? WHERE pk IN (SELECT "
+            f"d.pk FROM {stage} AS s JOIN {data} AS d ON {key.format('d')} "
+            "WHERE s.value IS NOT d.value);")
+        insert = (
+            f"INSERT INTO {data} (value, fy1fk, fy2fk, mfk, ffk, c_time, "
+            "m_time) SELECT s.value, s.fy1fk, s.fy2fk, s.mfk, s.ffk, ?, ? "
+            f"FROM {stage} AS s WHERE NOT EXISTS (SELECT 1 FROM {data} AS d "
+            f"WHERE {key.format('d')});")
+
+        for chunk in self.read_chunks(f):
+            await self._add_years(conn, years, {
+                y for item in chunk for y in (item[0], item[0] + 1)}, now)
+            await self._add_fields(conn, fields,
+                                   {item[2] for item in chunk}, now)
+            rows = []
+
+            for year, month, field, value in chunk:
+                if year in archived:
+                    raise ValueError(f"The fiscal year {year} is archived, "
+                                     "restore it before loading it.")
+
+                try:
+                    mfk = months[month]
+                except KeyError:
+                    raise ValueError(f"Invalid month '{month}' in {year}.")
+
+                rows.append((value, years[year], years[year + 1], mfk,
+                             fields[field]))
+
+            await conn.execute(f"DELETE FROM {stage};")
+            await conn.executemany(
+                f"INSERT OR REPLACE INTO {stage} (value, fy1fk, fy2fk, "
+                "mfk, ffk) VALUES (?, ?, ?, ?, ?);", rows)
+            updated = (await conn.execute(update, (now,))).rowcount
+            inserted = (await conn.execute(insert, (now, now))).rowcount
+            self.updated += updated
+            self.inserted += inserted
+            self.skipped += len(rows) - updated - inserted
+            self.rows += len(rows)
+
+        await conn.execute(f"DROP TABLE {stage};")
+
+    def read_chunks(self, f):
+        """
+        Parse the CSV file a chunk at a time.
+
+        :param file f: The open CSV file.
+        :returns: A generator of lists of (<year>, <month>, <field>,
+                  <value>) tuples, the month is its order or name as found.
+        :rtype: Generator
+        """
+        reader = csv.reader(f)
+        header = [make_name(name) for name in next(reader, [])]
+        missing = [key for key in self.KEY_COLUMNS if key not in header]
+        assert not missing, f"The columns {missing} are missing."
+        y_idx, m_idx = (header.index(key) for key in self.KEY_COLUMNS)
+
+        if 'field' in header and 'value' in header:
+            columns = None
+            f_idx, v_idx = header.index('field'), header.index('value')
+        else:
+            columns = [(idx, name) for idx, name in enumerate(header)
+                       if name and idx not in (y_idx, m_idx)
+                       and name != 'month_name']
+
+        chunk = []
+
+        for row in reader:
+            if not any(row):
+                continue
+
+            year, month = int(row[y_idx]), self._month_key(row[m_idx])
+
+            if columns is None:
+                items = ((make_name(row[f_idx]), row[v_idx]),)
+            else:
+                items = ((name, row[idx]) for idx, name in columns
+                         if idx < len(row) and row[idx].strip())
+
+            for field, value in items:
+                chunk.append((year, month, field, self.to_db(field, value)))
+
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+
+        if chunk:
+            yield chunk
+
+    def to_db(self, field: str, value: str) -> str:
+        """
+        Convert a spreadsheet value to a database value, currency signs and
+        thousands separators are removed from financial values.
+        """
+        value = value.strip()
+
+        if field in self.financial:
+            value = value.replace('$', '').replace(',', '')
+            value = self.db._panel_to_financial_panel(value)
+            value = str(int(self.db._value_to_db(value, financial=True)))
+
+        return value
+
+    def _month_key(self, value: str):
+        value = value.strip()
+        return int(value) if value.isdigit() else value
+
+    async def _select_months(self, conn) -> dict:
+        """
+        Map both the order and the name of each month to its pk.
+        """
+        months = {}
+
+        async with conn.execute(
+                f"SELECT pk, month, ord FROM {self.db._T_MONTH};") as cursor:
+            for pk, name, order in await cursor.fetchall():
+                months[order] = months[name] = pk
+
+        return months
+
+    async def _select_pks(self, conn, query: str) -> dict:
+        async with conn.execute(query) as cursor:
+            return dict(await cursor.fetchall())
+
+    async def _add_years(self, conn, years: dict, wanted: set,
+                         now: str) -> None:
+        """
+        Create the fiscal years that are missing, they start on the same
+        month and day as the earliest year in the database.
+        """
+        missing = sorted(wanted - set(years))
+
+        if missing:
+            async with conn.execute(
+                    f"SELECT month, day FROM {self.db._T_FISCAL_YEAR} "
+                    "ORDER BY year LIMIT 1;") as cursor:
+                month, day = await cursor.fetchone() or (1, 1)
+
+            await conn.executemany(
+                f"INSERT INTO {self.db._T_FISCAL_YEAR} (year, month, day, "
+                "current, work_on, audit, c_time, m_time) "
+                "VALUES (?, ?, ?, 0, 0, 0, ?, ?);",
+                [(year, month, day, now, now) for year in missing])
+            years.update(await self._select_pks(
+                conn, f"SELECT year, pk FROM {self.db._T_FISCAL_YEAR};"))
+            self.years += len(missing)
+
+    async def _add_fields(self, conn, fields: dict, wanted: set,
+                          now: str) -> None:
+        """
+        Create the fields that are missing.
+        """
+        missing = sorted(wanted - set(fields))
+
+        if missing:
+            await conn.executemany(
+                f"INSERT INTO {self.db._T_FIELD_TYPE} (field, c_time, "
+                "m_time) VALUES (?, ?, ?);",
+                [(field, now, now) for field in missing])
+            fields.update(await self._select_pks(
+                conn, f"SELECT field, pk FROM {self.db._T_FIELD_TYPE};"))
+            self.fields += len(missing)
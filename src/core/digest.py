@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+#
+# src/core/digest.py
+#
+__docformat__ = "restructuredtext en"
+
+import os
+import gzip
+import shutil
+import hashlib
+import tempfile
+import aiosqlite
+
+from itertools import groupby
+from contextlib import asynccontextmanager
+from urllib.request import pathname2url
+
+from ..instrument import Instrumentation
+
+
+class DigestTree:
+    """
+    A hash tree over the values of the books, used to find where two
+    copies of the books differ without reading all of them.
+
+    The leaves are the values of each (fiscal year, month, field), the
+    digest of each month is kept in the `digest` table and the year and
+    database digests are rolled up from the month digests when asked for.
+    The triggers created with the schema mark a month stale when one of
+    its values is inserted or changed, the `Database` write methods hash
+    the stale months again before they commit and rows written any other
+    way, such as by a sync or a bulk load, are hashed the next time the
+    digests are read.
+
+    .. note::
+
+       Archiving a year keeps its month digests, the values are only moved
+       so a copy with archived years matches one without them.
+    """
+
+    def __init__(self, db):
+        """
+        :param Database db: The wx-free core database.
+        """
+        self.db = db
+
+    async def refresh(self, conn=None) -> int:
+        """
+        Hash the stale months.
+
+        :param aiosqlite.Connection conn: Hash inside this connection's
+                                          transaction, the caller commits.
+        :returns: The number of months hashed.
+        :rtype: int
+        """
+        if conn is None:
+            async with self.db._connect() as conn:
+                count = await self.refresh(conn)
+                await conn.commit()
+        else:
+            count = len(await self._hash_stale(conn, save=True))
+
+        return count
+
+    async def months(self, year: int=None) -> dict:
+        """
+        The month digests.
+
+        :param int year: Only the months of this fiscal year.
+        :returns: The digests in the form of {(year, month): digest, ...}.
+        :rtype: dict
+        """
+        async with self.db._connect() as conn:
+            months = await self._months(conn, save=True)
+            await conn.commit()
+
+        if year is not None:
+            months = {key: value for key, value in months.items()
+                      if key[0] == year}
+
+        return months
+
+    async def years(self) -> dict:
+        """
+        The year digests rolled up from the month digests.
+
+        :returns: The digests in the form of {year: digest, ...}.
+        :rtype: dict
+        """
+        return self.roll_up(await self.months())
+
+    async def root(self) -> str:
+        """
+        The digest of the whole database.
+
+        :returns: The digest or None if there are no values.
+        :rtype: str
+        """
+        return self._root(await self.months())
+
+    async def fields(self, year: int, month: int) -> dict:
+        """
+        The leaf digests of one month.
+
+        :param int year: A Baha'i year.
+        :param int month: The order of the Baha'i month.
+        :returns: The digests in the form of {field: digest, ...}.
+        :rtype: dict
+
+        .. note::
+
+           The values of an archived year are read from its archive.
+        """
+        table, archives = self.db._config_data_source(year)
+
+        async with self.db._connect_archives(archives) as conn:
+            return await self._fields(conn, year, month, table)
+
+    async def compare(self, path: str) -> list:
+        """
+        Walk the trees of this database and another copy, the values are
+        only read for the months whose digests differ.
+
+        :param str path: The other database, it may be a compressed
+                         snapshot and is only read.
+        :returns: The (year, month, field) leaves that differ, in order.
+        :rtype: list
+        """
+        with Instrumentation().measure('digest_compare') as result:
+            async with self.db._connect() as conn, self._open(path) as other:
+                local = await self._months(conn, save=True)
+                await conn.commit()
+                remote = await self._months(other, save=False)
+                diffs = []
+
+                if self._root(local) != self._root(remote):
+                    local_years = self.roll_up(local)
+                    remote_years = self.roll_up(remote)
+                    months = sorted(
+                        key for key in local.keys() | remote.keys()
+                        if local_years.get(key[0]) != remote_years.get(key[0])
+                        and local.get(key) != remote.get(key))
+
+                    for year, month in months:
+                        mine = await self.fields(year, month)
+                        theirs = await self._fields(other, year, month)
+                        diffs.extend(
+                            (year, month, field)
+                            for field in sorted(mine.keys() | theirs.keys())
+                            if mine.get(field) != theirs.get(field))
+
+                    result['rows'] = len(months)
+
+        return diffs
+
+    @staticmethod
+    def roll_up(digests: dict) -> dict:
+        """
+        Hash the child digests of each parent.
+
+        :param dict digests: The digests in the form of
+                             {(parent, child): digest, ...}.
+        :returns: The digests in the form of {parent: digest, ...}.
+        :rtype: dict
+        """
+        parents = {}
+
+        for parent, items in groupby(sorted(digests.items()),
+                                     key=lambda item: item[0][0]):
+            parents[parent] = hashlib.sha256(''.join(
+                f"{key[1]}:{digest}\n" for key, digest in items
+                ).encode()).hexdigest()
+
+        return parents
+
+    #
+    # Internal methods
+    #
+
+    def _root(self, months: dict) -> str:
+        return self.roll_up({(0, year): digest for year, digest in (
+            self.roll_up(months)).items()}).get(0)
+
+    def _leaf_query(self, where: str, table: str=None) -> str:
+        db = self.db
+        table = table or db._T_DATA
+        return (f"SELECT y.year, m.ord, f.field, d.value FROM {table} "
+                f"AS d JOIN {db._T_FISCAL_YEAR} AS y ON y.pk = d.fy1fk "
+                f"JOIN {db._T_MONTH} AS m ON m.pk = d.mfk "
+                f"JOIN {db._T_FIELD_TYPE} AS f ON f.pk = d.ffk {where} "
+                "ORDER BY y.year, m.ord, f.field, d.value;")
+
+    def _leaves(self, rows) -> dict:
+        """
+        Hash the values of one month's fields.
+        """
+        return {field: hashlib.sha256('\x1f'.join(
+            (field, *(row[3] for row in items))).encode()).hexdigest()
+                for field, items in groupby(rows, key=lambda row: row[2])}
+
+    def _month(self, leaves: dict) -> str:
+        return hashlib.sha256(''.join(leaves.values()).encode()).hexdigest()
+
+    async def _fields(self, conn, year: int, month: int,
+                      table: str=None) -> dict:
+        query = self._leaf_query("WHERE y.year = ? AND m.ord = ?", table)
+
+        async with conn.execute(query, (year, month)) as cursor:
+            return self._leaves(await cursor.fetchall())
+
+    async def _months(self, conn, save: bool) -> dict:
+        """
+        Read the month digests, hashing any that are stale. A database
+        from before there were digests is hashed in full.
+        """
+        async with conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND "
+                "name = ?;", (self.db._T_DIGEST,)) as cursor:
+            kept = await cursor.fetchone() is not None
+
+        if kept:
+            async with conn.execute(
+                    f"SELECT year, month, hash FROM {self.db._T_DIGEST} "
+                    "WHERE hash IS NOT NULL;") as cursor:
+                months = {(year, month): digest
+                          for year, month, digest in await cursor.fetchall()}
+
+            months.update(await self._hash_stale(conn, save))
+        else:
+            months = await self._hash(conn, "")
+
+        return months
+
+    async def _hash_stale(self, conn, save: bool) -> dict:
+        table = self.db._T_DIGEST
+        months = await self._hash(
+            conn, "WHERE (y.year, m.ord) IN (SELECT year, month FROM "
+            f"{table} WHERE hash IS NULL)")
+
+        if save:
+            await conn.executemany(
+                f"UPDATE {table} SET hash = ? WHERE year = ? AND month = ?;",
+                [(digest, *key) for key, digest in months.items()])
+            # Months whose values are all gone.
+            await conn.execute(f"DELETE FROM {table} WHERE hash IS NULL;")
+
+        return months
+
+    async def _hash(self, conn, where: str) -> dict:
+        async with conn.execute(self._leaf_query(where)) as cursor:
+            rows = await cursor.fetchall()
+
+        return {key: self._month(self._leaves(items))
+                for key, items in groupby(rows, key=lambda row: row[:2])}
+
+    @asynccontextmanager
+    async def _open(self, path: str):
+        """
+        Open another database read-only, a compressed snapshot is
+        uncompressed to a temporary file first.
+        """
+        tmp = None
+
+        if path.endswith('.gz'):
+            fd, tmp = tempfile.mkstemp(suffix='.sqlite3')
+
+            with os.fdopen(fd, 'wb') as dst, gzip.open(path, 'rb') as src:
+                shutil.copyfileobj(src, dst)
+
+            path = tmp
+
+        assert os.path.exists(path), f"The database {path} does not exist."
+
+        try:
+            async with aiosqlite.connect(
+                    f"file:{pathname2url(os.path.abspath(path))}?mode=ro",
+                    uri=True) as conn:
+                yield conn
+        finally:
+            if tmp:
+                os.remove(tmp)
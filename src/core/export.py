@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+#
+# src/core/export.py
+#
+__docformat__ = "restructuredtext en"
+
+import os
+import csv
+import json
+
+from ..config import BaseSystemData
+from .utilities import make_name, panel_fields
+
+
+def financial_fields(doc=None) -> set:
+    """
+    Find the names of the financial fields on all the panels.
+
+    :param tk.toml_document.TOMLDocument doc: The panel config, the default
+                                              is the loaded one, else the
+                                              user's or the local file.
+    :returns: The field names.
+    :rtype: set
+    """
+    if doc is None:
+        bsd = BaseSystemData()
+        doc = bsd.panel_config
+
+        if doc is None:
+            path = (bsd.user_config_fullpath
+                    if os.path.exists(bsd.user_config_fullpath)
+                    else bsd.local_config_fullpath)
+            doc = bsd.parse_toml(path)
+            doc = {} if isinstance(doc, int) else doc
+
+    names = set()
+
+    for panel in doc.values():
+        if isinstance(panel, dict) and 'widgets' in panel:
+            names.update(make_name(label) for label, financial
+                         in panel_fields(panel['widgets']) if financial)
+
+    return names
+
+
+class DataExporter:
+    """
+    Stream the values of the config_data table to a file as CSV or JSON
+    Lines. The rows are read from the database a batch at a time and each
+    batch is written and flushed before the next is read, so the memory
+    used does not grow with the number of years and output starts at once.
+    Financial values are written as they are shown on the panels.
+    """
+    FORMATS = ('csv', 'jsonl')
+    HEADER = ('year', 'month', 'month_name', 'field', 'value')
+
+    def __init__(self, db, fmt: str='csv', batch_size: int=None,
+                 financial: set=None):
+        """
+        :param Database db: The wx-free core database.
+        :param str fmt: One of the `FORMATS`.
+        :param int batch_size: The rows read at a time, the default is the
+                               database's `CONFIG_DATA_BATCH`.
+        :param set financial: The financial field names, the default is
+                              found from the panel config.
+        """
+        assert fmt in self.FORMATS, f"Invalid export format '{fmt}'."
+        self.db = db
+        self.fmt = fmt
+        self.batch_size = batch_size if batch_size else db.CONFIG_DATA_BATCH
+        self._financial = financial
+
+    @property
+    def financial(self) -> set:
+        if self._financial is None:
+            self._financial = financial_fields()
+
+        return self._financial
+
+    async def export(self, out, year: int=None) -> int:
+        """
+        Write the values of one or all years.
+
+        :param file out: An open text file.
+        :param int year: A Baha'i year, the default is all years.
+        :returns: The number of values written.
+        :rtype: int
+        """
+        write = self._csv_writer(out) if self.fmt == 'csv' else (
+            self._jsonl_writer(out))
+        count = 0
+
+        async for rows in self.db.iter_config_data(year, self.batch_size):
+            for row in rows:
+                write(self.to_export(row))
+
+            out.flush()
+            count += len(rows)
+
+        return count
+
+    def to_export(self, row: tuple) -> tuple:
+        """
+        Convert a database row to an exported row.
+        """
+        *keys, field, value = row
+
+        if field in self.financial:
+            value = self.db._db_fiancial_to_panel(value)
+
+        return (*keys, field, value)
+
+    def to_db(self, field: str, value: str) -> str:
+        """
+        Convert an exported value back to a database value, financial
+        values are normalized the same way the panels do and stored in
+        cents.
+        """
+        if field in self.financial:
+            value = self.db._panel_to_financial_panel(value)
+            value = str(int(self.db._value_to_db(value, financial=True)))
+
+        return value
+
+    def _csv_writer(self, out):
+        writer = csv.writer(out)
+        writer.writerow(self.HEADER)
+        return writer.writerow
+
+    def _jsonl_writer(self, out):
+        def write(row):
+            out.write(json.dumps(dict(zip(self.HEADER, row)),
+                                 ensure_ascii=False) + '\n')
+
+        return write
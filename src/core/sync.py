@@ -0,0 +1,345 @@
+# -*- coding: utf-8 -*-
+#
+# src/core/sync.py
+#
+__docformat__ = "restructuredtext en"
+
+import json
+import logging
+
+from ..config import Settings
+from ..instrument import Instrumentation
+
+
+class SyncManager:
+    """
+    Move the changes made to one copy of the books into another.
+
+    The triggers created with the schema keep one `change_log` row for each
+    row of `field_type`, `fiscal_year` and `config_data` holding its
+    version, the copy (site) that made the version and a sequence number
+    that increases with every change. A changeset holds the rows whose
+    sequence is past the last one sent to a peer, written as JSON Lines
+    with the foreign keys replaced by the year, month and field they point
+    to. Years and fields are matched by their natural keys and values by
+    the uid they were given when first inserted, or by their year, month
+    and field when the uid is not known.
+
+    When both copies changed the same row the version with the higher
+    (version, m_time, site) wins on both sides, so the copies agree no
+    matter which way they are synced first.
+
+    .. note::
+
+       A copy made by copying the database file has the same site id as
+       the original, give it a new one with `new_site` before syncing.
+       Deletes, such as archiving a year, are not synced.
+    """
+    FORMAT = 1
+    _FIELDS = {
+        'field_type': ('field', 'c_time', 'm_time'),
+        'fiscal_year': ('year', 'month', 'day', 'current', 'work_on',
+                        'audit', 'c_time', 'm_time'),
+        'config_data': ('value', 'year', 'next_year', 'month', 'field',
+                        'c_time', 'm_time'),
+        }
+
+    def __init__(self, db):
+        """
+        :param Database db: The wx-free core database.
+        """
+        self.db = db
+        self._log = logging.getLogger(Settings().logger_name)
+
+    async def site(self) -> str:
+        """
+        The site id of this copy.
+        """
+        return await self._get_state('site')
+
+    async def new_site(self) -> str:
+        """
+        Give this copy a new site id.
+
+        :returns: The new site id.
+        :rtype: str
+        """
+        async with self.db._connect() as conn:
+            await conn.execute(
+                f"UPDATE {self.db._T_SYNC_STATE} SET value = "
+                "lower(hex(randomblob(16))) WHERE key = 'site';")
+            await conn.commit()
+
+        return await self.site()
+
+    async def status(self) -> dict:
+        """
+        The sync state, the site id, the last sequence and the marks of
+        the peers.
+
+        :rtype: dict
+        """
+        state = dict(await self.db._do_select_query(
+            f"SELECT key, value FROM {self.db._T_SYNC_STATE} "
+            "ORDER BY key;"))
+        state['seq'] = (await self.db._do_select_query(
+            f"SELECT COALESCE(MAX(seq), 0) FROM {self.db._T_CHANGE_LOG};"
+            ))[0][0]
+        return state
+
+    async def export(self, out, peer: str='default', since: int=None) -> int:
+        """
+        Write the changes a peer has not been sent.
+
+        :param file out: An open text file.
+        :param str peer: A name for the copy the changes are for.
+        :param int since: Send the changes after this sequence instead of
+                          the last one sent to the peer, 0 sends all.
+        :returns: The number of changes written.
+        :rtype: int
+        """
+        key = f"sent:{peer}"
+
+        if since is None:
+            since = int(await self._get_state(key) or 0)
+
+        state = await self.status()
+        header = {'format': self.FORMAT, 'site': state['site'],
+                  'since': since, 'seq': state['seq']}
+        out.write(json.dumps(header) + '\n')
+        count = 0
+
+        with Instrumentation().measure('sync_export') as result:
+            async with self.db._connect() as conn:
+                for table in self.db._SYNCED:
+                    async with conn.execute(
+                            self._export_query(table), (since,)) as cursor:
+                        async for row in cursor:
+                            uid, version, site, *data = row
+                            out.write(json.dumps({
+                                'table': table, 'uid': uid,
+                                'version': version, 'site': site,
+                                'data': dict(zip(self._FIELDS[table], data))},
+                                ensure_ascii=False) + '\n')
+                            count += 1
+
+            result['rows'] = count
+
+        await self._set_state(key, state['seq'])
+        return count
+
+    async def apply(self, f) -> dict:
+        """
+        Apply a changeset from another copy, all of it or none of it.
+
+        :param file f: The open changeset.
+        :returns: The counts of the rows 'inserted', 'updated' and
+                  'skipped' because the local version won.
+        :rtype: dict
+        """
+        header = json.loads(f.readline())
+        assert header.get('format') == self.FORMAT, (
+            f"Unknown changeset format {header.get('format')}.")
+        site = await self.site()
+        assert header['site'] != site, (
+            "The changeset was made by this copy or a file copy of it, give "
+            "one of them a new site id.")
+        counts = dict.fromkeys(('inserted', 'updated', 'skipped'), 0)
+
+        async with self.db._connect() as conn:
+            try:
+                await conn.execute(
+                    f"INSERT INTO {self.db._T_SYNC_STATE} (key, value) "
+                    "VALUES ('applying', '1');")
+                await self.db._journal_panel(conn, 'sync')
+
+                for line in f:
+                    if line.strip():
+                        result = await self._apply_change(
+                            conn, json.loads(line))
+                        counts[result] += 1
+
+                await conn.execute(
+                    f"DELETE FROM {self.db._T_SYNC_STATE} "
+                    "WHERE key = 'applying';")
+                await conn.execute(
+                    f"INSERT OR REPLACE INTO {self.db._T_SYNC_STATE} "
+                    "(key, value) VALUES (?, ?);",
+                    (f"received:{header['site']}", str(header['seq'])))
+            except Exception:
+                await conn.rollback()
+                raise
+            else:
+                await conn.commit()
+
+        self._log.info("Applied the changeset from %s, %s.", header['site'],
+                       counts)
+        return counts
+
+    #
+    # Internal methods
+    #
+
+    def _export_query(self, table: str) -> str:
+        db = self.db
+        select = "c.uid, c.version, c.site, "
+
+        if table == db._T_DATA:
+            select += (
+                "t.value, y1.year, y2.year, m.ord, f.field, t.c_time, "
+                f"t.m_time FROM {table} AS t "
+                f"JOIN {db._T_FISCAL_YEAR} AS y1 ON y1.pk = t.fy1fk "
+                f"JOIN {db._T_FISCAL_YEAR} AS y2 ON y2.pk = t.fy2fk "
+                f"JOIN {db._T_MONTH} AS m ON m.pk = t.mfk "
+                f"JOIN {db._T_FIELD_TYPE} AS f ON f.pk = t.ffk ")
+        else:
+            select += ', '.join(f"t.{name}" for name in self._FIELDS[table])
+            select += f" FROM {table} AS t "
+
+        return (f"SELECT {select}JOIN {db._T_CHANGE_LOG} AS c "
+                f"ON c.tbl = '{table}' AND c.rid = t.pk "
+                "WHERE c.seq > ? ORDER BY c.seq;")
+
+    async def _apply_change(self, conn, change: dict) -> str:
+        """
+        Apply one row.
+
+        :returns: 'inserted', 'updated' or 'skipped'.
+        :rtype: str
+        """
+        table, data = change['table'], change['data']
+        assert table in self.db._SYNCED, f"Invalid table '{table}'."
+
+        if table == self.db._T_DATA:
+            rid = await self._fetch_value(
+                conn, f"SELECT rid FROM {self.db._T_CHANGE_LOG} "
+                "WHERE tbl = ? AND uid = ?;", (table, change['uid']))
+            values = await self._data_values(conn, data)
+
+            if rid is None:
+                # The same year, month and field entered on both copies is
+                # one value, so the two versions conflict.
+                rid = await self._fetch_value(
+                    conn, f"SELECT pk FROM {table} WHERE fy1fk = ? AND "
+                    "mfk = ? AND ffk = ? ORDER BY pk;",
+                    (values['fy1fk'], values['mfk'], values['ffk']))
+        elif table == self.db._T_FISCAL_YEAR:
+            rid = await self._fetch_value(
+                conn, f"SELECT pk FROM {table} WHERE year = ?;",
+                (data['year'],))
+            values = data
+        else:
+            rid = await self._fetch_value(
+                conn, f"SELECT pk FROM {table} WHERE field = ?;",
+                (data['field'],))
+            values = data
+
+        if rid is None:
+            rid = await self._insert(conn, table, values)
+            result = 'inserted'
+        elif await self._remote_wins(conn, table, rid, change):
+            await self._update(conn, table, rid, values)
+            result = 'updated'
+        else:
+            return 'skipped'
+
+        await self._log_row(conn, table, rid, change['uid'],
+                            change['version'], change['site'], data['m_time'])
+        return result
+
+    async def _log_row(self, conn, table: str, rid: int, uid: str,
+                       version: int, site: str, m_time: str) -> None:
+        await conn.execute(
+            f"INSERT OR REPLACE INTO {self.db._T_CHANGE_LOG} (tbl, rid, uid, "
+            "version, site, seq, m_time) VALUES (?, ?, ?, ?, ?, "
+            f"{self.db._NEXT_SEQ}, ?);",
+            (table, rid, uid, version, site, m_time))
+
+    async def _remote_wins(self, conn, table: str, rid: int,
+                           change: dict) -> bool:
+        async with conn.execute(
+                f"SELECT version, m_time, site FROM {self.db._T_CHANGE_LOG} "
+                "WHERE tbl = ? AND rid = ?;", (table, rid)) as cursor:
+            local = await cursor.fetchone()
+
+        remote = (change['version'], change['data']['m_time'],
+                  change['site'])
+        return local is None or remote > tuple(local)
+
+    async def _data_values(self, conn, data: dict) -> dict:
+        """
+        Replace the year, month and field of a value with their pks.
+        """
+        db = self.db
+        values = {'value': data['value'], 'c_time': data['c_time'],
+                  'm_time': data['m_time']}
+
+        for key, year in (('fy1fk', data['year']),
+                          ('fy2fk', data['next_year'])):
+            values[key] = await self._fetch_value(
+                conn, f"SELECT pk FROM {db._T_FISCAL_YEAR} WHERE year = ?;",
+                (year,))
+
+            if values[key] is None:
+                values[key] = await self._insert(conn, db._T_FISCAL_YEAR, {
+                    'year': year, 'month': 1, 'day': 1, 'current': 0,
+                    'work_on': 0, 'audit': 0, 'c_time': data['c_time'],
+                    'm_time': data['c_time']}, log=True)
+
+        values['mfk'] = await self._fetch_value(
+            conn, f"SELECT pk FROM {db._T_MONTH} WHERE ord = ?;",
+            (data['month'],))
+        assert values['mfk'] is not None, (
+            f"Invalid month {data['month']} in {data}.")
+        values['ffk'] = await self._fetch_value(
+            conn, f"SELECT pk FROM {db._T_FIELD_TYPE} WHERE field = ?;",
+            (data['field'],))
+
+        if values['ffk'] is None:
+            values['ffk'] = await self._insert(conn, db._T_FIELD_TYPE, {
+                'field': data['field'], 'c_time': data['c_time'],
+                'm_time': data['c_time']}, log=True)
+
+        return values
+
+    async def _insert(self, conn, table: str, values: dict,
+                      log: bool=False) -> int:
+        """
+        Insert a row, one that is only made because a value needs it is
+        logged as version 0 so any version from a peer replaces it.
+        """
+        columns = ', '.join(values)
+        marks = ', '.join(f":{key}" for key in values)
+        cursor = await conn.execute(
+            f"INSERT INTO {table} ({columns}) VALUES ({marks});", values)
+
+        if log:
+            await self._log_row(conn, table, cursor.lastrowid, None, 0, '',
+                                values['m_time'])
+
+        return cursor.lastrowid
+
+    async def _update(self, conn, table: str, rid: int, values: dict) -> None:
+        columns = ', '.join(f"{key} = :{key}" for key in values
+                            if key != 'c_time')
+        await conn.execute(f"UPDATE {table} SET {columns} WHERE pk = :pk;",
+                           {**values, 'pk': rid})
+
+    async def _fetch_value(self, conn, query: str, params: tuple):
+        async with conn.execute(query, params) as cursor:
+            row = await cursor.fetchone()
+
+        return row[0] if row else None
+
+    async def _get_state(self, key: str) -> str:
+        rows = await self.db._do_select_query(
+            f"SELECT value FROM {self.db._T_SYNC_STATE} WHERE key = ?;",
+            (key,))
+        return rows[0][0] if rows else None
+
+    async def _set_state(self, key: str, value) -> None:
+        async with self.db._connect() as conn:
+            await conn.execute(
+                f"INSERT OR REPLACE INTO {self.db._T_SYNC_STATE} (key, value) "
+                "VALUES (?, ?);", (key, str(value)))
+            await conn.commit()
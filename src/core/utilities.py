@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+#
+# src/core/utilities.py
+#
+__docformat__ = "restructuredtext en"
+
+import re
+
+from ..lazy_import import lazy_import
+
+badidatetime = lazy_import('badidatetime')
+
+
+def make_name(name: str):
+    name = re.sub(r"[&*\(\):\"'/\\]+", '', name)
+    name = re.sub(r"[- \s]+", '_', name).strip('_')
+    return re.sub(r"_+", "_", name).lower()
+
+
+def find_dict(value: list) -> dict:
+    """
+    Fine the dict in the Toml data that is in the widget value list.
+
+    :param list value: A list that defines a widget from a TOML file.
+    :return: A dict with attributes that define a widget.
+    :rtype: dict
+    """
+    for item in value:
+        if isinstance(item, dict):
+            break
+        else:
+            item = {}
+
+    return item
+
+
+def panel_fields(widgets: dict) -> list:
+    """
+    Find the data fields in the widgets of a panel from the TOML config, a
+    field is a `StaticText` with a label ending in a colon followed by a
+    `TextCtrl`.
+
+    :param dict widgets: The widgets table of one panel.
+    :returns: A list of (<label>, <financial>) tuples in widget order.
+    :rtype: list
+    """
+    keys = sorted(widgets)
+    fields = []
+
+    for key, next_key in zip(keys, keys[1:]):
+        if (widgets[key][0] != 'StaticText'
+                or widgets[next_key][0] != 'TextCtrl'):
+            continue
+
+        label = find_dict(widgets[key]).get('args', [''])[-1]
+
+        if label.endswith(':'):
+            fields.append((label, find_dict(widgets[next_key]).get(
+                'financial', False)))
+
+    return fields
+
+
+def ordered_month():
+    """
+    Numerically order Badí' months in a dict.
+
+    :returns: A list of tuples in the form of [(<month name>, <order>), ...]]
+    :rtype: list
+    """
+    numbers = (1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11,
+               12, 13, 14, 15, 16, 17, 18, 0, 19)
+    return dict([(numbers[idx], month)
+                 for idx, month in enumerate(badidatetime.MONTHNAMES)])
+
+
+class Borg:
+    """
+    We store the instances instead of the __dict__. This alows the updating
+    of future instances with the data from the previous instances. Without
+    this, new instances would not have all the data.
+    """
+    def __new__(cls, *args, **kwargs):
+        if not hasattr(cls, '_instances'):
+            cls._instances = []
+
+        instance = super().__new__(cls)
+        cls._instances.append(instance)
+
+        if cls._instances:
+            for key, value in cls._instances[0].__dict__.items():
+                instance.__dict__[key] = value
+
+        return instance
+
+    def __setattr__(self, name, value):
+        # Prevent polluting shared state with internal __dict__
+        if name == '__dict__':
+            return
+
+        # Let Python run descriptor logic
+        object.__setattr__(self, name, value)
+        # Propagate the value to all other instances **only if**
+        # the name is not a data descriptor (i.e., not a property)
+        cls = type(self)
+        attr = getattr(cls, name, None)
+
+        if not hasattr(attr, '__set__'):
+            for inst in cls._instances:
+                if inst is not self:
+                    inst.__dict__[name] = value
+
+    def clear_state(self):
+        for inst in self._instances:
+            inst.__dict__.clear()
+
+        self._instances.clear()
+
+
+class StoreObjects(Borg):
+    _object_store = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+    def set_object(self, key, value):
+        self._object_store[key] = value
+
+    def get_object(self, key):
+        return self._object_store.get(key)
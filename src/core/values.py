@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+#
+# src/core/values.py
+#
+__docformat__ = "restructuredtext en"
+
+import re
+
+
+class ValueConversion:
+    """
+    Converts values between the form they are entered in and the form
+    they are stored in the database.
+    """
+
+    def _status_warning(self, msg: str) -> None:
+        """
+        Show a warning to the user, the headless core has nowhere to show
+        it so it is only logged by the caller. The GUI overrides this.
+
+        :param str msg: The warning message.
+        """
+        pass
+
+    def _status_error(self, msg: str) -> None:
+        """
+        Show an error to the user, see `_status_warning`.
+
+        :param str msg: The error message.
+        """
+        pass
+
+    def _value_to_db(self, value, financial: bool=False) -> str:
+        """
+        Convert the text currency value to an integer.
+
+        .. note::
+
+           We store currency values as integers converted to strings.
+           Example $1952.14 in the db is 195214.
+
+        :param value: A currency value from a field.
+        :type value: str or badidatetime.date or datetime.date
+        :returns: An integer value suttable for putting in the database.
+        :rtype: str
+        """
+        neg = False
+
+        if isinstance(value, int):
+            value = str(value)
+
+        if financial and value != '':
+            if value[0] == '-':
+                neg = True
+                value = value[1:]
+            elif value[0] == '+':
+                value = value[1:]
+
+            value = value.replace('.', '')
+        elif not isinstance(value, str):  # Badí' and wx.DateTime dates.
+            value = str(value)
+        else:
+            value = value.strip()
+
+        return value
+
+    def _db_fiancial_to_panel(self, value: str) -> str:
+        """
+        Convert a fiancial value from the database into a value sutable for
+        displaying in a widget.
+
+        :param int value: A currency value from the database.
+        :returns: A string representation of a currency value.
+        :rtype: str
+        """
+        try:
+            value = f"{int(value)/100:.2f}"
+        except ValueError:
+            try:
+                value = f"{float(value):.2f}"
+            except ValueError:
+                value = "0.00"
+
+        return value
+
+    def _panel_to_financial_panel(self, value: str) -> str:
+        """
+        Convert a financial value from the panel into a value sutable for
+        displaying in a panel widget.
+
+        :param str value: A financial value from a panel.
+        :returns: A string representation of a currency value.
+        :rtype: str
+        """
+        try:
+            value = f"{int(value):.2f}"
+        except ValueError:
+            try:
+                value = f"{float(value):.2f}"
+            except ValueError:
+                value = "0.00"
+
+        return value
+
+    def _str_to_int(self, value: str) -> int:
+        """
+        Convert a string to an integer.
+
+        :param str value: Value to convert.
+        :returns: Converted value or zero if value was not numeric.
+        :rtype: int
+        """
+        if not isinstance(value, int):
+            if value.isdigit():
+                value = int(value)
+            elif value.count('.'):
+                try:
+                    value = int(re.sub(r'\.', '', value))
+                except ValueError as e:
+                    msg = f"Expected a numeric value found '{value}'."
+                    self._status_warning(msg)
+                    self._log.warning(msg[:-1] + ", %s", e)
+                    value = 0
+            else:
+                msg = f"Expected a numeric value found '{value}'."
+                self._status_warning(msg)
+                self._log.warning(msg)
+                value = 0
+
+        return value
+
+    def is_badi_date_object(self, obj):
+        return (obj.__class__.__name__ == 'date' and
+                obj.__class__.__module__.endswith("badidatetime.datetime"))
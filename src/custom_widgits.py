@@ -13,18 +13,7 @@ from wx.lib.newevent import NewEvent
 
 import badidatetime
 
-
-def ordered_month():
-    """
-    Numerically order Badí' months in a dict.
-
-    :returns: A list of tuples in the form of [(<month name>, <order>), ...]]
-    :rtype: list
-    """
-    numbers = (1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11,
-               12, 13, 14, 15, 16, 17, 18, 0, 19)
-    return dict([(numbers[idx], month)
-                 for idx, month in enumerate(badidatetime.MONTHNAMES)])
+from .core.utilities import ordered_month
 
 
 class CustomTextCtrl(wx.Control):
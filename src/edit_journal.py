@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+#
+# src/edit_journal.py
+#
+__docformat__ = "restructuredtext en"
+
+import os
+import json
+import logging
+from collections import deque
+
+import tomlkit as tk
+
+
+class EditJournal:
+    """
+    A bounded undo/redo journal for the field edits done on one panel.
+
+    Each edit is kept as a small operation record and undo applies the
+    inverse operation, so the Toml doc is never copied. Only a removed
+    field keeps its widget values, which are needed to put it back.
+
+    If a directory is given the journal of each panel is written to its
+    own file after every change, and `load()` replays it onto a freshly
+    loaded panel so an edit session survives a restart. The journal is
+    cleared once the panel has been saved.
+
+    A journal is only replayed the first time a panel is started, the
+    edits of a panel that is started again are kept in memory.
+    """
+    ADD = 'add'
+    REMOVE = 'remove'
+    RENAME = 'rename'
+    MOVE = 'move'
+    DEFAULT_SIZE = 100
+
+    def __init__(self, tcp, max_size: int=DEFAULT_SIZE,
+                 journal_dir: str=None, logger_name: str=None):
+        """
+        :param TomlCreatePanel tcp: The object holding the panel being
+                                    edited.
+        :param int max_size: The maximum number of edits that can be
+                             undone.
+        :param str journal_dir: The directory to persist the journals to,
+                                the default is not to persist them.
+        :param str logger_name: The logger to use.
+        """
+        self._tcp = tcp
+        self._undo = deque(maxlen=max_size)
+        self._redo = deque(maxlen=max_size)
+        self._journal_dir = journal_dir
+        self._panel_name = None
+        self._sessions = {}
+        self._log = logging.getLogger(logger_name)
+
+    @property
+    def panel_name(self) -> str:
+        return self._panel_name
+
+    @property
+    def path(self) -> str:
+        """
+        The file the journal of the current panel is persisted to or None.
+        """
+        path = None
+
+        if self._journal_dir and self._panel_name:
+            path = os.path.join(self._journal_dir,
+                                f"{self._panel_name}.json")
+
+        return path
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def start(self, panel_name: str, widgets=None) -> None:
+        """
+        Start editing a panel. The first time, a persisted journal for the
+        panel is replayed onto `widgets`. If the panel was already edited
+        its panel and edits are put back without replaying anything.
+
+        :param str panel_name: The name of the panel being edited.
+        :param widgets: The widgets of the panel as they are on disk, the
+                        default is to use the current panel.
+        :type widgets: tomlkit.items.Table
+        """
+        if self._panel_name and (self._undo or self._redo):
+            self._sessions[self._panel_name] = (
+                self._tcp.current_panel, self._undo, self._redo)
+
+        session = self._sessions.pop(panel_name, None)
+        self._panel_name = panel_name
+
+        if session:
+            self._tcp.current_panel, self._undo, self._redo = session
+        else:
+            self._undo = deque(maxlen=self._undo.maxlen)
+            self._redo = deque(maxlen=self._redo.maxlen)
+
+            if widgets is not None:
+                self._tcp.current_panel = widgets
+
+            self.load()
+
+    def clear(self) -> None:
+        """
+        Forget all the edits, this must be called after the panel has been
+        saved so they are not replayed again.
+        """
+        self._undo.clear()
+        self._redo.clear()
+        self.save()
+
+    #
+    # The edits
+    #
+
+    def add(self, name: str, before: str=None) -> None:
+        self._tcp.add_name(name, before)
+        self._push({'op': self.ADD, 'name': name, 'before': before})
+
+    def remove(self, name: str) -> None:
+        record = self._tcp.remove_name(name)
+        self._push({'op': self.REMOVE, 'name': name, 'record': record})
+
+    def rename(self, old: str, new: str) -> None:
+        self._tcp.rename_name(old, new)
+        self._push({'op': self.RENAME, 'old': old, 'new': new})
+
+    def move(self, name: str, before: str=None) -> None:
+        old_before = self._tcp.panel_index.next_name(name)
+        self._tcp.move_name(name, before)
+        self._push({'op': self.MOVE, 'name': name, 'before': before,
+                    'old_before': old_before})
+
+    def undo(self) -> dict:
+        """
+        Undo the last edit.
+
+        :returns: The operation record that was undone or None.
+        :rtype: dict or None
+        """
+        op = None
+
+        if self._undo:
+            op = self._undo.pop()
+            self._apply_inverse(op)
+            self._redo.append(op)
+            self.save()
+
+        return op
+
+    def redo(self) -> dict:
+        """
+        Redo the last undone edit.
+
+        :returns: The operation record that was redone or None.
+        :rtype: dict or None
+        """
+        op = None
+
+        if self._redo:
+            op = self._redo.pop()
+            self._apply(op)
+            self._undo.append(op)
+            self.save()
+
+        return op
+
+    #
+    # Persistence
+    #
+
+    def save(self) -> None:
+        """
+        Write the journal to the file if persisting.
+        """
+        path = self.path
+
+        if path:
+            data = {'panel': self._panel_name,
+                    'undo': [self._to_json(op) for op in self._undo],
+                    'redo': [self._to_json(op) for op in self._redo]}
+
+            try:
+                with open(path, 'w') as f:
+                    json.dump(data, f)
+            except OSError as e:
+                self._log.error("Could not write the edit journal %s, %s",
+                                path, e)
+
+    def load(self) -> None:
+        """
+        Read the journal of the current panel from its file and replay the
+        edits onto the panel.
+        """
+        path = self.path
+
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                self._log.error("Could not read the edit journal %s, %s",
+                                path, e)
+            else:
+                if data.get('panel') == self._panel_name:
+                    try:
+                        for op in data.get('undo', []):
+                            op = self._from_json(op)
+                            self._apply(op)
+                            self._undo.append(op)
+                    except (KeyError, AssertionError) as e:
+                        self._log.error("The edit journal %s does not match "
+                                        "the panel, %s", path, e)
+                        self._undo.clear()
+                    else:
+                        self._redo.extend(self._from_json(op)
+                                          for op in data.get('redo', []))
+
+    #
+    # Internal methods
+    #
+
+    def _push(self, op: dict) -> None:
+        self._undo.append(op)
+        self._redo.clear()
+        self.save()
+
+    def _apply(self, op: dict) -> None:
+        """
+        Apply an operation going forward.
+        """
+        if op['op'] == self.ADD:
+            self._tcp.add_name(op['name'], op['before'])
+        elif op['op'] == self.REMOVE:
+            op['record'] = self._tcp.remove_name(op['name'])
+        elif op['op'] == self.RENAME:
+            self._tcp.rename_name(op['old'], op['new'])
+        elif op['op'] == self.MOVE:
+            self._tcp.move_name(op['name'], op['before'])
+
+    def _apply_inverse(self, op: dict) -> None:
+        """
+        Apply the inverse of an operation.
+        """
+        if op['op'] == self.ADD:
+            self._tcp.remove_name(op['name'])
+        elif op['op'] == self.REMOVE:
+            self._tcp.restore_name(op['record'])
+        elif op['op'] == self.RENAME:
+            self._tcp.rename_name(op['new'], op['old'])
+        elif op['op'] == self.MOVE:
+            self._tcp.move_name(op['name'], op['old_before'])
+
+    def _to_json(self, op: dict) -> dict:
+        op = dict(op)
+
+        if op['op'] == self.REMOVE:
+            start, group = op['record']
+            op['record'] = [start, [[list(token), key, value.unwrap()]
+                                    for token, key, value in group]]
+
+        return op
+
+    def _from_json(self, op: dict) -> dict:
+        if op['op'] == self.REMOVE:
+            start, group = op['record']
+            op['record'] = (start, [(tuple(token), key, tk.item(value))
+                                    for token, key, value in group])
+
+        return op
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+#
+# src/instrument.py
+#
+__docformat__ = "restructuredtext en"
+
+import re
+import json
+import time
+import datetime
+import inspect
+from io import StringIO
+from functools import wraps
+from contextlib import contextmanager
+
+from .core.utilities import Borg
+
+
+class MethodStats:
+    """
+    Holds the call count, rows and a latency histogram for one name.
+    """
+    # The upper bounds of the histogram buckets in milliseconds.
+    BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, float('inf'))
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.rows = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.histogram = [0] * len(self.BUCKETS)
+
+    def add(self, elapsed: float, rows: int=0) -> None:
+        """
+        Add one call to the statistics.
+
+        :param float elapsed: The time the call took in seconds.
+        :param int rows: The number of rows read or written.
+        """
+        ms = elapsed * 1000
+        self.calls += 1
+        self.rows += rows
+        self.total += ms
+        self.max = max(self.max, ms)
+
+        for idx, bound in enumerate(self.BUCKETS):
+            if ms <= bound:
+                self.histogram[idx] += 1
+                break
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.calls if self.calls else 0.0
+
+    def as_dict(self) -> dict:
+        buckets = [f"<={b}ms" for b in self.BUCKETS[:-1]]
+        buckets.append(f">{self.BUCKETS[-2]}ms")
+        return {'name': self.name, 'calls': self.calls, 'rows': self.rows,
+                'total_ms': round(self.total, 3),
+                'mean_ms': round(self.mean, 3), 'max_ms': round(self.max, 3),
+                'histogram': dict(zip(buckets, self.histogram))}
+
+
+class Instrumentation(Borg):
+    """
+    An opt-in timing layer for the hot database paths. Nothing is recorded
+    until `enable()` is called. This uses the borg pattern so the
+    statistics can be read from any module.
+    """
+    _RE_NUMBERS = re.compile(r"\b\d+\b")
+    _RE_STRINGS = re.compile(r"('[^']*'|\"[^\"]*\")")
+    _RE_SPACES = re.compile(r"\s+")
+    _enabled = False
+    _stats = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+    def enable(self, value: bool=True) -> None:
+        Instrumentation._enabled = value
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def reset(self) -> None:
+        self._stats.clear()
+
+    def record(self, name: str, elapsed: float, rows: int=0) -> None:
+        """
+        Record one call.
+
+        :param str name: The method or query name.
+        :param float elapsed: The time the call took in seconds.
+        :param int rows: The number of rows read or written.
+        """
+        stats = self._stats.get(name)
+
+        if stats is None:
+            stats = self._stats[name] = MethodStats(name)
+
+        stats.add(elapsed, rows)
+
+    @contextmanager
+    def measure(self, name: str, query: str=None):
+        """
+        A context manager that times the code inside it. The yielded dict
+        can have its `rows` key set by the caller.
+
+        :param str name: The method name.
+        :param str query: An optional SQL query, it is normalized so that
+                          queries that only differ in their values are
+                          counted together.
+        """
+        result = {'rows': 0}
+
+        if not self._enabled:
+            yield result
+            return
+
+        start = time.perf_counter()
+
+        try:
+            yield result
+        finally:
+            elapsed = time.perf_counter() - start
+            self.record(name, elapsed, result['rows'])
+
+            if query:
+                self.record(f"{name}: {self.normalize_query(query)}",
+                            elapsed, result['rows'])
+
+    def normalize_query(self, query: str) -> str:
+        """
+        Replace the literal values in a query so that queries with the same
+        shape get the same name.
+
+        :param str query: The SQL query.
+        :returns: The normalized query.
+        :rtype: str
+        """
+        query = self._RE_STRINGS.sub('?', query)
+        query = self._RE_NUMBERS.sub('?', query)
+        return self._RE_SPACES.sub(' ', query).strip()
+
+    @property
+    def stats(self) -> dict:
+        """
+        The collected statistics.
+
+        :returns: A dict of {<name>: <stats dict>, ...}.
+        :rtype: dict
+        """
+        return {name: stats.as_dict() for name, stats in self._stats.items()}
+
+    def report(self) -> str:
+        """
+        A plain text report of the statistics.
+
+        :returns: The report.
+        :rtype: str
+        """
+        buff = StringIO()
+        buff.write(f"{'Name':<40}{'Calls':>7}{'Rows':>8}{'Mean ms':>10}"
+                   f"{'Max ms':>10}\n")
+        buff.write("-" * 75 + "\n")
+
+        for name, stats in sorted(self._stats.items()):
+            name = name if len(name) <= 38 else name[:35] + '...'
+            buff.write(f"{name:<40}{stats.calls:>7}{stats.rows:>8}"
+                       f"{stats.mean:>10.2f}{stats.max:>10.2f}\n")
+
+        text = buff.getvalue()
+        buff.close()
+        return text
+
+    def export(self, path: str) -> None:
+        """
+        Export the statistics as JSON.
+
+        :param str path: The full path of the file to write.
+        """
+        data = {'created': datetime.datetime.now().isoformat(),
+                'stats': self.stats}
+
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+
+def timed(name: str=None):
+    """
+    Decorator that records the call count and latency of a method or
+    function when instrumentation is enabled. Works with both normal and
+    `async` functions. If the result is a list its length is recorded as
+    the number of rows.
+
+    :param str name: The name to record under, the default is the function
+                     name.
+    """
+    def decorator(func):
+        key = name if name else func.__name__
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                with Instrumentation().measure(key) as result:
+                    value = await func(*args, **kwargs)
+                    result['rows'] = (len(value)
+                                      if isinstance(value, list) else 0)
+
+                return value
+        else:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with Instrumentation().measure(key) as result:
+                    value = func(*args, **kwargs)
+                    result['rows'] = (len(value)
+                                      if isinstance(value, list) else 0)
+
+                return value
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+#
+# src/lazy_import.py
+#
+__docformat__ = "restructuredtext en"
+
+import importlib
+import threading
+from functools import wraps
+
+
+class LazyModule:
+    """
+    A stand in for a module that is not imported until one of its
+    attributes is used.
+
+    .. note::
+
+       Use this for large packages that are only needed in a few code
+       paths, for example geopy and timezonefinder are only needed when
+       the organization's location changes.
+    """
+
+    def __init__(self, name: str):
+        """
+        :param str name: The full dotted name of the module to import.
+        """
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+        self.__dict__['_lock'] = threading.Lock()
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __repr__(self):
+        state = 'loaded' if self.is_loaded else 'not loaded'
+        return f"<LazyModule '{self._name}' ({state})>"
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._module is not None
+
+    def _load(self):
+        """
+        Import the real module if it has not been imported yet.
+
+        :returns: The real module.
+        :rtype: module
+        """
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self.__dict__['_module'] = importlib.import_module(
+                        self._name)
+
+        return self._module
+
+
+def lazy_import(name: str) -> LazyModule:
+    """
+    Create a module that will be imported on first use.
+
+    :param str name: The full dotted name of the module to import.
+    :returns: The lazy module.
+    :rtype: LazyModule
+    """
+    return LazyModule(name)
+
+
+def call_once(func):
+    """
+    Decorator that runs the wrapped function only the first time it is
+    called, all later calls return the first result. This is used to defer
+    setup code that used to run at import time.
+
+    :param callable func: The function to wrap.
+    :returns: The wrapped function.
+    :rtype: callable
+    """
+    lock = threading.Lock()
+    result = []
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not result:
+            with lock:
+                if not result:
+                    result.append(func(*args, **kwargs))
+
+        return result[0]
+
+    wrapper.has_run = lambda: bool(result)
+    return wrapper
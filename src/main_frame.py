@@ -4,12 +4,17 @@
 #
 __docformat__ = "restructuredtext en"
 
+import copy
 import os
+import time
 import asyncio
 import logging
 
 from .config import TomlAppConfig
-from .utilities import StoreObjects
+from .config_watcher import ConfigWatcher
+from .core.backup import BackupManager
+from .profiler import StartupProfiler
+from .utilities import StoreObjects, make_name
 from .custom_widgits import (BadiDatePickerCtrl, EVT_BADI_DATE_CHANGED,
                              ColorCheckBox, EVT_COLOR_CHECKBOX)
 
@@ -20,6 +25,9 @@ from .menu import MenuBar
 # BaseGenerated is used by the factory created classes.
 from .bases import BaseGenerated, version
 from .panel_factory import PanelFactory
+from .panel_builder import PanelBuilder
+from .panel_layout import PanelLayout
+from .status_channel import StatusChannel
 
 
 try:  # pragma: no cover
@@ -36,6 +44,12 @@ class MainFrame(wx.Frame, MenuBar):
     The main frame of the application.
     """
     __panel_classes = {}
+    __config_changes = []
+    __reset_cl = None
+    _STATUS_RESET = 15000  # Milliseconds
+    _STATUS_COLORS = {StatusChannel.MESSAGE: 'lightgreen',
+                      StatusChannel.WARNING: 'yellow',
+                      StatusChannel.ERROR: 'pink'}
     #title = 'Main Screen'
 
     def __init__(self, parent=None, id=wx.ID_ANY,
@@ -59,6 +73,8 @@ class MainFrame(wx.Frame, MenuBar):
         sizer.Add(self.container, 1, wx.EXPAND)
 
         # Status Bar
+        self._status = StatusChannel(self.__set_status,
+                                     self.__schedule_status)
         status_widths = (-1,)
         self._statusbar = self.CreateStatusBar(len(status_widths),
                                                wx.STB_DEFAULT_STYLE)
@@ -66,35 +82,186 @@ class MainFrame(wx.Frame, MenuBar):
         self.Layout()
 
         # Setup resizer
+        self._panel_layout = PanelLayout(self._tac.logger_name)
         self.set_size(size)
         self.setup_resize_event()
 
         StoreObjects().set_object(self.__class__.__name__, self)
-        sf = PanelFactory()
-        sf.parse()
+        profiler = StartupProfiler()
+        sf = self._panel_factory()
 
-        for panel in sf.class_name_keys:
-            code = sf.get_panel_code(panel)
-
-            if code:
-                # Only used for debugging.
-                if options.file_dump:  # Write the code files to the cache.
-                    filename = f"{panel}.py"
-                    pathname = os.path.join(self._tac.cached_factory_dir,
-                                            filename)
+        with profiler.span('panel_factory_parse'):
+            sf.parse()
 
-                    with open(pathname, 'w') as f:
-                        f.write(code)
+        for panel in sf.class_name_keys:
+            # Create the panels.
+            with profiler.span(f'panel_exec:{panel}'):
+                obj = self._create_panel(sf, panel, options.file_dump,
+                                         *args, **kwargs)
 
-                # Create the panels.
-                exec(code, globals())
-                class_name = sf.get_class_name(panel)
-                self.__panel_classes[panel] = globals(
-                    )[class_name](self.parent, *args, **kwargs)
+            if obj:
+                self.__panel_classes[panel] = obj
 
         self.create_menu()
         self.options = options
         asyncio.run(self.start(), debug=options.debug)
+        self._watcher = ConfigWatcher()
+        self._watcher.subscribe(self.on_config_change)
+        self._watcher.start()
+        backup = self._tac.backup
+        self._backups = BackupManager(backup['interval'] * 60 * 60,
+                                      backup['keep'], backup['pages'])
+
+        if backup['enabled']:
+            self._backups.start()
+
+    def _panel_factory(self):
+        """
+        Get the panel backend set in the app config.
+
+        :returns: The factory that creates the panels.
+        :rtype: PanelFactory or PanelBuilder
+        """
+        if self._tac.panel_builder == self._tac.PANEL_DIRECT:
+            sf = PanelBuilder()
+        else:
+            sf = PanelFactory()
+
+        return sf
+
+    def _create_panel(self, sf, panel, file_dump=False, *args, **kwargs):
+        """
+        Create one panel, either by compiling its generated code or by
+        building its widgets directly.
+
+        :param sf: The factory that was setup for the panel.
+        :type sf: PanelFactory or PanelBuilder
+        :param str panel: The internal name of the panel.
+        :param bool file_dump: If `True` write the code to the cache
+                               directory, only used for debugging.
+        :returns: The new panel or None if there was no code.
+        :rtype: wx.Panel or None
+        """
+        if isinstance(sf, PanelBuilder):
+            return sf.create_panel(panel, self.parent, *args, **kwargs)
+
+        code = sf.get_panel_code(panel)
+        obj = None
+
+        if code:
+            # Only used for debugging.
+            if file_dump:  # Write the code files to the cache.
+                filename = f"{panel}.py"
+                pathname = os.path.join(self._tac.cached_factory_dir,
+                                        filename)
+
+                with open(pathname, 'w') as f:
+                    f.write(code)
+
+            exec(compile(code, f"<{panel}>", 'exec'), globals())
+            class_name = sf.get_class_name(panel)
+            obj = globals()[class_name](self.parent, *args, **kwargs)
+
+        return obj
+
+    def rebuild_panel(self, name: str, widgets=None) -> None:
+        """
+        Regenerate, compile and swap only the named panel, for example after
+        its fields were edited. The unsaved values in the live panel are
+        kept. The panel is built from a copy of its config, so the panel
+        config and the database only change when the edits are saved.
+
+        :param str name: The internal name of the panel.
+        :param widgets: The new widgets for the panel, the default is to use
+                        the current panel config.
+        :type widgets: tomlkit.items.Table
+        """
+        assert name in self.panels, f"There is no panel named '{name}'."
+        start = time.perf_counter()
+        config = copy.deepcopy(self._tmd.panel_config.get(name, {}))
+
+        if widgets is not None:
+            config['widgets'] = copy.deepcopy(widgets)
+
+        sf = self._panel_factory()
+        sf.setup_panel(name, config)
+        old = self.panels[name]
+        new = self._create_panel(sf, name, self.options.file_dump)
+        db = StoreObjects().get_object('Database')
+
+        if db:
+            values = self._panel_snapshot(db, old)
+            new.initializing = True
+            self._panel_restore(db, new, values)
+            new.initializing = False
+
+        new.dirty = old.dirty
+        shown = old.IsShown()
+        new.Hide()
+
+        if old in [c.GetWindow() for c in self.sizer.GetChildren()]:
+            self.sizer.Replace(old, new)
+
+        self.panels = (name, new)
+
+        if getattr(self, 'panel', None) is old:
+            self.panel = new
+
+        old.Destroy()
+
+        if shown:
+            new.Show()
+
+        self._panel_layout.replace(name, new)
+
+        self.sizer.Layout()
+        self._log.info("Rebuilt the '%s' panel in %0.3f seconds.", name,
+                       time.perf_counter() - start)
+
+    def register_panel_fields(self, name: str) -> None:
+        """
+        Add any new fields in the named panel to the database, only call
+        this after the edits to the panel were saved.
+
+        :param str name: The internal name of the panel.
+        """
+        db = StoreObjects().get_object('Database')
+
+        if db:
+            asyncio.run(db.register_panel_fields(name, self.panels[name]),
+                        debug=self.options.debug)
+
+    def _panel_snapshot(self, db, panel) -> dict:
+        """
+        Get the raw widget values from a panel by field name.
+        """
+        values = {}
+
+        for c_set in db._find_child_sets(panel):
+            name0 = c_set[0].__class__.__name__
+            field_name = make_name(c_set[0].GetLabelText())
+
+            if name0 in ('RadioBox', 'ComboBox'):
+                values[field_name] = c_set[0].GetSelection()
+            elif c_set[1]:
+                values[field_name] = c_set[1].GetValue()
+
+        return values
+
+    def _panel_restore(self, db, panel, values: dict) -> None:
+        """
+        Put the raw widget values from `_panel_snapshot` back into a panel,
+        fields that are new keep their default values.
+        """
+        for c_set in db._find_child_sets(panel):
+            name0 = c_set[0].__class__.__name__
+            field_name = make_name(c_set[0].GetLabelText())
+
+            if field_name in values:
+                if name0 in ('RadioBox', 'ComboBox'):
+                    c_set[0].SetSelection(values[field_name])
+                elif c_set[1]:
+                    c_set[1].SetValue(values[field_name])
 
     async def start(self):
         """
@@ -106,11 +273,16 @@ class MainFrame(wx.Frame, MenuBar):
         else:  # generic
             pass
 
+        profiler = StartupProfiler()
         db = Database()
         StoreObjects().set_object(db.__class__.__name__, db)
         self._log.info("Create the database if it does not exist.")
-        await db.create_db()
-        await db.populate_panels()
+
+        with profiler.span('create_db'):
+            await db.create_db()
+
+        with profiler.span('populate_panels'):
+            await db.populate_panels()
 
         if not db.has_org_info_data:
             self._log.info("The Organization Information has not been "
@@ -170,6 +342,67 @@ class MainFrame(wx.Frame, MenuBar):
 
         return on_timer
 
+    def on_config_change(self, change):
+        """
+        Collect an external edit to a config file, called on the watcher
+        thread. All the changes found in one poll are applied together.
+
+        :param ConfigChange change: The file, section and key that changed.
+        """
+        self.__config_changes.append(change)
+
+        if len(self.__config_changes) == 1:
+            wx.CallAfter(self._apply_config_changes)
+
+    def _apply_config_changes(self):
+        """
+        Swap in the new docs and rebuild the changed panels on the main
+        thread. A panel with unsaved field edits keeps its config.
+        """
+        changes = self.__config_changes[:]
+        del self.__config_changes[:len(changes)]
+        docs = {}
+        rebuild = set()
+
+        if self.__config_changes:  # Arrived while copying.
+            wx.CallAfter(self._apply_config_changes)
+
+        field_edit = self.panels.get('fields')
+        unsaved = field_edit.unsaved_panel if field_edit else None
+        keep = {'panel_config': (unsaved,) if unsaved else ()}
+
+        # The last doc of each file has all the edits.
+        for change in changes:
+            docs[change.file] = change.doc
+
+        for file, doc in docs.items():
+            self._watcher.apply(file, doc, keep.get(file, ()))
+
+        panel_names = [name for m_name, name in self._tmd.panels]
+
+        for change in changes:
+            if change.file == 'app_config':
+                if change.section == 'app_size' and change.key == 'size':
+                    self.set_size(self.GetSize())
+            elif change.section == unsaved:
+                self.statusbar_warning = (
+                    f"Skipped the edit to the {unsaved.capitalize()} panel "
+                    "config, it has unsaved field edits.")
+                continue
+            elif change.section == 'meta':
+                self.SetTitle(self._tmd.title)
+                rebuild.update(panel_names)
+            elif change.section in panel_names:
+                rebuild.add(change.section)
+
+            self._log.info("Applying config change %s.", change[:3])
+
+        for name in panel_names:
+            if name in rebuild and name in self.panels:
+                # The change is already on disk, so it counts as saved.
+                self.rebuild_panel(name)
+                self.register_panel_fields(name)
+
     def set_size(self, size, key='size'):
         """
         Sets the size of the Frame.
@@ -196,10 +429,9 @@ class MainFrame(wx.Frame, MenuBar):
             self._tac.update_app_config('app_size', 'size', (width, height))
             self.__resized = False
 
-            for panel in self.panels.values():
-                panel.SetSize((width, height))
-                height = height - self.frame.statusbar_size[1]
-                panel.SetSizeHints(width, height)
+            # Only the shown panel is laid out, the others when next shown.
+            self._panel_layout.resize(
+                self.panels, width, height - self.statusbar_size[1])
 
     @property
     def panels(self):
@@ -225,27 +457,37 @@ class MainFrame(wx.Frame, MenuBar):
         return self.container_sizer
 
     def statusbar_warning(self, value):
-        self.__set_status(value, 'yellow')
+        self._status.post(StatusChannel.WARNING, value)
     statusbar_warning = property(None, statusbar_warning)
 
     def statusbar_error(self, value):
-        self.__set_status(value, 'pink')
+        self._status.post(StatusChannel.ERROR, value)
     statusbar_error = property(None, statusbar_error)
 
     def statusbar_message(self, value):
-        self.__set_status(value, 'lightgreen')
+        self._status.post(StatusChannel.MESSAGE, value)
     statusbar_message = property(None, statusbar_message)
 
-    def __set_status(self, value, color):
-        self._statusbar.SetStatusText(value, 0)
+    def __schedule_status(self, ms, func):
+        # Status messages can be posted from any thread.
+        wx.CallAfter(wx.CallLater, max(ms, 1), func)
+
+    def __set_status(self, value, severity):
         default_color = wx.Colour('black')
-        self._statusbar.SetBackgroundColour(color)
+        self._statusbar.SetStatusText(value, 0)
+        self._statusbar.SetBackgroundColour(self._STATUS_COLORS[severity])
         self._statusbar.SetForegroundColour(default_color)
-        # Wait for 10 seconds before resetting the message.
-        wx.CallLater(15000, self.__reset_status, default_color)
+
+        # Wait for 15 seconds after the last message before resetting.
+        if self.__reset_cl and self.__reset_cl.IsRunning():
+            self.__reset_cl.Restart(self._STATUS_RESET)
+        else:
+            self.__reset_cl = wx.CallLater(self._STATUS_RESET,
+                                           self.__reset_status, default_color)
 
     def __reset_status(self, default_color):
-        self._statusbar.SetStatusText("", 0)
+        self.__reset_cl = None
+        self._statusbar.SetStatusText(self._status.idle_text, 0)
         self._statusbar.SetBackgroundColour(default_color)
         self._statusbar.SetForegroundColour(default_color)
 
@@ -253,8 +495,18 @@ class MainFrame(wx.Frame, MenuBar):
     def statusbar_size(self):
         return self._statusbar.GetSize()
 
+    @property
+    def statusbar_fields(self):
+        return self._status.fields
+
     def add_status(self, key, status):
-        self.statusbar_fields[key] = status
+        self._status.add_field(key, status)
+
+        if not self.__reset_cl:
+            self._statusbar.SetStatusText(self._status.idle_text, 0)
 
     def remove_status(self, key):
-        self.statusbar_fields.pop(key, None)
+        self._status.remove_field(key)
+
+        if not self.__reset_cl:
+            self._statusbar.SetStatusText(self._status.idle_text, 0)
@@ -4,6 +4,7 @@
 #
 __docformat__ = "restructuredtext en"
 
+import asyncio
 from collections import OrderedDict
 
 import wx
@@ -11,8 +12,11 @@ from wx.lib.inspection import InspectionTool
 
 from .config import TomlAppConfig, TomlMetaData
 from .data_entry import LedgerDataEntry
-from .tools import ShortCuts, FieldEdit
+from .tools import ShortCuts, Statistics, FieldEdit
 from .settings import FiscalSettings, Paths
+from .utilities import StoreObjects
+from .core.export import DataExporter
+from .core.backup import BackupManager
 
 
 class MenuBar:
@@ -21,6 +25,7 @@ class MenuBar:
     """
     _tmd = TomlMetaData()
     __short_cut = None
+    __statistics = None
     __inspection = None
     __active_panel = None
     _current_menus = ()
@@ -44,6 +49,10 @@ class MenuBar:
                                        "Save a TOML configuration file with "
                                        "a different name.", 'file_save_as',
                                        None, False, None]),
+                          ('export', [100, "&Export Data\tCTRL+E",
+                                      "Export the data of all fiscal years "
+                                      "as CSV or JSON Lines.", 'file_export',
+                                      None, True, None]),
                           ('separator_0', []),
                           ('close', [wx.ID_CLOSE, "&Close\tCTRL+C",
                                      "Close the current frame.",
@@ -85,6 +94,10 @@ class MenuBar:
                            ('short', [400, "&Short Cuts\tCTRL+H",
                                       "Show the short cut screen.",
                                       'tool_short_cuts', None, True, None]),
+                           ('statistics', [404, "S&tatistics\tCTRL+U",
+                                           "Show the database statistics.",
+                                           'tool_statistics', None,
+                                           True, None]),
                            ('inspection', [401, "&Inspection\tCTRL+I",
                                            "Show the WX inspection tool.",
                                            'tool_inspection', None,
@@ -234,11 +247,35 @@ class MenuBar:
     def file_save_as(self, event):
         pass
 
+    def file_export(self, event):
+        title = "Export the data to a file."
+        wildcard = ("CSV File (*.csv)|*.csv|"
+                    "JSON Lines File (*.jsonl)|*.jsonl")
+
+        with wx.FileDialog(self, title, wildcard=wildcard,
+                           style=wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT) as dlg:
+            if dlg.ShowModal() != wx.ID_CANCEL:
+                fullpath = dlg.GetPath()
+                fmt = DataExporter.FORMATS[dlg.GetFilterIndex()]
+                db = StoreObjects().get_object('Database')
+
+                try:
+                    with open(fullpath, 'w', newline='') as file:
+                        count = asyncio.run(
+                            DataExporter(db, fmt).export(file),
+                            debug=self.options.debug)
+                except IOError:
+                    wx.LogError("Cannot write file '%s'." % fullpath)
+                else:
+                    self.statusbar_message = (
+                        f"Exported {count} values to {fullpath}.")
+
     def file_close(self, event):
         pass
 
     def app_quit(self, event):
         # *** TODO *** We need to check for unsaved panels.
+        BackupManager().stop()
         self.frame.Destroy()
 
     def edit_config(self, event) -> None:  # No fill screen issues
@@ -263,6 +300,7 @@ class MenuBar:
         self.change_menu_items()
         self._hide_all_panels()
         self.panel = None
+        self._panel_layout.deactivate()
 
         if self.__short_cut:
             self._update_short_cuts(self.frame_bg_color)
@@ -288,6 +326,12 @@ class MenuBar:
         self.__short_cut.set_text(self.frame)
         self.__short_cut.SetBackgroundColour(color)
 
+    def tool_statistics(self, event):
+        if not self.__statistics:
+            self.__statistics = Statistics(self.frame)
+
+        self.__statistics.set_text()
+
     def tool_inspection(self, event):
         if not self.__inspection:
             self.__inspection = InspectionTool()
@@ -338,6 +382,7 @@ class MenuBar:
 
         #self._setup_sizer_height_correctly(self.sizer)
         self.panel.Show()
+        self._panel_layout.activate(panel_name, self.panel)
         self.parent.Layout()
         self.sizer.Layout()
         self.panel.Layout()
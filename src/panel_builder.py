@@ -0,0 +1,535 @@
+# -*- coding: utf-8 -*-
+#
+# src/panel_builder.py
+#
+__docformat__ = "restructuredtext en"
+
+from functools import reduce
+
+import wx
+import wx.adv
+
+from .config import TomlMetaData
+from .bases import BaseGenerated, find_dict
+from .utilities import StoreObjects
+from .custom_widgits import (BadiDatePickerCtrl, EVT_BADI_DATE_CHANGED,
+                             ColorCheckBox, EVT_COLOR_CHECKBOX)
+
+
+class SaveCancelMixin:
+    """
+    The save and cancel events used by the organization panel. These are
+    the same methods the PanelFactory writes into the generated code.
+    """
+
+    def button_save(self, event):
+        self.save = True
+        event.Skip()
+
+    @property
+    def save(self):
+        return self._save
+
+    @save.setter
+    def save(self, value):
+        if self.dirty:
+            self._so.get_object('MainFrame').statusbar_message = (
+                'Saving data.')
+
+        self._save = value
+
+    def button_cancel(self, event):
+        self.cancel = True
+        event.Skip()
+
+    @property
+    def cancel(self):
+        return self._cancel
+
+    @cancel.setter
+    def cancel(self, value):
+        if self.dirty:
+            self._so.get_object('MainFrame').statusbar_message = (
+                'Restoring data.')
+
+        self._cancel = value
+
+
+class FiscalSelectMixin:
+    """
+    The ComboBox selection event used by the fiscal panel.
+    """
+
+    def get_selection(self, event):
+        value = event.GetString()
+        year, _, nyear = value.partition('-')
+        db = self._so.get_object('Database')
+
+        if year.isdecimal():
+            db.populate_fiscal_panel(int(year))
+            self.selected = True
+        else:
+            db.set_fiscal_panel(False, False, False)
+            self.selected = False
+
+
+class PanelBuilder(TomlMetaData):
+    """
+    Build the panels directly from the config data without generating or
+    compiling any code. It has the same interface as the PanelFactory so
+    the two can be switched in the app config.
+
+    The TOML for a panel is walked once and each widget type is looked up
+    in a dispatch table that gives the method that constructs it. The
+    local names used in the TOML, for example `widget_00` or `box_sizer`,
+    are kept in a namespace dict while the panel is being built.
+    """
+    _WIDGETS = {
+        'RadioBox': 'radio_box',
+        'StaticText': 'static_text',
+        'TextCtrl': 'text_ctrl',
+        'DatePickerCtrl': 'date_picker_ctrl',
+        'BadiDatePickerCtrl': 'badi_date_picker_ctrl',
+        'Choice': 'choice_combo_box',
+        'ComboBox': 'choice_combo_box',
+        'CheckBox': 'check_box',
+        'ColorCheckBox': 'color_check_box',
+        'StaticLine': 'static_line',
+        'invisable_spacer': 'invisable_spacer',
+        }
+    _SIZERS = {
+        'BoxSizer': 'box_sizer',
+        'FlexGridSizer': 'flex_grid_sizer',
+        'GridBagSizer': 'grid_bag_sizer',
+        }
+    _MIXINS = {'organization': (SaveCancelMixin,),
+               'fiscal': (FiscalSelectMixin,)}
+    __classes = {}
+    __configs = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+    @property
+    def class_name_keys(self):
+        return self.__classes.keys()
+
+    def get_class_name(self, panel):
+        klass = self.__classes.get(panel)
+        return klass.__name__ if klass else None
+
+    def get_panel_class(self, panel):
+        return self.__classes.get(panel)
+
+    def parse(self):
+        for m_name, panel in self.panels:
+            try:
+                self.setup_panel(panel)
+            except Exception as e:
+                self._log.critical("Critical error, cannot start application "
+                                   "please contact the developer for help, %s",
+                                   str(e), exc_info=True)
+
+    def setup_panel(self, panel, config=None):
+        """
+        Create the class for a panel, the widgets are not created until
+        `create_panel` is called.
+
+        :param str panel: The internal name of the panel.
+        :param config: A panel config to use instead of the one in the
+                       panel config file, it is only read.
+        :type config: dict or tomlkit.items.Table
+        """
+        class_name = f"{panel.capitalize()}Panel"
+        bases = self._MIXINS.get(panel, ()) + (BaseGenerated,)
+        self.__classes[panel] = type(class_name, bases, {})
+        self.__configs[panel] = config
+
+    def create_panel(self, panel, parent, *args, **kwargs):
+        """
+        Create a panel and all its widgets.
+
+        :param str panel: The internal name of the panel.
+        :param wx.Window parent: The parent of the new panel.
+        :returns: The new panel or None if the panel was not setup.
+        :rtype: BaseGenerated or None
+        """
+        klass = self.__classes.get(panel)
+
+        if klass is None:
+            return None
+
+        obj = klass(parent, *args, **kwargs)
+        config = self.__configs.get(panel)
+
+        if config is None:
+            config = self.panel_config.get(panel, {})
+
+        meta = config.get('meta')
+
+        if panel in self._MIXINS:
+            obj._so = StoreObjects()
+
+        self._bg_color = meta.get('bg_color')
+        self._w_bg_color_1 = meta.get('w_bg_color_1')
+        self._w_bg_color_2 = meta.get('w_bg_color_2')
+        self._w_bg_color_3 = meta.get('w_bg_color_3')
+        self._w_fg_color_1 = meta.get('w_fg_color_1')
+        self.span = meta.get('sizer_span')
+        self.main_sizer = None
+        self.second_sizer = None
+        obj._bg_color = self._bg_color
+        obj.SetBackgroundColour(wx.Colour(*self._bg_color))
+        obj.SetFont(self._make_font('font_12_normal'))
+        obj.locale_prefix = self.locale_prefix
+        ns = {'self': obj}
+
+        for name, value in config.get('sizers', {}).items():
+            method = self._SIZERS.get(value[0])
+
+            if method:
+                getattr(self, method)(ns, name, value)
+
+        for name, value in config.get('widgets', {}).items():
+            if value == 'sizer_span':
+                self.sizer_span(ns)
+            else:
+                method = self._WIDGETS.get(value[0])
+
+                if method:
+                    getattr(self, method)(ns, panel, name, value)
+
+        values = list(config.get('buttons', {}).items())
+
+        if values:
+            self.assemble_buttons(ns, values)
+
+        if self.main_sizer:
+            obj.SetSizer(ns[self.main_sizer])
+
+        obj.SetupScrolling(rate_x=20, rate_y=40)
+        obj.Hide()
+        return obj
+
+    #
+    # Sizers
+    #
+
+    def box_sizer(self, ns, sizer, value):
+        self.main_sizer = sizer
+        ns[sizer] = wx.BoxSizer(self._flags(value[1]))
+
+    def flex_grid_sizer(self, ns, sizer, value):
+        self.second_sizer = sizer
+        ns[sizer] = wx.FlexGridSizer(*find_dict(value).get('grid'))
+        self._add_to_sizer(ns, sizer, value)
+
+    def grid_bag_sizer(self, ns, sizer, value):
+        self.second_sizer = sizer
+        ns[sizer] = wx.GridBagSizer(*find_dict(value).get('gap'))
+        self._add_to_sizer(ns, sizer, value)
+
+    #
+    # Widgets
+    #
+
+    def radio_box(self, ns, panel, widget, value):
+        dict_ = find_dict(value)
+        parent, id, label = dict_.get('args')
+        obj = ns['self']
+        callback = dict_.get('callback')
+        update = dict_.get('update')
+        item = ns[widget] = wx.RadioBox(
+            ns[parent], self._flags(id), label,
+            style=self._flags(dict_.get('style', 0)),
+            choices=dict_.get('choices', []),
+            majorDimension=dict_.get('dim', 0))
+        self._set_colors(item, widget, value)
+        self._set_font(item, dict_)
+        tip = dict_.get('tip', "")
+
+        if tip:
+            item.SetToolTip(tip)
+
+        if dict_.get('focus', False):
+            item.SetFocus()
+
+        item.SetSelection(dict_.get('select', 0))
+        self._add_to_sizer(ns, widget, value)
+        dirty_flag = dict_.get('dirty_event', True)
+
+        if callback:
+            item.Bind(wx.EVT_RADIOBOX,
+                      getattr(obj, callback)(update, dirty_flag))
+            wx.CallLater(1000, obj._locality_prefix, item, update)
+        elif dirty_flag:
+            item.Bind(wx.EVT_RADIOBOX, obj.set_dirty_flag)
+
+    def static_text(self, ns, panel, widget, value):
+        dict_ = find_dict(value)
+        parent, id, label = dict_.get('args')
+        item = ns[widget] = wx.StaticText(
+            ns[parent], self._flags(id), label,
+            style=self._flags(dict_.get('style', 0)))
+        wrap = dict_.get('wrap')
+        self._set_colors(item, widget, value)
+        self._set_font(item, dict_)
+        self._set_min_size(item, dict_)
+
+        if dict_.get('focus', False):
+            item.SetFocus()
+
+        if wrap:
+            item.Wrap(wrap)
+
+        self._add_to_sizer(ns, widget, value)
+
+        if dict_.get('instance'):
+            setattr(ns['self'], widget, item)
+
+    def text_ctrl(self, ns, panel, widget, value):
+        dict_ = find_dict(value)
+        parent, id, label = dict_.get('args')
+        item = ns[widget] = wx.TextCtrl(
+            ns[parent], self._flags(id), label,
+            style=self._flags(dict_.get('style', 0)))
+        self._set_colors(item, widget, value)
+        self._set_font(item, dict_)
+        self._set_min_size(item, dict_)
+
+        if dict_.get('focus', False):
+            item.SetFocus()
+
+        if dict_.get('dirty_event', True):
+            item.Bind(wx.EVT_TEXT, ns['self'].set_dirty_flag)
+
+        self._add_to_sizer(ns, widget, value)
+
+        if dict_.get('instance'):
+            setattr(ns['self'], widget, item)
+
+        item.financial = dict_.get('financial', False)
+
+    def date_picker_ctrl(self, ns, panel, widget, value):
+        dict_ = find_dict(value)
+        parent, id, _ = dict_.get('args')
+        item = ns[widget] = wx.adv.DatePickerCtrl(ns[parent],
+                                                  self._flags(id))
+        self._set_colors(item, widget, value)
+        self._set_min_size(item, dict_)
+        item.Bind(wx.adv.EVT_DATE_CHANGED, ns['self'].set_dirty_flag)
+        self._add_to_sizer(ns, widget, value)
+
+    def badi_date_picker_ctrl(self, ns, panel, widget, value):
+        dict_ = find_dict(value)
+        parent, id, _ = dict_.get('args')
+        item = ns[widget] = BadiDatePickerCtrl(ns[parent], self._flags(id))
+        self._set_colors(item, widget, value)
+        self._set_min_size(item, dict_)
+        item.Bind(EVT_BADI_DATE_CHANGED, ns['self'].set_dirty_flag)
+        self._add_to_sizer(ns, widget, value)
+
+    def choice_combo_box(self, ns, panel, widget, value):
+        dict_ = find_dict(value)
+        parent, id, name = dict_.get('args')
+        obj = ns['self']
+        style = self._flags(dict_.get('style', 0))
+        choices = list(dict_.get('choices', []))
+
+        if value[0] == 'ComboBox':
+            first = ''
+
+            if panel == 'monthly':
+                choices = [f"{idx:>2} {month}"
+                           for idx, month in enumerate(self.months, start=1)]
+                first = 'Choose Current Month'
+            elif panel == 'fiscal':
+                choices = []
+                first = 'Choose Fiscal Year'
+
+            if first:
+                choices.insert(0, first)
+
+            item = wx.ComboBox(ns[parent], self._flags(id), value=first,
+                               choices=choices, style=style)
+        else:
+            item = wx.Choice(ns[parent], self._flags(id), choices=choices,
+                             style=style)
+
+        ns[widget] = item
+        item.SetLabel(name)
+        self._set_colors(item, widget, value)
+        self._set_min_size(item, dict_)
+
+        if dict_.get('dirty_event', True):
+            item.Bind(wx.EVT_COMBOBOX, obj.set_dirty_flag)
+        else:
+            item.Bind(wx.EVT_COMBOBOX, obj.get_selection)
+
+        self._add_to_sizer(ns, widget, value)
+
+    def check_box(self, ns, panel, widget, value):
+        dict_ = find_dict(value)
+        parent, id, name = dict_.get('args')
+        item = ns[widget] = wx.CheckBox(ns[parent], self._flags(id))
+        self._set_colors(item, widget, value)
+        self._set_min_size(item, dict_)
+        item.Bind(wx.EVT_CHECKBOX, ns['self'].set_dirty_flag)
+        self._add_to_sizer(ns, widget, value)
+
+    def color_check_box(self, ns, panel, widget, value):
+        dict_ = find_dict(value)
+        parent, id, label, name = dict_.get('args')
+        item = ns[widget] = ColorCheckBox(ns[parent], self._flags(id),
+                                          label=label, name=name)
+        self._set_colors(item, widget, value)
+        self._set_min_size(item, dict_)
+
+        if dict_.get('dirty_event', True):
+            item.Bind(EVT_COLOR_CHECKBOX, ns['self'].set_dirty_flag)
+
+        item.Enable(dict_.get('enabled', True))
+        self._add_to_sizer(ns, widget, value)
+
+    def static_line(self, ns, panel, widget, value):
+        parent, flags = find_dict(value).get('args')
+        item = ns[widget] = wx.StaticLine(ns[parent], self._flags(flags))
+        self._set_colors(item, widget, value)
+        self._add_to_sizer(ns, widget, value)
+
+    def invisable_spacer(self, ns, panel, widget, value):
+        size = find_dict(value).get('size')
+
+        if size:
+            self._add_to_sizer(ns, tuple(size), value)
+        else:
+            self._log.critical("Invalid size in 'invisable_spacer', check "
+                               "toml config file.")
+
+    def sizer_span(self, ns):
+        if self.span:
+            ns[self.second_sizer].Add(*self.span)
+
+    def assemble_buttons(self, ns, values):
+        """
+        Assemble the buttons for this panel.
+
+        :param dict ns: The namespace of the panel being built.
+        :param list values: This is a list of tuples as in [(<item>, value),
+                            ...]. Where `<item>` is the variable name for a
+                            panel, sizer, or widget and `value` is the list
+                            of values from the toml config file.
+        """
+        obj = ns['self']
+        items = {}
+        buttons = []
+
+        for name, value in values:
+            if value[0] == 'Button':
+                buttons.append((name, value))
+            else:
+                items[value[0]] = (name, value)
+
+        # The line is added to the sizer before the button panel and the
+        # cancel button is always added last.
+        self.static_line(ns, None, *items['StaticLine'])
+        name, value = items['Panel']
+        dict_ = find_dict(value)
+        btn_panel = ns[name] = wx.Panel(ns[dict_.get('args')])
+        prop, flags, panel_border = dict_.get('add', ())
+        panel_flags = self._flags(flags)
+        panel_pos = dict_.get('pos')
+        panel_span = dict_.get('span')
+        btn_sizer = wx.StdDialogButtonSizer()
+        buttons.sort(key=lambda b: find_dict(b[1]).get('args')[1]
+                     == 'ID_CANCEL')
+
+        for name, value in buttons:
+            dict_ = find_dict(value)
+            parent, flags, label = dict_.get('args')
+            item = ns[name] = wx.Button(ns[parent], self._flags(flags),
+                                        label=label)
+            item.SetMinSize(dict_.get('min'))
+            self._set_colors(item, name, value)
+            item.Bind(wx.EVT_BUTTON, getattr(obj, dict_.get('callback')))
+            btn_sizer.AddButton(item)
+
+        btn_sizer.Realize()
+        btn_panel.SetSizer(btn_sizer)
+        ns[self.second_sizer].Add(btn_panel, panel_pos, panel_span,
+                                  panel_flags, panel_border)
+
+    #
+    # Internal methods
+    #
+
+    def _set_colors(self, item, widget, value):
+        """
+        Sets the background and/or foreground color. Also raise an
+        assertion error if more than one of either has been specified.
+        """
+        bg = [key for key in ('bg_color', 'w_bg_color_1', 'w_bg_color_2',
+                              'w_bg_color_3') if key in value]
+        assert len(bg) < 2, ("Error: Cannot set more than one "
+                             f"background color in '{widget}'")
+        color = getattr(self, f"_{bg[0]}") if bg else None
+
+        if color:
+            item.SetBackgroundColour(wx.Colour(*color))
+
+        if 'w_fg_color_1' in value and self._w_fg_color_1:
+            item.SetForegroundColour(wx.Colour(*self._w_fg_color_1))
+
+    def _set_font(self, item, dict_):
+        font_type = dict_.get('font')
+
+        if font_type:
+            item.SetFont(self._make_font(font_type))
+
+    def _set_min_size(self, item, dict_):
+        min_size = dict_.get('min')
+
+        if min_size:
+            item.SetMinSize(min_size)
+
+    def _make_font(self, font_type):
+        ps, fam, style, weight, ul, fn = self.get_font(font_type)
+        return wx.Font(ps, self._flags(fam), self._flags(style),
+                       self._flags(weight), ul, fn)
+
+    def _flags(self, flags):
+        """
+        Convert a flag string, for example 'ALIGN_RIGHT | ALL', to the
+        wx value.
+        """
+        if isinstance(flags, int):
+            item = flags
+        else:
+            flag_list = flags.replace(' ', '').split('|')
+            item = reduce(lambda a, b: a | b, [
+                getattr(wx, flag.upper()) for flag in flag_list])
+
+        return item
+
+    def _add_to_sizer(self, ns: dict, widget, value: list) -> None:
+        """
+        Add the item to its sizer.
+
+        :param dict ns: The namespace of the panel being built.
+        :param widget: The name of a widget, panel, or sizer or the size of
+                       a spacer.
+        :type widget: str or tuple
+        :param list value: Various values used to add items to a sizer.
+        """
+        sizer = self.main_sizer if 'Sizer' in value[0] else self.second_sizer
+        item = ns[widget] if isinstance(widget, str) else widget
+        dict_ = find_dict(value)
+        prop, flags, border = dict_.get('add')
+        flags = self._flags(flags)
+        pos = dict_.get('pos')
+        span = dict_.get('span')
+
+        if pos and span:
+            ns[sizer].Add(item, pos, span, flags, border)
+        else:
+            ns[sizer].Add(item, prop, flags, border)
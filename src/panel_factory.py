@@ -42,10 +42,21 @@ class PanelFactory(TomlMetaData):
                                    "please contact the developer for help, %s",
                                    str(e), exc_info=True)
 
-    def setup_panel(self, panel):
+    def setup_panel(self, panel, config=None):
+        """
+        Generate the code for a panel.
+
+        :param str panel: The internal name of the panel.
+        :param config: A panel config to use instead of the one in the
+                       panel config file, it is only read.
+        :type config: dict or tomlkit.items.Table
+        """
+        if config is None:
+            config = self.panel_config.get(panel, {})
+
         class_name = f"{panel.capitalize()}Panel"
         self.__class_names[panel] = class_name
-        panel_kwargs = self.panel_config.get(panel, {}).get('meta')
+        panel_kwargs = config.get('meta')
         klass = StringIO()
 
         if panel in ('organization', 'fiscal'):
@@ -76,8 +87,7 @@ class PanelFactory(TomlMetaData):
         self.second_sizer = None
 
         # Create all the sizers.
-        for sizer, value in self.panel_config.get(
-            panel, {}).get('sizers', {}).items():
+        for sizer, value in config.get('sizers', {}).items():
             if value[0] == 'BoxSizer':
                 self.box_sizer(klass, sizer, value)
             elif value[0] == 'FlexGridSizer':
@@ -86,8 +96,7 @@ class PanelFactory(TomlMetaData):
                 self.grid_bag_sizer(klass, sizer, value)
 
         # Create all the widgets.
-        for widget, value in self.panel_config.get(
-            panel, {}).get('widgets', {}).items():
+        for widget, value in config.get('widgets', {}).items():
             if value[0] == 'RadioBox':
                 self.radio_box(klass, panel, widget, value)
             elif value[0] == 'StaticText':
@@ -114,8 +123,7 @@ class PanelFactory(TomlMetaData):
         # Create all the buttons.
         values = []
 
-        for item, value in self.panel_config.get(
-            panel, {}).get('buttons', {}).items():
+        for item, value in config.get('buttons', {}).items():
             values.append((item, value))
 
         if values:
@@ -0,0 +1,393 @@
+# -*- coding: utf-8 -*-
+#
+# src/panel_index.py
+#
+__docformat__ = "restructuredtext en"
+
+import re
+from bisect import bisect_left
+
+import tomlkit as tk
+
+from .core.utilities import find_dict
+
+
+class PanelIndex:
+    """
+    An ordered index over the widgets of one panel that is being edited.
+
+    Each widget gets a sort key with large gaps between them so adds,
+    removes and moves only touch the widgets involved, the `widget_NN` keys
+    and the GridBagSizer rows are only rewritten when `commit()` is called.
+    Lookups by sort key use `bisect` and lookups by field name use a dict.
+
+    .. note::
+
+       Only the lookups are logarithmic. The sort keys are kept in a plain
+       list, so an insert or remove still shifts the keys after it with
+       `list.insert` or `del`, which is O(n). The largest default panel
+       has under a hundred widgets, so this is still far cheaper than
+       rebuilding the doc.
+
+    Widgets in the same GridBagSizer row, for example a StaticText and its
+    TextCtrl, form a row group and are always moved together.
+    """
+    GAP = 1 << 16
+    _KEY_NUM = re.compile(r"^.*_(?P<count>\d+)$")
+
+    def __init__(self, panel=None):
+        """
+        :param panel: The TOML table of widgets for one panel.
+        :type panel: tomlkit.items.Table
+        """
+        self._order = []    # Sorted sort keys.
+        self._entries = {}  # {sort_key: [row_token, old_key, value], ...}
+        self._names = {}    # {field_name: sort_key, ...}
+        self._new_tokens = 0
+        self._first_row = 0
+        self._committed = None
+        self.dirty = False
+
+        if panel is not None:
+            self.load(panel)
+
+    def load(self, panel) -> None:
+        """
+        Build the index from a TOML table of widgets.
+
+        :param panel: The TOML table of widgets for one panel.
+        :type panel: tomlkit.items.Table
+        """
+        self._order.clear()
+        self._entries.clear()
+        self._names.clear()
+        self._first_row = None
+
+        for idx, (key, value) in enumerate(panel.items()):
+            sort_key = (idx + 1) * self.GAP
+            pos = find_dict(value).get('pos')
+
+            if pos:
+                token = ('row', pos[0])
+
+                if self._first_row is None:
+                    self._first_row = pos[0]
+            else:
+                token = ('none', idx)
+
+            self._order.append(sort_key)
+            self._entries[sort_key] = [token, key, value]
+            self._add_name(value, sort_key)
+
+        self._first_row = self._first_row or 0
+        self._committed = panel
+        self.dirty = False
+
+    def __len__(self):
+        return len(self._order)
+
+    @property
+    def names(self) -> list:
+        """
+        All the StaticText names in order.
+        """
+        return [name for name in (self.name_of(self._entries[sk][2])
+                                  for sk in self._order) if name]
+
+    def values(self) -> list:
+        """
+        All the widget values in order.
+        """
+        return [self._entries[sk][2] for sk in self._order]
+
+    def has_name(self, name: str) -> bool:
+        return name in self._names
+
+    def position(self, name: str) -> int:
+        """
+        Get the position of the named widget in the panel.
+
+        :param str name: The StaticText name.
+        :returns: The zero based position.
+        :rtype: int
+        """
+        return bisect_left(self._order, self._names[name])
+
+    def value_of(self, name: str):
+        """
+        Get the widget value list for the named widget.
+
+        :param str name: The StaticText name.
+        :returns: The widget value.
+        :rtype: list
+        """
+        return self._entries[self._names[name]][2]
+
+    def next_name(self, name: str) -> str:
+        """
+        Get the name of the first StaticText after the row group of the
+        named widget.
+
+        :param str name: The StaticText name.
+        :returns: The name or None if it is in the last named row.
+        :rtype: str or None
+        """
+        end = self._group_bounds(self.position(name))[1]
+
+        for sort_key in self._order[end:]:
+            next_ = self.name_of(self._entries[sort_key][2])
+
+            if next_:
+                return next_
+
+        return None
+
+    def last_row_name(self) -> str:
+        """
+        Get the name of the last StaticText in a GridBagSizer row, new
+        fields are added after this row.
+
+        :returns: The name or None if there are no names.
+        :rtype: str or None
+        """
+        for sort_key in reversed(self._order):
+            name = self.name_of(self._entries[sort_key][2])
+
+            if name:
+                return name
+
+        return None
+
+    def insert(self, values: list, before: str=None) -> list:
+        """
+        Insert a new row group.
+
+        :param list values: The widget values in the new row.
+        :param str before: The StaticText name of the row to insert before,
+                           the default is after the last GridBagSizer row.
+        :returns: The sort keys of the new widgets.
+        :rtype: list
+        """
+        self._new_tokens += 1
+        token = ('new', self._new_tokens)
+        return self._insert_group(
+            [(token, None, value) for value in values], before)
+
+    def remove(self, name: str) -> tuple:
+        """
+        Remove the row group that has the named widget.
+
+        :param str name: The StaticText name.
+        :returns: A record that can be passed to `restore()`.
+        :rtype: tuple
+        """
+        start, end = self._group_bounds(self.position(name))
+        group = []
+
+        for sort_key in self._order[start:end]:
+            token, key, value = self._entries.pop(sort_key)
+            self._remove_name(value)
+            group.append((token, key, value))
+
+        del self._order[start:end]
+        self._changed()
+        return start, group
+
+    def restore(self, record: tuple) -> None:
+        """
+        Put a removed row group back where it was. Records must be restored
+        in the reverse order they were made.
+
+        :param tuple record: The record returned by `remove()`.
+        """
+        start, group = record
+        self._insert_at(start, group)
+
+    def move(self, name: str, before: str=None) -> tuple:
+        """
+        Move the row group that has the named widget.
+
+        :param str name: The StaticText name.
+        :param str before: The StaticText name of the row to move before,
+                           the default is after the last GridBagSizer row.
+        :returns: The record of the old location.
+        :rtype: tuple
+        """
+        assert before != name, f"Cannot move '{name}' before itself."
+        record = self.remove(name)
+        self._insert_group(record[1], before)
+        return record
+
+    def rename(self, old: str, new: str) -> None:
+        """
+        Rename a StaticText widget.
+
+        :param str old: The current name.
+        :param str new: The new name.
+        """
+        sort_key = self._names.pop(old)
+        value = self._entries[sort_key][2]
+        find_dict(value)['args'][2] = new
+        self._names[new] = sort_key
+        self._changed()
+
+    def commit(self):
+        """
+        Serialise the index to a TOML table. The keys are renumbered from
+        `widget_00`, the GridBagSizer rows are renumbered, and any `update`
+        key references are changed to the new keys.
+
+        :returns: The TOML table of widgets.
+        :rtype: tomlkit.items.Table
+        """
+        if self._committed is None:
+            key_map = {}
+            row = self._first_row - 1
+            last_token = None
+            items = []
+
+            for idx, sort_key in enumerate(self._order):
+                token, old_key, value = self._entries[sort_key]
+                new_key = self.make_key(idx)
+                dict_ = find_dict(value)
+
+                if old_key:
+                    key_map[old_key] = new_key
+
+                if 'pos' in dict_:
+                    if token != last_token:
+                        row += 1
+                        last_token = token
+
+                    dict_['pos'][0] = row
+
+                self._entries[sort_key][1] = new_key
+                items.append((new_key, value))
+
+            table = tk.table()
+
+            for key, value in items:
+                dict_ = find_dict(value)
+                update = dict_.get('update')
+
+                if update and update in key_map:
+                    dict_['update'] = key_map[update]
+
+                table[key] = value
+
+            self._committed = table
+
+        self.dirty = False
+        return self._committed
+
+    def name_of(self, value) -> str:
+        """
+        Get the name of a StaticText widget value.
+
+        :param list value: The widget value.
+        :returns: The name or None if not a StaticText widget.
+        :rtype: str or None
+        """
+        name = None
+
+        if isinstance(value, list) and value and value[0] == 'StaticText':
+            args = find_dict(value).get('args', [])
+            name = args[2] if len(args) >= 3 else None
+
+        return name
+
+    def make_key(self, key_num: int) -> str:
+        return f"widget_{key_num:>02}"
+
+    def key_num(self, key: str) -> int:
+        sre = self._KEY_NUM.search(key)
+        assert sre is not None, f"There was an invalid key: {key}."
+        return int(sre.group('count'))
+
+    def _insert_group(self, group: list, before: str) -> list:
+        return self._insert_at(self._insert_position(before), group)
+
+    def _insert_at(self, idx: int, group: list) -> list:
+        """
+        Insert the (token, key, value) items at position idx between two
+        sort keys, respacing the whole index only when there is no gap left.
+        Each `list.insert` is O(n).
+        """
+        if self._gap(idx) <= len(group):
+            self._respace()
+
+        low = self._order[idx - 1] if idx > 0 else 0
+        step = self._gap(idx) // (len(group) + 1)
+        sort_keys = []
+
+        for num, (token, key, value) in enumerate(group, start=1):
+            sort_key = low + step * num
+            self._order.insert(idx + num - 1, sort_key)
+            self._entries[sort_key] = [token, key, value]
+            self._add_name(value, sort_key)
+            sort_keys.append(sort_key)
+
+        self._changed()
+        return sort_keys
+
+    def _insert_position(self, before: str) -> int:
+        if before is not None:
+            idx = self._group_bounds(self.position(before))[0]
+        else:
+            name = self.last_row_name()
+            idx = (self._group_bounds(self.position(name))[1]
+                   if name else len(self._order))
+
+        return idx
+
+    def _gap(self, idx: int) -> int:
+        low = self._order[idx - 1] if idx > 0 else 0
+        high = (self._order[idx] if idx < len(self._order)
+                else low + self.GAP)
+        return high - low
+
+    def _group_bounds(self, idx: int) -> tuple:
+        """
+        Find the slice of the row group that has the item at idx. This
+        walks the items of the group, which is at most a few widgets.
+        """
+        token = self._entries[self._order[idx]][0]
+        start = end = idx
+
+        while start > 0 and self._entries[self._order[start - 1]][0] == token:
+            start -= 1
+
+        while (end < len(self._order)
+               and self._entries[self._order[end]][0] == token):
+            end += 1
+
+        return start, end
+
+    def _respace(self) -> None:
+        entries = self._entries
+        self._entries = {}
+        self._names.clear()
+        order = self._order
+        self._order = []
+
+        for idx, sort_key in enumerate(order):
+            new_key = (idx + 1) * self.GAP
+            self._order.append(new_key)
+            self._entries[new_key] = entries[sort_key]
+            self._add_name(entries[sort_key][2], new_key)
+
+    def _add_name(self, value, sort_key: int) -> None:
+        name = self.name_of(value)
+
+        if name:
+            self._names[name] = sort_key
+
+    def _remove_name(self, value) -> None:
+        name = self.name_of(value)
+
+        if name:
+            self._names.pop(name, None)
+
+    def _changed(self) -> None:
+        self._committed = None
+        self.dirty = True
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+#
+# src/panel_layout.py
+#
+__docformat__ = "restructuredtext en"
+
+import time
+import logging
+
+from .instrument import Instrumentation
+
+
+class PanelLayout:
+    """
+    Keeps track of the panel that is shown so that on a resize only that
+    panel is sized and laid out. The hidden panels are marked stale and
+    are laid out once when they are next shown.
+    """
+
+    def __init__(self, logger_name: str=None, hook=None):
+        """
+        :param str logger_name: The logger to use.
+        :param callable hook: Called with (panel name, seconds) after each
+                              layout, the default is to only record it in
+                              the Instrumentation statistics.
+        """
+        self._active = None
+        self._stale = set()
+        self._size = None
+        self._hook = hook
+        self._log = logging.getLogger(logger_name)
+
+    @property
+    def active(self) -> str:
+        return self._active
+
+    @property
+    def stale(self) -> set:
+        return set(self._stale)
+
+    def set_hook(self, hook) -> None:
+        self._hook = hook
+
+    def activate(self, name: str, panel) -> None:
+        """
+        Set the panel that is being shown. If it missed any resizes while
+        hidden it is laid out now.
+
+        :param str name: The panel name.
+        :param wx.Panel panel: The panel.
+        """
+        self._active = name
+
+        if name in self._stale and self._size:
+            self._stale.discard(name)
+            self._layout(name, panel, *self._size)
+
+    def deactivate(self) -> None:
+        self._active = None
+
+    def resize(self, panels: dict, width: int, height: int) -> None:
+        """
+        Size and lay out the shown panel and mark the others stale.
+
+        :param dict panels: All the panels as in {<name>: <panel>, ...}.
+        :param int width: The width of the panels.
+        :param int height: The height of the panels.
+        """
+        self._size = (width, height)
+
+        for name, panel in panels.items():
+            if name == self._active:
+                self._stale.discard(name)
+                self._layout(name, panel, width, height)
+            else:
+                self._stale.add(name)
+
+    def replace(self, name: str, panel) -> None:
+        """
+        A panel was rebuilt, lay it out now if it is shown.
+
+        :param str name: The panel name.
+        :param wx.Panel panel: The new panel.
+        """
+        self._stale.add(name)
+
+        if name == self._active:
+            self.activate(name, panel)
+
+    def _layout(self, name: str, panel, width: int, height: int) -> None:
+        start = time.perf_counter()
+
+        with Instrumentation().measure(f"layout:{name}"):
+            panel.SetSize((width, height))
+            panel.SetSizeHints(width, height)
+            panel.Layout()
+
+        elapsed = time.perf_counter() - start
+        self._log.debug("Layout of the '%s' panel took %0.4f seconds.",
+                        name, elapsed)
+
+        if self._hook:
+            self._hook(name, elapsed)
@@ -4,7 +4,6 @@
 #
 __docformat__ = "restructuredtext en"
 
-import re
 import wx
 
 import datetime
@@ -233,113 +232,10 @@ class PopulateCollect:
         c_set[0].SetItems(choices + [f"{t[0]}-{t[1]}" for t in data])
         c_set[0].SetSelection(0)
 
-    def _value_to_db(self, value, financial: bool=False) -> str:
-        """
-        Convert the text currency value to an integer.
-
-        .. note::
-
-           We store currency values as integers converted to strings.
-           Example $1952.14 in the db is 195214.
-
-        :param value: A currency value from a field.
-        :type value: str or badidatetime.date or datetime.date
-        :returns: An integer value suttable for putting in the database.
-        :rtype: str
-        """
-        neg = False
-
-        if isinstance(value, int):
-            value = str(value)
-
-        if financial and value != '':
-            if value[0] == '-':
-                neg = True
-                value = value[1:]
-            elif value[0] == '+':
-                value = value[1:]
-
-            value = value.replace('.', '')
-        elif self.is_badi_date_object(value) or isinstance(value, wx.DateTime):
-            value = str(value)
-        else:
-            value = value.strip()
-
-        return value
-
-    def _db_fiancial_to_panel(self, value: str) -> str:
-        """
-        Convert a fiancial value from the database into a value sutable for
-        displaying in a widget.
-
-        :param int value: A currency value from the database.
-        :returns: A string representation of a currency value.
-        :rtype: str
-        """
-        try:
-            value = f"{int(value)/100:.2f}"
-        except ValueError:
-            try:
-                value = f"{float(value):.2f}"
-            except ValueError:
-                value = "0.00"
-
-        return value
-
-    def _panel_to_financial_panel(self, value: str) -> str:
-        """
-        Convert a financial value from the panel into a value sutable for
-        displaying in a panel widget.
-
-        :param str value: A financial value from a panel.
-        :returns: A string representation of a currency value.
-        :rtype: str
-        """
-        try:
-            value = f"{int(value):.2f}"
-        except ValueError:
-            try:
-                value = f"{float(value):.2f}"
-            except ValueError:
-                value = "0.00"
-
-        return value
-
-    def _str_to_int(self, value: str) -> int:
-        """
-        Convert a string to an integer.
-
-        :param str value: Value to convert.
-        :returns: Converted value or zero if value was not numeric.
-        :rtype: int
-        """
-        if not isinstance(value, int):
-            if value.isdigit():
-                value = int(value)
-            elif value.count('.'):
-                try:
-                    value = int(re.sub(r'\.', '', value))
-                except ValueError as e:
-                    msg = f"Expected a numeric value found '{value}'."
-                    self._mf.statusbar_warning = msg
-                    self._log.warning(msg[:-1] + ", %s", e)
-                    value = 0
-            else:
-                msg = f"Expected a numeric value found '{value}'."
-                self._mf.statusbar_warning = msg
-                self._log.warning(msg)
-                value = 0
-
-        return value
-
     def _set_value(self, obj, value):
         if obj.GetValue != value:
             obj.SetValue(value)
 
-    def is_badi_date_object(self, obj):
-        return (obj.__class__.__name__ == 'date' and
-                obj.__class__.__module__.endswith("badidatetime.datetime"))
-
     #
     # Methods called from panels
     #
@@ -369,43 +265,3 @@ class PopulateCollect:
                 self._set_value(c_set[1], work_on)
             elif field_name == 'audit_complete' and name1 == 'ColorCheckBox':
                 self._set_value(c_set[1], audit)
-
-    def _get_fiscal_year_value(self, year: int, *, pk: bool=False,
-                               date: bool=False, current: bool=False,
-                               work_on: bool=False, audit: bool=False,
-                               time: bool=False):
-        """
-        Return a specific value from the `fiscal_year` table.
-
-        :param bool pk: Get the Primary Key.
-        :param bool date: Get the date, (year, month, day).
-        :param bool current: Get the current fiscal year.
-        :param bool work_on: Get which fiscal year is being worked on.
-        :param bool audit: Get the audit status for the gived year.
-        :param bool time: Get the create and modified dates and times.
-        :returns: The value asked for.
-        :rtype: int or tuple
-        """
-        # Create dict from list of raw fiscal data.
-        assert (pk, date, current, audit,
-                work_on, time).count(True) == 1, (
-                    f"Only one argument can be `True`, found ({date}, "
-                    f"{current}, {audit}, {work_on}, {time}).")
-        data = {item[1]: item for item in self._fiscal_data}
-        items = data.get(year)
-        assert items, f"Invalid year {year}, options are {list(data)}."
-
-        if pk:
-            result = items[0]
-        elif date:
-            result = (items[1], items[2], items[3])
-        elif current:
-            result = items[4]
-        elif work_on:
-            result = items[5]
-        elif audit:
-            result = items[6]
-        elif time:
-            result = (items[7], items[8])
-
-        return result
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+#
+# src/profiler.py
+#
+__docformat__ = "restructuredtext en"
+
+import os
+import sys
+import json
+import time
+import cProfile
+import datetime
+from contextlib import contextmanager
+
+from .core.utilities import Borg
+
+
+class StartupProfiler(Borg):
+    """
+    Record named timing spans for each phase of the application startup.
+    This uses the borg pattern so the spans can be recorded from any
+    module. When not enabled all methods do nothing.
+    """
+    _REPORT_NAME = "startup-profile"
+    _enabled = False
+    _origin = None
+    _spans = []
+    _open_spans = {}
+    _cprofile = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+    def enable(self, cprofile: bool=False) -> None:
+        """
+        Start profiling.
+
+        :param bool cprofile: If `True` also run `cProfile` over the whole
+                              startup. The default is `False`.
+        """
+        StartupProfiler._enabled = True
+        StartupProfiler._origin = time.perf_counter()
+        self._spans.clear()
+        self._open_spans.clear()
+
+        if cprofile:
+            StartupProfiler._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @property
+    def spans(self) -> list:
+        """
+        The recorded spans.
+
+        :returns: A list of dicts as in [{'name': <name>, 'start': <sec>,
+                  'duration': <sec>}, ...]. The start is relative to when
+                  profiling was enabled.
+        :rtype: list
+        """
+        return list(self._spans)
+
+    @contextmanager
+    def span(self, name: str):
+        """
+        A context manager that times the code inside it.
+
+        :param str name: The name of the startup phase.
+        """
+        self.start_span(name)
+
+        try:
+            yield
+        finally:
+            self.end_span(name)
+
+    def start_span(self, name: str) -> None:
+        """
+        Start timing a span that ends in another part of the code, for
+        example the first paint of the main frame.
+
+        :param str name: The name of the startup phase.
+        """
+        if self._enabled:
+            self._open_spans[name] = time.perf_counter()
+
+    def end_span(self, name: str) -> None:
+        """
+        End timing a span started with `start_span`.
+
+        :param str name: The name of the startup phase.
+        """
+        if self._enabled and name in self._open_spans:
+            start = self._open_spans.pop(name)
+            self._spans.append({'name': name,
+                                'start': start - self._origin,
+                                'duration': time.perf_counter() - start})
+
+    def write_report(self, log_dir: str) -> str:
+        """
+        Stop profiling and write a JSON report, and the cProfile data if
+        enabled, to the log directory.
+
+        :param str log_dir: The directory to write the report to.
+        :returns: The full path to the report or None if not enabled.
+        :rtype: str or None
+        """
+        if not self._enabled:
+            return None
+
+        stamp = datetime.datetime.now().strftime("%Y%m%dT%H%M%S")
+        basename = os.path.join(log_dir, f"{self._REPORT_NAME}-{stamp}")
+        prof_path = None
+
+        if self._cprofile:
+            self._cprofile.disable()
+            prof_path = f"{basename}.prof"
+            self._cprofile.dump_stats(prof_path)
+            StartupProfiler._cprofile = None
+
+        from .bases import version
+        report = {'version': version(),
+                  'python': sys.version,
+                  'platform': sys.platform,
+                  'created': datetime.datetime.now().isoformat(),
+                  'total': time.perf_counter() - self._origin,
+                  'spans': self.spans,
+                  'cprofile': prof_path}
+        report_path = f"{basename}.json"
+
+        with open(report_path, 'w') as f:
+            json.dump(report, f, indent=2)
+
+        StartupProfiler._enabled = False
+        return report_path
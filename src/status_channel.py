@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+#
+# src/status_channel.py
+#
+__docformat__ = "restructuredtext en"
+
+import time
+import threading
+from collections import Counter
+
+
+class StatusChannel:
+    """
+    Queue status bar messages and repaint at most once per interval.
+
+    Messages posted between two repaints are merged, a single message is
+    shown as is and a burst of warnings or errors is shown as a summary,
+    for example "2 errors, 12 warnings, see log". The persistent fields
+    set with `add_field` are shown when there is no message.
+    """
+    MESSAGE = 'message'
+    WARNING = 'warning'
+    ERROR = 'error'
+    SEVERITIES = (MESSAGE, WARNING, ERROR)
+    DEFAULT_INTERVAL = 0.25  # Seconds
+
+    def __init__(self, paint, schedule, interval: float=DEFAULT_INTERVAL,
+                 clock=time.monotonic):
+        """
+        :param callable paint: Called with (text, severity) to repaint the
+                               status bar, severity is None for the fields.
+        :param callable schedule: Called with (milliseconds, callable) to
+                                  run the callable later on the GUI thread.
+        :param float interval: The minimum seconds between repaints.
+        :param callable clock: Returns the current time in seconds.
+        """
+        self._paint = paint
+        self._schedule = schedule
+        self._interval = interval
+        self._clock = clock
+        self._pending = []
+        self._scheduled = False
+        self._last = None
+        self._fields = {}
+        self._lock = threading.Lock()
+
+    @property
+    def fields(self) -> dict:
+        return self._fields
+
+    @property
+    def idle_text(self) -> str:
+        return " | ".join(str(value) for value in self._fields.values())
+
+    def post(self, severity: str, text: str) -> None:
+        """
+        Queue a message, a repaint is scheduled if one is not already.
+
+        :param str severity: One of the `SEVERITIES`.
+        :param str text: The message.
+        """
+        assert severity in self.SEVERITIES, (
+            f"Invalid severity '{severity}'.")
+
+        with self._lock:
+            self._pending.append((severity, text))
+
+            if self._scheduled:
+                return
+
+            self._scheduled = True
+
+        wait = 0 if self._last is None else max(
+            0, self._last + self._interval - self._clock())
+        self._schedule(round(wait * 1000), self.flush)
+
+    def flush(self) -> None:
+        """
+        Repaint with the queued messages.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+            self._scheduled = False
+
+        if pending:
+            self._last = self._clock()
+            self._paint(*self.summarize(pending))
+
+    def summarize(self, items: list) -> tuple:
+        """
+        Merge messages into one.
+
+        :param list items: A list of (severity, text) tuples.
+        :returns: The text and the highest severity.
+        :rtype: tuple
+        """
+        if len(items) == 1:
+            severity, text = items[0]
+        else:
+            counts = Counter(severity for severity, text in items)
+            severity = max(counts, key=self.SEVERITIES.index)
+
+            if severity == self.MESSAGE:
+                text = items[-1][1]
+            else:
+                parts = [f"{counts[sev]} {sev}{'s' if counts[sev] > 1 else ''}"
+                         for sev in (self.ERROR, self.WARNING) if counts[sev]]
+                text = f"{', '.join(parts)}, see log"
+
+        return text, severity
+
+    def add_field(self, key: str, value: str) -> None:
+        """
+        Add or change a persistent field.
+        """
+        self._fields[key] = value
+
+    def remove_field(self, key: str) -> None:
+        self._fields.pop(key, None)
@@ -9,8 +9,10 @@ from io import StringIO
 import wx
 from wx.lib.scrolledpanel import ScrolledPanel
 
-from .config import TomlMetaData, TomlCreatePanel
+from .config import TomlMetaData, TomlCreatePanel, TomlPanelConfig
 from .bases import BasePanel
+from .instrument import Instrumentation
+from .edit_journal import EditJournal
 from .utilities import GridBagSizer, ConfirmationDialog, EventStaticText
 
 
@@ -75,14 +77,90 @@ class ShortCuts(wx.Frame):
         self.Fit()
 
 
+class Statistics(wx.Frame):
+    """
+    This dialog displayes the database timing statistics and lets them be
+    exported so they can be attached to slowness reports.
+    """
+    _EXPORT_NAME = "db-statistics.json"
+
+    def __init__(self, parent, title="Database Statistics"):
+        super().__init__(parent, title=title)
+        self._inst = Instrumentation()
+        w_fg_color_0 = wx.Colour(50, 50, 204)
+        old_style = self.GetWindowStyle()
+        self.SetWindowStyle(old_style | wx.STAY_ON_TOP)
+        self.sizer = wx.BoxSizer(wx.VERTICAL)
+        self.enable = wx.CheckBox(self, label="&Collect statistics")
+        self.enable.SetValue(self._inst.enabled)
+        self.enable.Bind(wx.EVT_CHECKBOX, self.enable_stats)
+        self.sizer.Add(self.enable, 0, wx.ALL, 10)
+        self.stats_text = wx.StaticText(self, wx.ID_ANY, "")
+        self.stats_text.SetForegroundColour(w_fg_color_0)
+        self.stats_text.SetFont(wx.Font(
+            10, wx.FONTFAMILY_TELETYPE, wx.FONTSTYLE_NORMAL,
+            wx.FONTWEIGHT_NORMAL, 0, "Courier Prime"))
+        self.sizer.Add(self.stats_text, 1, wx.EXPAND | wx.ALL, 10)
+        buttons = wx.BoxSizer(wx.HORIZONTAL)
+
+        for label, callback in (("&Refresh", self.refresh),
+                                ("R&eset", self.reset),
+                                ("E&xport", self.export)):
+            button = wx.Button(self, label=label)
+            button.Bind(wx.EVT_BUTTON, callback)
+            buttons.Add(button, 0, wx.ALL, 5)
+
+        dismiss = wx.Button(self, id=wx.ID_OK, label="&Dismiss")
+        dismiss.Bind(wx.EVT_BUTTON, self.close_frame)
+        buttons.Add(dismiss, 0, wx.ALL, 5)
+        self.sizer.Add(buttons, 0, wx.ALL | wx.ALIGN_CENTER, 5)
+        self.SetSizer(self.sizer)
+        self.CenterOnParent(dir=wx.BOTH)
+        self.Show()
+
+    def close_frame(self, event):
+        self.Destroy()
+
+    def enable_stats(self, event):
+        self._inst.enable(self.enable.GetValue())
+        self.set_text()
+
+    def refresh(self, event):
+        self.set_text()
+
+    def reset(self, event):
+        self._inst.reset()
+        self.set_text()
+
+    def export(self, event):
+        with wx.FileDialog(
+            self, "Export Statistics", defaultFile=self._EXPORT_NAME,
+            wildcard="JSON files (*.json)|*.json",
+            style=wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT) as dlg:
+            if dlg.ShowModal() == wx.ID_OK:
+                self._inst.export(dlg.GetPath())
+
+    def set_text(self):
+        if self._inst.enabled or self._inst.stats:
+            text = self._inst.report()
+        else:
+            text = "Statistics are not being collected."
+
+        self.stats_text.SetLabel(text)
+        self.Fit()
+
+
 class FieldEdit(BasePanel, wx.Panel):
     """
     Add or remove fields in various panels.
     """
     _tmd = TomlMetaData()
     _tcp = TomlCreatePanel()
+    _tpc = TomlPanelConfig()
+    _REBUILD_DELAY = 500  # Milliseconds
     __previous_row = None
     __cl = None
+    __rebuild_cl = None
 
     def __init__(self, parent, *args, **kwargs):
         super().__init__(parent, *args, **kwargs)
@@ -94,6 +172,9 @@ class FieldEdit(BasePanel, wx.Panel):
         w_fg_color_0 = wx.Colour(50, 50, 204)   # Dark Blue
         w_fg_color_1 = wx.Colour(197, 75, 108)
         self.SetBackgroundColour(self._bg_color)
+        self._journal = EditJournal(
+            self._tcp, journal_dir=self._tcp.user_journal_dir,
+            logger_name=self._tcp.logger_name)
         # Setup sizers.
         sizer = wx.BoxSizer(wx.VERTICAL)
         self.SetSizer(sizer)
@@ -110,6 +191,13 @@ class FieldEdit(BasePanel, wx.Panel):
         self.Bind(wx.EVT_IDLE, self.on_idle_closure(arg_dict))
         self.dirty = False
 
+    @property
+    def unsaved_panel(self) -> str:
+        """
+        The panel with field edits that have not been saved or None.
+        """
+        return self._journal.panel_name if self._journal.can_undo else None
+
     def on_size(self, event):
         self.__resized = True
         event.Skip()
@@ -201,6 +289,16 @@ class FieldEdit(BasePanel, wx.Panel):
         undo_button.SetBackgroundColour(w_bg_color)
         undo_button.SetForegroundColour(w_fg_color_0)
         embed_sizer.Add(undo_button, 0, but_flags, 6)
+        redo_button = wx.Button(panel,  wx.ID_ANY, "Redo")
+        redo_button.SetMinSize((62, 32))
+        redo_button.SetBackgroundColour(w_bg_color)
+        redo_button.SetForegroundColour(w_fg_color_0)
+        embed_sizer.Add(redo_button, 0, but_flags, 6)
+        save_button = wx.Button(panel,  wx.ID_ANY, "Save")
+        save_button.SetMinSize((62, 32))
+        save_button.SetBackgroundColour(w_bg_color)
+        save_button.SetForegroundColour(w_fg_color_0)
+        embed_sizer.Add(save_button, 0, but_flags, 6)
 
         spin_desc = wx.StaticText(
             panel, wx.ID_ANY, "Click field then move it:", style=0)
@@ -222,6 +320,8 @@ class FieldEdit(BasePanel, wx.Panel):
         arg_dict['update_button'] = update_button
         arg_dict['remove_button'] = remove_button
         arg_dict['undo_buttom'] = undo_button
+        arg_dict['redo_button'] = redo_button
+        arg_dict['save_button'] = save_button
         return panel
 
     def _panel_bot(self, arg_dict):
@@ -279,6 +379,8 @@ class FieldEdit(BasePanel, wx.Panel):
         update_button = arg_dict['update_button']
         remove_button = arg_dict['remove_button']
         undo_button = arg_dict['undo_buttom']
+        redo_button = arg_dict['redo_button']
+        save_button = arg_dict['save_button']
 
         #evt_b = add_button.Unbind(wx.EVT_BUTTON)
         add_button.Bind(wx.EVT_BUTTON, self.add_closuer(arg_dict))
@@ -291,6 +393,8 @@ class FieldEdit(BasePanel, wx.Panel):
 
         #evt_d = undo_button.Unbind(wx.EVT_BUTTON)
         undo_button.Bind(wx.EVT_BUTTON, self.undo_closuer(arg_dict))
+        redo_button.Bind(wx.EVT_BUTTON, self.redo_closuer(arg_dict))
+        save_button.Bind(wx.EVT_BUTTON, self.save_closuer(arg_dict))
 
         #evt_s = self.Unbind(wx.EVT_SPINCTRL)
         self.Bind(wx.EVT_SPINCTRL, self.swap_rows_closure(
@@ -300,19 +404,14 @@ class FieldEdit(BasePanel, wx.Panel):
         def get_selection(event):
             edit_names = {m_name: name for m_name, name in self._tmd.panels}
             chosen = edit_names.get(event.GetString())
-            widget_labels = []
 
             if chosen:
+                # The panel config only changes on a save, so it is the
+                # panel as it is on disk.
                 items = self._tmd.panel_config.get(
                     chosen, {}).get('widgets', {})
-                self._tcp.current_panel = items
-
-                for value in items.values():
-                    if (isinstance(value, list) and value[0] == 'StaticText'):
-                        args = self._find_dict(value).get('args', [])
-                        widget_labels.append(args[2])
-
-                arg_dict['widget_labels'] = widget_labels
+                self._journal.start(chosen, items)
+                arg_dict['widget_labels'] = self._tcp.panel_index.names
                 self._create_widgets(arg_dict)
             else:
                 self._destroy_panel(arg_dict.get('panel'),
@@ -347,7 +446,7 @@ class FieldEdit(BasePanel, wx.Panel):
 
     def swap_rows_closure(self, arg_dict, orig_color):
         """
-        Event to swap the two rows.
+        Event to move a row, the rows in between shift by one.
         """
         def swap_rows(event):
             if self.__previous_row is not None:
@@ -359,7 +458,16 @@ class FieldEdit(BasePanel, wx.Panel):
                 if row0 != row1:
                     gbs = arg_dict.get('bot_grid_sizer')
                     self.stop_call_later()
-                    gbs.swap_rows(row0, row1)
+                    names = self._tcp.panel_index.names
+
+                    if row1 < row0:
+                        before = names[row1]
+                    else:
+                        before = names[row1+1] if row1+1 < len(names) else None
+
+                    self._journal.move(names[row0], before)
+                    self._schedule_rebuild()
+                    gbs.move_row(row0, row1)
                     self.Layout()
                     self.__cl = wx.CallLater(
                         7000, self.turn_off_highlight, arg_dict, orig_color)
@@ -413,7 +521,8 @@ class FieldEdit(BasePanel, wx.Panel):
                             arg_dict, orig_color=w_bg_color),
                         id=widget.GetId())
                     self.bind_events(arg_dict)
-                    self._tcp.add_name(value)
+                    self._journal.add(value)
+                    self._schedule_rebuild()
                     self._update_screen_size(arg_dict)
                 else:
                     msg = "Duplicate fields are not allowed."
@@ -429,7 +538,16 @@ class FieldEdit(BasePanel, wx.Panel):
 
             if value.endswith(':'):
                 widget = arg_dict['current_widget']
-                widget.SetLabel(value if value.endswith(':') else value + ':')
+                old = widget.GetLabel()
+
+                if value in self._tcp.field_names:
+                    if value != old:
+                        msg = "Duplicate fields are not allowed."
+                        self.frame.statusbar_warning = msg
+                else:
+                    widget.SetLabel(value)
+                    self._journal.rename(old, value)
+                    self._schedule_rebuild()
             elif value:
                 self.frame.statusbar_warning = "Cannot update title fields."
 
@@ -453,29 +571,23 @@ class FieldEdit(BasePanel, wx.Panel):
 
                 if ret:
                     gbs = arg_dict.get('bot_grid_sizer')
-                    rows = gbs.GetRows()
                     # Row to remove
                     spin_ctrl = arg_dict['spin_ctrl']
                     row = spin_ctrl.GetValue()
 
-                    # Move the row to remove to the end of the list.
                     if row >= 0:
+                        self.stop_call_later()
                         spin_ctrl.SetValue("")
-                        start_row = row
-
-                        for count in range(rows-row-1):
-                            self.gbs_swap_rows(gbs, start_row, start_row+1)
-                            start_row += 1
+                        self.__previous_row = None
 
-                        windows = [(item.GetWindow())
-                                   for item in gbs.GetChildren()
-                                   if item and item.GetPos()[0] == rows-1]
-
-                        for window in windows:
+                        # Remove the row and move all after it up in one
+                        # pass.
+                        for window in gbs.remove_row(row, destroy=False):
                             window.Unbind(window.EVT_CLICK_POSITION)
                             window.Destroy()
 
-                        self._tcp.remove_name(value)
+                        self._journal.remove(value)
+                        self._schedule_rebuild()
                         gbs.Layout()
                         arg_dict['panel'].Layout()
             elif value:
@@ -485,13 +597,80 @@ class FieldEdit(BasePanel, wx.Panel):
 
     def undo_closuer(self, arg_dict):
         def undo_button(event):
-            value = arg_dict['new_field_name'].GetValue()
-
-            #if value.endswith(':'):
-            #    self._tcp.undo_name(name)
+            if self._journal.undo():
+                self._refresh_widgets(arg_dict)
+            else:
+                self.frame.statusbar_warning = "Nothing to undo."
 
         return undo_button
 
+    def redo_closuer(self, arg_dict):
+        def redo_button(event):
+            if self._journal.redo():
+                self._refresh_widgets(arg_dict)
+            else:
+                self.frame.statusbar_warning = "Nothing to redo."
+
+        return redo_button
+
+    def save_closuer(self, arg_dict):
+        def save_button(event):
+            name = self._journal.panel_name
+
+            if not self._journal.can_undo:
+                self.frame.statusbar_warning = "Nothing to save."
+            else:
+                self._tmd.panel_config[name]['widgets'] = (
+                    self._tcp.current_panel)
+
+                try:
+                    self._tpc.write_file()
+                except OSError:
+                    self.frame.statusbar_warning = (
+                        f"Could not save the {name.capitalize()} panel.")
+                else:
+                    if self.__rebuild_cl and self.__rebuild_cl.IsRunning():
+                        self.__rebuild_cl.Stop()
+                        self._rebuild_panel()
+
+                    if name in self.frame.panels:
+                        self.frame.register_panel_fields(name)
+
+                    # A saved session must not be replayed as pending.
+                    self._journal.clear()
+                    self.frame.statusbar_message = (
+                        f"Saved the {name.capitalize()} panel.")
+
+        return save_button
+
+    def _refresh_widgets(self, arg_dict):
+        self.stop_call_later()
+        self.__previous_row = None
+        arg_dict['new_field_name'].SetValue("")
+        arg_dict['widget_labels'] = self._tcp.panel_index.names
+        self._create_widgets(arg_dict)
+        self._schedule_rebuild()
+
+    def _schedule_rebuild(self):
+        """
+        Rebuild the live panel being edited once the edits have stopped
+        for a moment, so a burst of edits only rebuilds it once.
+        """
+        if self.__rebuild_cl and self.__rebuild_cl.IsRunning():
+            self.__rebuild_cl.Restart(self._REBUILD_DELAY)
+        else:
+            self.__rebuild_cl = wx.CallLater(self._REBUILD_DELAY,
+                                             self._rebuild_panel)
+
+    def _rebuild_panel(self):
+        name = self._journal.panel_name
+        self.__rebuild_cl = None
+
+        if name in self.frame.panels:
+            self.frame.rebuild_panel(name, self._tcp.current_panel)
+            self.frame.statusbar_message = (
+                f"Updated the {name.capitalize()} panel.")
+
     def turn_off_highlight(self, arg_dict, orig_color):
         gbs = arg_dict.get('bot_grid_sizer')
         arg_dict['spin_ctrl'].SetValue("")
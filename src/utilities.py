@@ -7,71 +7,10 @@ __docformat__ = "restructuredtext en"
 import re
 import wx
 
+from .core.utilities import make_name, Borg, StoreObjects
 from .custom_widgits import ColorCheckBox, EVT_COLOR_CHECKBOX
 
 
-def make_name(name: str):
-    name = re.sub(r"[&*\(\):\"'/\\]+", '', name)
-    name = re.sub(r"[- \s]+", '_', name).strip('_')
-    return re.sub(r"_+", "_", name).lower()
-
-
-class Borg:
-    """
-    We store the instances instead of the __dict__. This alows the updating
-    of future instances with the data from the previous instances. Without
-    this, new instances would not have all the data.
-    """
-    def __new__(cls, *args, **kwargs):
-        if not hasattr(cls, '_instances'):
-            cls._instances = []
-
-        instance = super().__new__(cls)
-        cls._instances.append(instance)
-
-        if cls._instances:
-            for key, value in cls._instances[0].__dict__.items():
-                instance.__dict__[key] = value
-
-        return instance
-
-    def __setattr__(self, name, value):
-        # Prevent polluting shared state with internal __dict__
-        if name == '__dict__':
-            return
-
-        # Let Python run descriptor logic
-        object.__setattr__(self, name, value)
-        # Propagate the value to all other instances **only if**
-        # the name is not a data descriptor (i.e., not a property)
-        cls = type(self)
-        attr = getattr(cls, name, None)
-
-        if not hasattr(attr, '__set__'):
-            for inst in cls._instances:
-                if inst is not self:
-                    inst.__dict__[name] = value
-
-    def clear_state(self):
-        for inst in self._instances:
-            inst.__dict__.clear()
-
-        self._instances.clear()
-
-
-class StoreObjects(Borg):
-    _object_store = {}
-
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-
-    def set_object(self, key, value):
-        self._object_store[key] = value
-
-    def get_object(self, key):
-        return self._object_store.get(key)
-
-
 class GridBagSizer(wx.GridBagSizer):
 
     def swap_rows(self, row0, row1):
@@ -118,6 +57,140 @@ class GridBagSizer(wx.GridBagSizer):
             self.Add(w_list[0], w_list[1], w_list[2],
                      flag=w_list[3], border=w_list[4])
 
+    def move_rows(self, mapping):
+        """
+        Move any number of rows at once. The final position of every item
+        is computed first, then the moved items are detached and re-added
+        in a single pass with the window frozen.
+
+        :param dict mapping: A dict of {old_row: new_row, ...}, rows not in
+                             the mapping stay where they are.
+        """
+        rows = self.row_count
+        mapping = {old: new for old, new in mapping.items() if old != new}
+
+        for old, new in mapping.items():
+            assert -1 < old < rows, ("The row value is invalid can only be "
+                                     f"between 0 and {rows-1}, found {old}")
+            assert new > -1, f"The new row must be >= 0, found {new}."
+
+        new_rows = set(mapping.values())
+        assert len(new_rows) == len(mapping), (
+            "Two rows cannot be moved to the same row.")
+        fixed = new_rows.intersection(
+            item.GetPos()[0] for item in self.GetChildren()
+            if item.GetPos()[0] not in mapping)
+        assert not fixed, f"The rows {sorted(fixed)} are not empty."
+
+        if not mapping:
+            return
+
+        window = self.GetContainingWindow()
+
+        if window:
+            window.Freeze()
+
+        try:
+            saved = []
+
+            for idx, item in enumerate(self.GetChildren()):
+                row, col = item.GetPos()
+
+                if row in mapping:
+                    saved.append((idx, self._item_object(item),
+                                  (mapping[row], col), item.GetSpan(),
+                                  item.GetFlag(), item.GetBorder(),
+                                  item.GetUserData()))
+
+            [self.Detach(values[0]) for values in reversed(saved)]
+
+            for idx, obj, pos, span, flag, border, data in saved:
+                self.Add(obj, pos, span, flag=flag, border=border,
+                         userData=data)
+        finally:
+            if window:
+                window.Thaw()
+
+    def move_row(self, row, to):
+        """
+        Move one row to a new position, the rows in between shift by one.
+
+        :param int row: The row to move.
+        :param int to: The row it will be in after the move.
+        """
+        if row < to:
+            mapping = {r: r - 1 for r in range(row + 1, to + 1)}
+        else:
+            mapping = {r: r + 1 for r in range(to, row)}
+
+        mapping[row] = to
+        self.move_rows(mapping)
+
+    def insert_row(self, row):
+        """
+        Make an empty row by moving the given row and all the rows after it
+        down by one.
+
+        :param int row: The row that will be empty.
+        """
+        self.move_rows({r: r + 1 for r in range(row, self.row_count)})
+
+    def remove_row(self, row, destroy=True):
+        """
+        Remove all the items in a row and move all the rows after it up
+        by one.
+
+        :param int row: The row to remove.
+        :param bool destroy: If True the windows in the row are destroyed,
+                             the default is True.
+        :returns: The windows that were removed if not destroyed.
+        :rtype: list
+        """
+        rows = self.row_count
+        assert -1 < row < rows, ("The row value is invalid can only be "
+                                 f"between 0 and {rows-1}, found {row}")
+        window = self.GetContainingWindow()
+
+        if window:
+            window.Freeze()
+
+        try:
+            removed = [(idx, item.GetWindow())
+                       for idx, item in enumerate(self.GetChildren())
+                       if item.GetPos()[0] == row]
+            [self.Detach(idx) for idx, w in reversed(removed)]
+            windows = [w for idx, w in removed if w]
+
+            if destroy:
+                [w.Destroy() for w in windows]
+                windows = []
+
+            self.move_rows({r: r - 1 for r in range(row + 1, rows)})
+        finally:
+            if window:
+                window.Thaw()
+
+        return windows
+
+    @property
+    def row_count(self):
+        """
+        The number of rows used by the items, unlike `GetRows()` this does
+        not need a `Layout()` to be up to date.
+        """
+        return max((item.GetPos()[0] + item.GetSpan()[0]
+                    for item in self.GetChildren()), default=0)
+
+    def _item_object(self, item):
+        if item.IsWindow():
+            obj = item.GetWindow()
+        elif item.IsSizer():
+            obj = item.GetSizer()
+        else:
+            obj = item.GetSpacer()
+
+        return obj
+
     def highlight_row(self, row, color):
         if row is not None:
             for item in self.GetChildren():
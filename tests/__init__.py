@@ -50,7 +50,31 @@ RUN_FLAG = {'TestBadiCalendarPopup': False,
             'TestGridBagSizer': False,
             'TestConfirmationDialog': False,
             'Test_ClickPosition': False,
-            'TestEventStaticText': False}
+            'TestEventStaticText': False,
+            'TestTransactionClock': False,
+            'TestLazyImport': False,
+            'TestStartupImports': False,
+            'TestStartupProfiler': False,
+            'TestInstrumentation': False,
+            'TestPanelIndex': False,
+            'TestEditJournal': False,
+            'TestGridBagSizerRows': False,
+            'TestConfigWatcher': False,
+            'TestPanelLayout': False,
+            'TestStatusChannel': False,
+            'TestDatabaseBackends': False,
+            'TestSyntheticData': False,
+            'TestHeadlessCore': False,
+            'TestBatchCommands': False,
+            'TestDataExporter': False,
+            'TestBulkImporter': False,
+            'TestArchive': False,
+            'TestBackupManager': False,
+            'TestSyncManager': False,
+            'TestDigestTree': False,
+            'TestJournal': False,
+            'TestPanelBuilder': False,
+            'TestRebuildPanel': False}
 
 
 def check_flag(name):
@@ -157,3 +157,83 @@ class TestLogger(unittest.TestCase):
         self.assertIn(should_be_in_log, data, msg)
         msg = f"Could not fine '{should_not_be_in_log}' in log file '{data}'"
         self.assertNotIn(should_not_be_in_log, data, msg)
+
+    #@unittest.skip("Temporarily skipped")
+    def test_config_queued(self):
+        """
+        Test that a queued logger writes to the file from the listener
+        thread after stop is called.
+        """
+        name = 'TestQueuedName'
+        logger = Logger()
+        logger.config(logger_name=name, file_path=self._TMP_LOGGER_FILE,
+                      initial_msg=False, queued=True)
+        log = logging.getLogger(name)
+        test_msg = "Test queued logging"
+        log.info(test_msg)
+        handlers = [h.__class__.__name__ for h in log.handlers]
+        logger.stop()
+        [log.removeHandler(h) for h in log.handlers[:]]
+        data = ""
+
+        with open(self._TMP_LOGGER_FILE, 'r') as f:
+            data = f.read()
+
+        msg = f"Should find 'QueueHandler' in {handlers}."
+        self.assertIn('QueueHandler', handlers, msg)
+        msg = f"Should find '{test_msg}' in {data}."
+        self.assertIn(test_msg, data, msg)
+        msg = f"Should find no listeners, found {Logger._listeners}."
+        self.assertEqual([], Logger._listeners, msg)
+
+    #@unittest.skip("Temporarily skipped")
+    def test_config_queued_root(self):
+        """
+        Test that a queued root logger formats each record only once.
+        """
+        root = logging.getLogger()
+        old_handlers, old_level = root.handlers[:], root.level
+        logger = Logger("%(levelname)s %(message)s")
+        logger.config(file_path=self._TMP_LOGGER_FILE, initial_msg=False,
+                      queued=True)
+        test_msg = "Test queued root logging"
+        root.info(test_msg)
+        logger.stop()
+        [root.removeHandler(h) for h in root.handlers[:]]
+        [root.addHandler(h) for h in old_handlers]
+        root.setLevel(old_level)
+        data = ""
+
+        with open(self._TMP_LOGGER_FILE, 'r') as f:
+            data = f.read()
+
+        expected = f"INFO {test_msg}\n"
+        msg = f"Expected {expected!r}, found {data!r}."
+        self.assertEqual(expected, data, msg)
+
+    #@unittest.skip("Temporarily skipped")
+    def test_config_rotating(self):
+        """
+        Test that the log file is rotated when it reaches max_bytes.
+        """
+        name = 'TestRotatingName'
+        backup = f"{self._TMP_LOGGER_FILE}.1"
+        Logger().config(logger_name=name, file_path=self._TMP_LOGGER_FILE,
+                        initial_msg=False, max_bytes=500, backup_count=1)
+        log = logging.getLogger(name)
+
+        for idx in range(20):
+            log.info("Test rotating message %s.", idx)
+
+        [h.close() for h in log.handlers]
+        [log.removeHandler(h) for h in log.handlers[:]]
+        size = os.path.getsize(self._TMP_LOGGER_FILE)
+        exists = os.path.exists(backup)
+
+        if exists:
+            os.remove(backup)
+
+        msg = f"Should find the backup file '{backup}'."
+        self.assertTrue(exists, msg)
+        msg = f"The log file should be <= 500 bytes, found {size}."
+        self.assertLessEqual(size, 500, msg)
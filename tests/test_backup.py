@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+#
+# test/test_backup.py
+#
+__docformat__ = "restructuredtext en"
+
+import os
+import gzip
+import time
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from . import check_flag
+from src.core.bahai_database import Database
+from src.core.backup import BackupManager
+from scripts.synthetic_data import SyntheticData
+
+
+class TestBackupManager(unittest.TestCase):
+
+    def __init__(self, name):
+        super().__init__(name)
+
+    def setUp(self):
+        check_flag(self.__class__.__name__)
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db = Database()
+        self.db.data_path = os.path.join(self.tmp_dir, 'books.sqlite3')
+        SyntheticData(2).build(self.db)
+        self.bm = BackupManager(keep=3, pages=8)
+
+    def tearDown(self):
+        self.bm.stop()
+        BackupManager(interval=BackupManager.DEFAULT_INTERVAL,
+                      keep=BackupManager.DEFAULT_KEEP,
+                      pages=BackupManager.DEFAULT_PAGES)
+        self.db.data_path = None
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def count_rows(self, path):
+        with sqlite3.connect(path) as con:
+            return con.execute(
+                f"SELECT COUNT(*) FROM {self.db._T_DATA};").fetchone()[0]
+
+    #@unittest.skip("Temporarily skipped")
+    def test_backup(self):
+        """
+        Test that a snapshot is a compressed copy of the database.
+        """
+        path = self.bm.backup()
+        msg = "Expected {}, found {}."
+        self.assertTrue(path.endswith('.sqlite3.gz'), msg.format('.gz', path))
+        found = self.bm.snapshots
+        self.assertEqual([path], found, msg.format([path], found))
+        copy = os.path.join(self.tmp_dir, 'copy.sqlite3')
+
+        with gzip.open(path, 'rb') as src, open(copy, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+
+        expected = self.count_rows(self.db.user_data_fullpath)
+        found = self.count_rows(copy)
+        self.assertEqual(expected, found, msg.format(expected, found))
+        found = self.bm.verify(path)
+        self.assertEqual('ok', found, msg.format('ok', found))
+        found = [name for name in os.listdir(self.db.user_backup_dir)
+                 if not name.endswith('.gz')]
+        self.assertEqual([], found, msg.format([], found))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_rotate(self):
+        """
+        Test that only the newest snapshots are kept.
+        """
+        paths = [self.bm.backup() for count in range(5)]
+        found = self.bm.snapshots
+        msg = "Expected {}, found {}."
+        self.assertEqual(paths[-3:], found, msg.format(paths[-3:], found))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_verify_corrupt(self):
+        """
+        Test that a damaged snapshot does not verify.
+        """
+        path = self.bm.backup()
+
+        with open(path, 'r+b') as f:
+            f.seek(os.path.getsize(path) // 2)
+            f.write(b'\x00' * 64)
+
+        found = self.bm.verify(path)
+        msg = "Expected {}, found {}."
+        self.assertNotEqual('ok', found, msg.format('an error', found))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_thread(self):
+        """
+        Test that the thread takes a snapshot at once when there are none
+        and then waits for the interval.
+        """
+        BackupManager(interval=3600)
+        self.bm.start()
+        msg = "Expected {}, found {}."
+        self.assertTrue(self.bm.running, msg.format(True, self.bm.running))
+        end = time.monotonic() + 10
+
+        while not self.bm.snapshots and time.monotonic() < end:
+            time.sleep(0.05)
+
+        time.sleep(0.2)
+        found = len(self.bm.snapshots)
+        self.assertEqual(1, found, msg.format(1, found))
+        self.bm.stop()
+        self.assertFalse(self.bm.running, msg.format(False, self.bm.running))
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+#
+# test/test_batch.py
+#
+__docformat__ = "restructuredtext en"
+
+import io
+import os
+import csv
+import sqlite3
+import asyncio
+import shutil
+import tempfile
+import unittest
+from argparse import Namespace
+
+from . import check_flag
+from src.core.bahai_database import Database
+from src.core.batch import BatchCommands
+from scripts.synthetic_data import SyntheticData
+
+
+class TestBatchCommands(unittest.TestCase):
+
+    def __init__(self, name):
+        super().__init__(name)
+
+    def setUp(self):
+        check_flag(self.__class__.__name__)
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'books.sqlite3')
+        self.db = Database()
+        self.db.data_path = self.path
+        self.sd = SyntheticData(2)
+        self.sd.build(self.db)
+
+    def tearDown(self):
+        self.db.data_path = None
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def run_command(self, command, **kwargs):
+        kwargs.setdefault('db', [self.path])
+        options = Namespace(command=command, jobs=1, **kwargs)
+        out = io.StringIO()
+        status = BatchCommands(options, out=out).run()
+        return status, out.getvalue()
+
+    #@unittest.skip("Temporarily skipped")
+    def test_report(self):
+        """
+        Test that each fiscal year is reported with its number of values.
+        """
+        status, text = self.run_command('report')
+        msg = "Expected {}, found {}."
+        self.assertEqual(0, status, msg.format(0, status))
+        lines = text.splitlines()
+        found = len(lines)
+        self.assertEqual(4, found, msg.format(4, found))
+        found = lines[2].split()
+        count = str(SyntheticData.MONTHS * len(self.sd.fields))
+        expected = [str(self.sd.current_year), '1', '1', '0', count]
+        self.assertEqual(expected, found, msg.format(expected, found))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_export_import(self):
+        """
+        Test that an export of the current year can be imported back.
+        """
+        status, text = self.run_command('export', year=self.sd.current_year)
+        msg = "Expected {}, found {}."
+        rows = list(csv.reader(io.StringIO(text)))
+        found = tuple(rows[0])
+        expected = BatchCommands.EXPORT_HEADER
+        self.assertEqual(expected, found, msg.format(expected, found))
+        found = len(rows) - 1
+        expected = SyntheticData.MONTHS * len(self.sd.fields)
+        self.assertEqual(expected, found, msg.format(expected, found))
+        path = os.path.join(self.tmp_dir, 'export.csv')
+
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(rows[0])
+            writer.writerow(rows[-1][:-1] + ['42'])
+            writer.writerow(['1'] + rows[-1][1:])
+
+        status, text = self.run_command('import', file=path)
+        self.assertEqual(0, status, msg.format(0, status))
+        self.assertIn("Imported 1 values", text)
+        self.assertIn("skipped 1 rows", text)
+        status, text = self.run_command('export', year=self.sd.current_year)
+        found = list(csv.reader(io.StringIO(text)))[-1][-1]
+        self.assertEqual('42.00', found, msg.format('42.00', found))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_import_timezone(self):
+        """
+        Test that imported values are time stamped in the organization's
+        timezone.
+        """
+        db, year = self.db, self.sd.current_year
+        now = SyntheticData.STAMP.isoformat()
+
+        with sqlite3.connect(self.path) as con:
+            con.execute(f"INSERT INTO {db._T_FIELD_TYPE} (field, c_time, "
+                        "m_time) VALUES ('iana_name', ?, ?);", (now, now))
+            con.execute(
+                f"INSERT INTO {db._T_DATA} (value, fy1fk, fy2fk, mfk, ffk, "
+                "c_time, m_time) SELECT 'Asia/Tehran', y1.pk, y2.pk, m.pk, "
+                f"f.pk, ?, ? FROM {db._T_FISCAL_YEAR} AS y1, "
+                f"{db._T_FISCAL_YEAR} AS y2, {db._T_MONTH} AS m, "
+                f"{db._T_FIELD_TYPE} AS f WHERE y1.year = ? AND "
+                "y2.year = ? AND m.ord = 1 AND f.field = 'iana_name';",
+                (now, now, year, year + 1))
+
+        path = os.path.join(self.tmp_dir, 'import.csv')
+        field = 'new_field'
+
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(BatchCommands.EXPORT_HEADER)
+            writer.writerow([year, 2, '', field, 'abc'])
+
+        status, text = self.run_command('import', file=path)
+        msg = "Expected {}, found {}."
+        self.assertEqual(0, status, msg.format(0, status))
+
+        with sqlite3.connect(self.path) as con:
+            found = con.execute(
+                f"SELECT d.m_time FROM {db._T_DATA} AS d JOIN "
+                f"{db._T_FIELD_TYPE} AS f ON f.pk = d.ffk JOIN "
+                f"{db._T_MONTH} AS m ON m.pk = d.mfk JOIN "
+                f"{db._T_FISCAL_YEAR} AS y ON y.pk = d.fy1fk WHERE "
+                "f.field = ? AND m.ord = 2 AND y.year = ?;",
+                (field, year)).fetchone()[0]
+
+        self.assertTrue(found.endswith('+03:30'), msg.format('+03:30', found))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_rollover(self):
+        """
+        Test that the next year becomes the current year.
+        """
+        status, text = self.run_command('rollover')
+        expected = self.sd.current_year + 1
+        self.assertIn(str(expected), text)
+        found = asyncio.run(self.db._get_current_fiscal_year())[0]
+        msg = f"Expected {expected}, found {found}."
+        self.assertEqual(expected, found, msg)
+
+    #@unittest.skip("Temporarily skipped")
+    def test_missing_database(self):
+        """
+        Test that a missing database fails without creating it.
+        """
+        path = os.path.join(self.tmp_dir, 'missing.sqlite3')
+        status, text = self.run_command('vacuum', db=[self.path, path])
+        msg = "Expected {}, found {}."
+        self.assertEqual(1, status, msg.format(1, status))
+        self.assertIn("Vacuumed", text)
+        self.assertFalse(os.path.exists(path))
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+#
+# test/test_bulk_import.py
+#
+__docformat__ = "restructuredtext en"
+
+import io
+import asyncio
+import unittest
+
+from . import check_flag
+from src.config import Settings
+from src.core.bahai_database import Database
+from src.core.bulk_import import BulkImporter
+from src.core.export import DataExporter
+from scripts.synthetic_data import SyntheticData
+
+
+class TestBulkImporter(unittest.TestCase):
+
+    def __init__(self, name):
+        super().__init__(name)
+
+    def setUp(self):
+        check_flag(self.__class__.__name__)
+        self.db = Database()
+        self.db.data_backend = Settings.BACKEND_MEMORY
+        self.db.data_name = 'test-bulk-import'
+        self.sd = SyntheticData(1)
+        self.sd.build(self.db)
+
+    def tearDown(self):
+        self.db.close_memory_db()
+        self.db.data_backend = Settings.BACKEND_FILE
+        self.db.data_name = None
+
+    def count_values(self, year):
+        return len(asyncio.run(self.db.select_all_config_data(year)))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_spreadsheet_layout(self):
+        """
+        Test that a row per month with a column per field creates the
+        missing years and fields.
+        """
+        year = self.sd.first_year - 10
+        text = ("Year,Month,Cash in Bank:,New Field\n"
+                f"{year},1,\"$1,952.14\",abc\n"
+                f"{year},2,10,\n")
+        importer = BulkImporter(self.db, chunk_size=2,
+                                financial={'cash_in_bank'})
+        count = asyncio.run(importer.load(io.StringIO(text)))
+        msg = "Expected {}, found {}."
+        self.assertEqual(3, count, msg.format(3, count))
+        self.assertEqual(1, importer.fields, msg.format(1, importer.fields))
+        self.assertEqual(2, importer.years, msg.format(2, importer.years))
+        self.assertTrue(importer.rate > 0, msg.format('> 0', importer.rate))
+        expected = [(year, 1, 'cash_in_bank', '195214'),
+                    (year, 1, 'new_field', 'abc'),
+                    (year, 2, 'cash_in_bank', '1000')]
+        found = [(y, o, f, v) for y, o, m, f, v in asyncio.run(
+            self.db.select_all_config_data(year))]
+        self.assertEqual(expected, found, msg.format(expected, found))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_export_layout(self):
+        """
+        Test that an export can be loaded into a new year.
+        """
+        exporter = DataExporter(self.db, financial=set())
+        out = io.StringIO()
+        asyncio.run(exporter.export(out, self.sd.current_year))
+        new_year = self.sd.current_year + 5
+        text = out.getvalue().replace(f"\n{self.sd.current_year},",
+                                      f"\n{new_year},")
+        importer = BulkImporter(self.db, chunk_size=100, financial=set())
+        count = asyncio.run(importer.load(io.StringIO(text)))
+        expected = self.count_values(self.sd.current_year)
+        msg = "Expected {}, found {}."
+        self.assertEqual(expected, count, msg.format(expected, count))
+        found = self.count_values(new_year)
+        self.assertEqual(expected, found, msg.format(expected, found))
+        self.assertEqual(0, importer.fields, msg.format(0, importer.fields))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_reimport(self):
+        """
+        Test that loading the same file again adds no rows, and that a
+        changed value updates its row and is journaled.
+        """
+        year = self.sd.first_year - 10
+        text = ("Year,Month,Cash in Bank:,New Field\n"
+                f"{year},1,10,abc\n"
+                f"{year},2,20,def\n")
+        importer = BulkImporter(self.db, financial={'cash_in_bank'})
+        asyncio.run(importer.load(io.StringIO(text)))
+        before = asyncio.run(self.db.select_all_config_data(year))
+        count = asyncio.run(importer.load(io.StringIO(text)))
+        msg = "Expected {}, found {}."
+        self.assertEqual(0, count, msg.format(0, count))
+        found = (importer.inserted, importer.updated, importer.skipped)
+        self.assertEqual((0, 0, 4), found, msg.format((0, 0, 4), found))
+        found = asyncio.run(self.db.select_all_config_data(year))
+        self.assertEqual(before, found, msg.format(before, found))
+        count = asyncio.run(importer.load(io.StringIO(
+            text.replace('def', 'xyz'))))
+        found = (importer.inserted, importer.updated, importer.skipped)
+        self.assertEqual((0, 1, 3), found, msg.format((0, 1, 3), found))
+        found = [item[4] for item in asyncio.run(
+            self.db.select_all_config_data(year))]
+        expected = ['1000', 'abc', '2000', 'xyz']
+        self.assertEqual(expected, found, msg.format(expected, found))
+        found = [item[3:6] for item in asyncio.run(
+            self.db.select_journal(year))]
+        expected = [('def', 'xyz', 'load')]
+        self.assertEqual(expected, found, msg.format(expected, found))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_rollback(self):
+        """
+        Test that an invalid row leaves the database unchanged even after
+        earlier chunks were inserted.
+        """
+        year = self.sd.current_year
+        before = self.count_values(year)
+        text = ("year,month,field,value\n"
+                f"{year},1,cash_in_bank,1\n"
+                f"{year},2,cash_in_bank,2\n"
+                f"{year},99,cash_in_bank,3\n")
+        importer = BulkImporter(self.db, chunk_size=1, financial=set())
+
+        with self.assertRaises(ValueError) as cm:
+            asyncio.run(importer.load(io.StringIO(text)))
+
+        self.assertIn('99', str(cm.exception))
+        found = self.count_values(year)
+        msg = f"Expected {before}, found {found}."
+        self.assertEqual(before, found, msg)
+        self.assertEqual(0, importer.rows, msg)
+
+    #@unittest.skip("Temporarily skipped")
+    def test_missing_columns(self):
+        """
+        Test that a file without the year and month columns is rejected.
+        """
+        importer = BulkImporter(self.db, financial=set())
+
+        with self.assertRaises(AssertionError) as cm:
+            asyncio.run(importer.load(io.StringIO("field,value\na,1\n")))
+
+        self.assertIn('year', str(cm.exception))
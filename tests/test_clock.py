@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+#
+# test/test_clock.py
+#
+__docformat__ = "restructuredtext en"
+
+import datetime
+import unittest
+
+from . import check_flag
+from src.clock import TransactionClock
+
+
+class FakeNow:
+    """
+    A callable that returns a new time stamp every time it is called.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self._start = datetime.datetime(2024, 3, 20,
+                                        tzinfo=datetime.timezone.utc)
+
+    def __call__(self, tzinfo):
+        self.count += 1
+        return self._start + datetime.timedelta(seconds=self.count)
+
+
+class TestTransactionClock(unittest.TestCase):
+
+    def __init__(self, name):
+        super().__init__(name)
+
+    def setUp(self):
+        check_flag(self.__class__.__name__)
+        self.fake_now = FakeNow()
+        self.clock = TransactionClock(self.fake_now)
+
+    #@unittest.skip("Temporarily skipped")
+    def test_now_outside_unit_of_work(self):
+        """
+        Test that outside a unit of work every call gets a new time stamp.
+        """
+        now0 = self.clock.now()
+        now1 = self.clock.now()
+        msg = f"Expected different time stamps, found {now0} and {now1}."
+        self.assertNotEqual(now0, now1, msg)
+        msg = f"Expected 2 calls, found {self.fake_now.count}."
+        self.assertEqual(2, self.fake_now.count, msg)
+
+    #@unittest.skip("Temporarily skipped")
+    def test_unit_of_work(self):
+        """
+        Test that inside a unit of work, including nested ones, the same
+        time stamp is always returned.
+        """
+        with self.clock.unit_of_work() as uow_now:
+            now0 = self.clock.isoformat()
+
+            with self.clock.unit_of_work():
+                now1 = self.clock.isoformat()
+
+            now2 = self.clock.isoformat()
+            in_uow = self.clock.in_unit_of_work
+
+        msg = "Expected {}, found {}."
+        self.assertEqual(uow_now.isoformat(), now0,
+                         msg.format(uow_now.isoformat(), now0))
+        self.assertEqual(now0, now1, msg.format(now0, now1))
+        self.assertEqual(now0, now2, msg.format(now0, now2))
+        self.assertTrue(in_uow, msg.format(True, in_uow))
+        self.assertEqual(1, self.fake_now.count,
+                         msg.format(1, self.fake_now.count))
+        in_uow = self.clock.in_unit_of_work
+        self.assertFalse(in_uow, msg.format(False, in_uow))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_freeze_and_unfreeze(self):
+        """
+        Test that a frozen clock always returns the same time stamp.
+        """
+        frozen = datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc)
+        self.clock.freeze(frozen)
+        data = (self.clock.now(), self.clock.now())
+        msg = "Expected {}, found {}."
+
+        for now in data:
+            self.assertEqual(frozen, now, msg.format(frozen, now))
+
+        self.clock.unfreeze()
+        now = self.clock.now()
+        self.assertNotEqual(frozen, now, msg.format("not frozen", now))
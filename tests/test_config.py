@@ -231,6 +231,46 @@ class TestSettings(unittest.TestCase):
         msg = f"Expected '{expected}' found '{fp}'."
         self.assertEqual(expected, fp, msg)
 
+    #@unittest.skip("Temporarily skipped")
+    def test_data_backend(self):
+        """
+        Test that the data backend changes the user data path.
+        """
+        self.addCleanup(setattr, self.set, 'data_backend',
+                        Settings.BACKEND_FILE)
+        msg = "Expected '{}' found '{}'."
+        self.set.data_backend = ':memory:'
+        found = self.set.data_backend
+        expected = Settings.BACKEND_MEMORY
+        self.assertEqual(expected, found, msg.format(expected, found))
+        found = self.set.user_data_fullpath
+        expected = (f"file:{self.set.data_file_name}?mode=memory"
+                    "&cache=shared")
+        self.assertEqual(expected, found, msg.format(expected, found))
+        self.assertTrue(self.set.data_is_uri)
+        self.set.data_backend = Settings.BACKEND_TMPFS
+        found = self.set.user_data_fullpath
+        expected = os.path.join(
+            self.set.tmpfs_dir,
+            f"{self.set.app_name}-{self.set.data_file_name}")
+        self.assertEqual(expected, found, msg.format(expected, found))
+        self.assertFalse(self.set.data_is_uri)
+
+        with self.assertRaises(AssertionError) as cm:
+            self.set.data_backend = 'invalid'
+
+    #@unittest.skip("Temporarily skipped")
+    def test_data_path(self):
+        """
+        Test that the data path replaces the user data file.
+        """
+        self.addCleanup(setattr, self.set, 'data_path', None)
+        self.set.data_path = 'books.sqlite3'
+        found = self.set.user_data_fullpath
+        expected = os.path.abspath('books.sqlite3')
+        msg = f"Expected '{expected}' found '{found}'."
+        self.assertEqual(expected, found, msg)
+
     #@unittest.skip("Temporarily skipped")
     def test_user_config_fullpath(self):
         """
@@ -288,15 +328,13 @@ class TestBaseSystemData(unittest.TestCase):
         self.bsd = BaseSystemData()
 
     def tearDown(self):
-        try:
-            os.remove(self._TMP_USER_CONFIG_FILE)
-        except FileNotFoundError:
-            pass
-
-        try:
-            os.remove(self._TMP_USER_APP_CONFIG_FILE)
-        except FileNotFoundError:
-            pass
+        for path in (self._TMP_USER_CONFIG_FILE,
+                     self._TMP_USER_APP_CONFIG_FILE):
+            for ext in ('', self.bsd._CACHE_EXT):
+                try:
+                    os.remove(f"{path}{ext}")
+                except FileNotFoundError:
+                    pass
 
     def _handle_errors(self, doc, filepath):
         if isinstance(doc, int):
@@ -384,6 +422,62 @@ class TestBaseSystemData(unittest.TestCase):
         self.assertEqual(expected_results, self.bsd.ERR_MESSAGES[error],
                          msg.format(expected_results, err_code, error))
 
+    #@unittest.skip("Temporarily skipped")
+    @patch('src.config.BaseSystemData.user_config_fullpath',
+           _TMP_USER_CONFIG_FILE)
+    def test_validate_file(self):
+        """
+        Test that a file is parsed once and that a second validation with
+        the same content is satisfied by the cache.
+        """
+        shutil.copy2(self.bsd.local_config_fullpath,
+                     self._TMP_USER_CONFIG_FILE)
+        path = self.bsd.user_config_fullpath
+        msg = "Expected {}, found {}."
+
+        with patch.object(BaseSystemData, '_parse_raw',
+                          wraps=self.bsd._parse_raw) as mock_parse:
+            error = self.bsd.validate_file(path)
+            self.assertIsNone(error, msg.format(None, error))
+            self.assertEqual(1, mock_parse.call_count, msg.format(
+                1, mock_parse.call_count))
+            error = self.bsd.validate_file(path)
+            self.assertIsNone(error, msg.format(None, error))
+            self.assertEqual(1, mock_parse.call_count, msg.format(
+                1, mock_parse.call_count))
+            known = self.bsd.is_known_good(path)
+            self.assertTrue(known, msg.format(True, known))
+
+        # Changing the file invalidates the cache entry.
+        with open(path, 'a') as f:
+            f.write("\n[broken\n")
+
+        known = self.bsd.is_known_good(path)
+        self.assertFalse(known, msg.format(False, known))
+        error = self.bsd.validate_file(path)
+        self.assertEqual(self.bsd.ERR_TOML_ERROR, error, msg.format(
+            self.bsd.ERR_TOML_ERROR, error))
+
+    #@unittest.skip("Temporarily skipped")
+    @patch('src.config.BaseSystemData.user_config_fullpath',
+           _TMP_USER_CONFIG_FILE)
+    def test_validate_file_deferred(self):
+        """
+        Test that a cache hit defers the parse until the doc is used.
+        """
+        shutil.copy2(self.bsd.local_config_fullpath,
+                     self._TMP_USER_CONFIG_FILE)
+        path = self.bsd.user_config_fullpath
+        self.bsd.validate_file(path)
+        self.bsd.validate_file(path, 'panel_config')
+        msg = "Expected {}, found {}."
+        found = 'panel_config' in self.bsd._DEFERRED
+        self.assertTrue(found, msg.format(True, found))
+        doc = self.bsd.panel_config
+        found = 'panel_config' in self.bsd._DEFERRED
+        self.assertFalse(found, msg.format(False, found))
+        self.assertIn('meta', doc, msg.format('meta', list(doc)))
+
 
 class BaseTest(unittest.TestCase):
 
@@ -555,15 +649,15 @@ class TestTomlPanelConfig(BaseTest):
         self.tpc = TomlPanelConfig()
 
     def tearDown(self):
-        try:
-            os.remove(self._TMP_USER_CONFIG_FILE)
-        except FileNotFoundError:
-            pass
+        backup_file = f"{self._TMP_USER_CONFIG_FILE}.bak"
 
-        try:
-            os.remove(self._TMP_LOCAL_CONFIG_FILE)
-        except FileNotFoundError:
-            pass
+        for path in (self._TMP_USER_CONFIG_FILE, self._TMP_LOCAL_CONFIG_FILE,
+                     backup_file):
+            for ext in ('', self.tpc._CACHE_EXT):
+                try:
+                    os.remove(f"{path}{ext}")
+                except FileNotFoundError:
+                    pass
 
     #@unittest.skip("Temporarily skipped")
     @patch('src.config.TomlPanelConfig.user_config_fullpath',
@@ -614,12 +708,15 @@ class TestTomlPanelConfig(BaseTest):
         self.assertTrue(ret, msg)
 
     #@unittest.skip("Temporarily skipped")
-    @patch('src.config.TomlPanelConfig.local_config_fullpath',
+    @patch('src.config.TomlPanelConfig.user_config_fullpath',
            _TMP_USER_CONFIG_FILE)
+    @patch('src.config.TomlPanelConfig.local_config_fullpath',
+           _TMP_LOCAL_CONFIG_FILE)
     def test_is_valid_property_local_not_found(self):
         """
         Test that the is_valid property returns a False for a not found
-        file in the `local_config_fullpath` property.
+        file in the `local_config_fullpath` property when there is no
+        user config.
 
         Note: Responds to error code 2.
         """
@@ -627,6 +724,28 @@ class TestTomlPanelConfig(BaseTest):
         msg = f"Expected False, found {ret}."
         self.assertFalse(ret, msg)
 
+    #@unittest.skip("Temporarily skipped")
+    @patch('src.config.TomlPanelConfig.user_config_fullpath',
+           _TMP_USER_CONFIG_FILE)
+    def test_is_valid_property_backup_unparsable(self):
+        """
+        Test that the is_valid property logs an error when both the user
+        config and its backup are unparsable and the local config is used.
+        """
+        for path in (self._TMP_USER_CONFIG_FILE,
+                     f"{self._TMP_USER_CONFIG_FILE}.bak"):
+            with open(path, 'w') as f:
+                f.write("[meta]\nsomevar = {junk='some_value'")
+
+        with self.assertLogs(self.tpc._log, level='ERROR') as cm:
+            ret = self.tpc.is_valid
+
+        msg = f"Expected True, found {ret}."
+        self.assertTrue(ret, msg)
+        found = [line for line in cm.output if 'its backup' in line]
+        msg = f"Expected a backup error in the log, found {cm.output}."
+        self.assertTrue(found, msg)
+
     #@unittest.skip("Temporarily skipped")
     @patch('src.config.TomlPanelConfig._LOCAL_CONFIG', '/tmp')
     @patch('src.config.TomlPanelConfig.user_config_fullpath',
@@ -644,6 +763,94 @@ class TestTomlPanelConfig(BaseTest):
         msg = f"Expected False, found {ret}."
         self.assertFalse(ret, msg)
 
+    #@unittest.skip("Temporarily skipped")
+    @patch('src.config.TomlPanelConfig.user_config_fullpath',
+           _TMP_USER_CONFIG_FILE)
+    def test_is_valid_property_parse_once(self):
+        """
+        Test that the first start parses the user config once and the
+        next start does not parse it at all.
+        """
+        msg = "Expected {}, found {}."
+
+        with patch.object(TomlPanelConfig, '_parse_raw',
+                          wraps=self.tpc._parse_raw) as mock_parse:
+            ret = self.tpc.is_valid
+            self.assertTrue(ret, msg.format(True, ret))
+            self.assertEqual(1, mock_parse.call_count, msg.format(
+                1, mock_parse.call_count))
+            ret = self.tpc.is_valid
+            self.assertTrue(ret, msg.format(True, ret))
+            self.assertEqual(1, mock_parse.call_count, msg.format(
+                1, mock_parse.call_count))
+
+    #@unittest.skip("Temporarily skipped")
+    @patch('src.config.TomlPanelConfig.user_config_fullpath',
+           _TMP_USER_CONFIG_FILE)
+    def test_is_valid_property_restore_backup(self):
+        """
+        Test that a corrupted user config is restored from a known-good
+        backup without parsing the backup again.
+        """
+        ret = self.tpc.is_valid  # Creates the user config and backup.
+        msg = "Expected {}, found {}."
+        self.assertTrue(ret, msg.format(True, ret))
+
+        with open(self._TMP_USER_CONFIG_FILE, 'w') as f:
+            f.write("[meta]\nsomevar = {junk='some_value'")
+
+        with patch.object(TomlPanelConfig, '_parse_raw',
+                          wraps=self.tpc._parse_raw) as mock_parse:
+            ret = self.tpc.is_valid
+            self.assertTrue(ret, msg.format(True, ret))
+            # Only the corrupted file was parsed.
+            self.assertEqual(1, mock_parse.call_count, msg.format(
+                1, mock_parse.call_count))
+
+        known = self.tpc.is_known_good(self._TMP_USER_CONFIG_FILE)
+        self.assertTrue(known, msg.format(True, known))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_no_panel_builder(self):
+        """
+        Test that the panel backend is only an app config setting.
+        """
+        found = hasattr(TomlPanelConfig, 'panel_builder')
+        msg = "Expected {}, found {}."
+        self.assertFalse(found, msg.format(False, found))
+
+    #@unittest.skip("Temporarily skipped")
+    @patch('src.config.TomlPanelConfig.user_config_fullpath',
+           _TMP_USER_CONFIG_FILE)
+    def test_write_file(self):
+        """
+        Test that the panel config is written to the user config and its
+        backup, and that both are cached as known-good.
+        """
+        old = self.tpc.panel_config
+
+        with open(self.tpc.local_config_fullpath, 'r') as f:
+            doc = tk.loads(f.read())
+
+        doc['meta']['title'] = 'Edited'
+        self.tpc.panel_config = doc
+
+        try:
+            self.tpc.write_file()
+        finally:
+            self.tpc.panel_config = old
+
+        msg = "Expected {}, found {}."
+
+        for path in (self._TMP_USER_CONFIG_FILE,
+                     f"{self._TMP_USER_CONFIG_FILE}.bak"):
+            with open(path, 'r') as f:
+                found = tk.loads(f.read())['meta']['title']
+
+            self.assertEqual('Edited', found, msg.format('Edited', found))
+            found = self.tpc.is_known_good(path)
+            self.assertTrue(found, msg.format(True, found))
+
 
 class TestTomlAppConfig(BaseTest):
     _TMP_USER_APP_FILE = '/tmp/user_app_config.toml'
@@ -658,10 +865,11 @@ class TestTomlAppConfig(BaseTest):
         self.tac = TomlAppConfig()
 
     def tearDown(self):
-        try:
-            os.remove(self._TMP_USER_APP_FILE)
-        except FileNotFoundError:
-            pass
+        for ext in ('', self.tac._CACHE_EXT):
+            try:
+                os.remove(f"{self._TMP_USER_APP_FILE}{ext}")
+            except FileNotFoundError:
+                pass
 
     def create_config(self):
         self.tac._create_app_config()
@@ -850,6 +1058,29 @@ class TestTomlAppConfig(BaseTest):
         msg = f"Expected '{new_value}' found '{value}'."
         self.assertEqual(new_value, value, msg)
 
+    #@unittest.skip("Temporarily skipped")
+    @patch('src.config.TomlAppConfig.user_app_config_fullpath',
+           _TMP_USER_APP_FILE)
+    def test_panel_builder(self):
+        """
+        Test that the panel builder backend defaults to 'code' and can be
+        changed in the app config.
+        """
+        self.create_config()
+        data = (
+            (None, TomlAppConfig.PANEL_CODE),
+            (TomlAppConfig.PANEL_DIRECT, TomlAppConfig.PANEL_DIRECT),
+            ('invalid', TomlAppConfig.PANEL_CODE),
+            )
+        msg = "Expected {}, found {}."
+
+        for value, expected in data:
+            if value:
+                self.tac.update_app_config('panel_builder', 'backend', value)
+
+            found = self.tac.panel_builder
+            self.assertEqual(expected, found, msg.format(expected, found))
+
     #@unittest.skip("Temporarily skipped")
     @patch('src.config.TomlAppConfig.user_app_config_fullpath',
            _TMP_UNWRITABE_PATH)
@@ -952,3 +1183,49 @@ class TestTomlCreatePanel(BaseTest):
             names = self.tcp.field_names_by_category.get(cat)
             self.assertEqual(expected_result, len(names), msg.format(
                 expected_result, len(names)))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_add_remove_undo_name(self):
+        """
+        Test that fields can be added, removed, and the removal undone.
+        """
+        items = self.create_toml_doc().get('organization',
+                                           {}).get('widgets', {})
+        self.tcp.current_panel = items
+        names = self.tcp.field_names
+        self.tcp.add_name('New Field:')
+        msg = "Expected {}, found {}."
+        found = self.tcp.field_names[-1]
+        self.assertEqual('New Field:', found, msg.format('New Field:', found))
+        self.tcp.remove_name('Treasurer:')
+        found = 'Treasurer:' in self.tcp.field_names
+        self.assertFalse(found, msg.format(False, found))
+        ret = self.tcp.undo_name('Treasurer:')
+        self.assertTrue(ret, msg.format(True, ret))
+        expected = names + ['New Field:']
+        found = self.tcp.field_names
+        self.assertEqual(expected, found, msg.format(expected, found))
+        size = len(self.tcp.current_panel)
+        self.assertEqual(len(items) + 2, size, msg.format(
+            len(items) + 2, size))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_source_panel_unchanged(self):
+        """
+        Test that renaming, moving and committing do not change the panel
+        the index was made from.
+        """
+        items = self.create_toml_doc().get('organization',
+                                           {}).get('widgets', {})
+        before = tk.dumps(items)
+        self.tcp.current_panel = items
+        self.tcp.rename_name('Treasurer:', 'Bookkeeper:')
+        self.tcp.add_name('New Field:', before='Locale Name:')
+        self.tcp.move_name('Total Membership:', before='New Field:')
+        panel = self.tcp.current_panel
+        found = tk.dumps(items)
+        msg = "Expected {}, found {}."
+        self.assertEqual(before, found, msg.format(before, found))
+        found = self.tcp.field_names
+        self.assertIn('Bookkeeper:', found, msg.format('Bookkeeper:', found))
+        self.assertNotEqual(before, tk.dumps(panel))
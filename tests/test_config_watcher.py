@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+#
+# test/test_config_watcher.py
+#
+__docformat__ = "restructuredtext en"
+
+import os
+import time
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import tomlkit as tk
+
+from . import check_flag
+from src.config import BaseSystemData
+from src.config_watcher import ConfigWatcher
+
+
+PANEL_DOC = """\
+[meta]
+title = "Test"
+
+[organization]
+widgets = {widget_00 = "a"}
+
+[budget]
+widgets = {widget_00 = "b"}
+"""
+
+APP_DOC = """\
+[app_size]
+default = [570, 830]
+size = [570, 830]
+"""
+
+
+class TestConfigWatcher(unittest.TestCase):
+
+    def __init__(self, name):
+        super().__init__(name)
+
+    def setUp(self):
+        check_flag(self.__class__.__name__)
+        self.tmp_dir = tempfile.mkdtemp()
+        self.panel_path = os.path.join(self.tmp_dir, 'panel.toml')
+        self.app_path = os.path.join(self.tmp_dir, 'app.toml')
+        self.sys_files = dict(BaseSystemData.SYS_FILES)
+        self.deferred = dict(BaseSystemData._DEFERRED)
+        BaseSystemData._DEFERRED.clear()
+
+        for path, data, key in ((self.panel_path, PANEL_DOC, 'panel_config'),
+                                (self.app_path, APP_DOC, 'app_config')):
+            with open(path, 'w') as f:
+                f.write(data)
+
+            BaseSystemData.SYS_FILES[key] = tk.parse(data)
+
+        for name, path in (('user_config_fullpath', self.panel_path),
+                           ('user_app_config_fullpath', self.app_path)):
+            patcher = patch(f'src.config.Settings.{name}', path)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.watcher = ConfigWatcher(interval=0.05)
+        self.changes = []
+
+    def tearDown(self):
+        self.watcher.stop()
+        self.watcher._subscribers.clear()
+        self.watcher._state.clear()
+        self.watcher._snapshots.clear()
+        ConfigWatcher._interval = ConfigWatcher.DEFAULT_INTERVAL
+        BaseSystemData.SYS_FILES.update(self.sys_files)
+        BaseSystemData._DEFERRED.clear()
+        BaseSystemData._DEFERRED.update(self.deferred)
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def edit(self, path, old, new):
+        with open(path, 'r') as f:
+            data = f.read()
+
+        with open(path, 'w') as f:
+            f.write(data.replace(old, new))
+
+        # Make sure the mtime changes on file systems with coarse times.
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1000000))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_no_change(self):
+        """
+        Test that nothing is reported when the files did not change.
+        """
+        self.watcher.subscribe(self.changes.append)
+        self.watcher.start()
+        self.watcher.stop()
+        found = self.watcher.check()
+        msg = f"Expected no changes, found {found}."
+        self.assertEqual([], found, msg)
+        self.assertEqual([], self.changes, msg)
+
+    #@unittest.skip("Temporarily skipped")
+    def test_check(self):
+        """
+        Test that only the changed panel and app key are reported with the
+        new doc, and that the doc in memory is only replaced by `apply`.
+        """
+        self.watcher.subscribe(self.changes.append)
+        self.watcher.start()
+        self.watcher.stop()
+        self.edit(self.panel_path, '"b"', '"c"')
+        self.edit(self.app_path, 'size = [570, 830]', 'size = [600, 900]')
+        changes = self.watcher.check()
+        expected = [('panel_config', 'budget', 'widgets'),
+                    ('app_config', 'app_size', 'size')]
+        msg = "Expected {}, found {}."
+        found = [change[:3] for change in changes]
+        self.assertEqual(expected, found, msg.format(expected, found))
+        found = [change[:3] for change in self.changes]
+        self.assertEqual(expected, found, msg.format(expected, found))
+        found = self.watcher.panel_config['budget']['widgets']['widget_00']
+        self.assertEqual('b', found, msg.format('b', found))
+        found = changes[0].doc['budget']['widgets']['widget_00']
+        self.assertEqual('c', found, msg.format('c', found))
+        self.watcher.apply('panel_config', changes[0].doc)
+        found = self.watcher.panel_config['budget']['widgets']['widget_00']
+        self.assertEqual('c', found, msg.format('c', found))
+        found = self.watcher.check()
+        self.assertEqual([], found, msg.format([], found))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_apply_keep(self):
+        """
+        Test that a kept section is not replaced by the new doc.
+        """
+        self.watcher.start()
+        self.watcher.stop()
+        self.edit(self.panel_path, '"a"', '"d"')
+        self.edit(self.panel_path, '"b"', '"c"')
+        changes = self.watcher.check()
+        self.watcher.apply('panel_config', changes[-1].doc,
+                           keep=('organization',))
+        msg = "Expected {}, found {}."
+        found = self.watcher.panel_config['organization']['widgets'][
+            'widget_00']
+        self.assertEqual('a', found, msg.format('a', found))
+        found = self.watcher.panel_config['budget']['widgets']['widget_00']
+        self.assertEqual('c', found, msg.format('c', found))
+
+        with self.assertRaises(AssertionError) as cm:
+            self.watcher.apply('invalid', changes[-1].doc)
+
+    #@unittest.skip("Temporarily skipped")
+    def test_filtered_subscribers(self):
+        """
+        Test that subscribers only get the changes they asked for.
+        """
+        app_changes = []
+        self.watcher.subscribe(self.changes.append, section='organization')
+        self.watcher.subscribe(app_changes.append, file='app_config')
+        self.watcher.start()
+        self.watcher.stop()
+        self.edit(self.panel_path, '"b"', '"c"')
+        self.watcher.check()
+        msg = "Expected {}, found {}."
+        self.assertEqual([], self.changes, msg.format([], self.changes))
+        self.assertEqual([], app_changes, msg.format([], app_changes))
+        self.edit(self.panel_path, '"a"', '"d"')
+        self.watcher.check()
+        found = len(self.changes)
+        self.assertEqual(1, found, msg.format(1, found))
+
+        with self.assertRaises(AssertionError) as cm:
+            self.watcher.subscribe(self.changes.append, file='invalid')
+
+    #@unittest.skip("Temporarily skipped")
+    def test_own_write_and_invalid_edit(self):
+        """
+        Test that a write that matches the doc in memory and an edit that
+        does not parse are both ignored.
+        """
+        self.watcher.subscribe(self.changes.append)
+        self.watcher.start()
+        self.watcher.stop()
+        self.edit(self.app_path, APP_DOC, APP_DOC + "\n")
+        found = self.watcher.check()
+        msg = f"Expected no changes, found {found}."
+        self.assertEqual([], found, msg)
+        self.edit(self.panel_path, '[budget]', '[budget')
+        found = self.watcher.check()
+        self.assertEqual([], found, msg)
+
+    #@unittest.skip("Temporarily skipped")
+    def test_app_write(self):
+        """
+        Test that a write by the app after it changed the doc in memory is
+        not reported and that later edits are compared to it.
+        """
+        self.watcher.subscribe(self.changes.append)
+        self.watcher.start()
+        self.watcher.stop()
+        doc = self.watcher.app_config
+        doc['app_size']['size'] = [600, 900]
+        data = tk.dumps(doc)
+
+        with open(self.app_path, 'w') as f:
+            f.write(data)
+
+        self.watcher._write_cache(self.app_path, self.watcher._digest(data),
+                                  None)
+        st = os.stat(self.app_path)
+        os.utime(self.app_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1000000))
+        found = self.watcher.check()
+        msg = "Expected {}, found {}."
+        self.assertEqual([], found, msg.format([], found))
+        self.edit(self.app_path, 'default = [570, 830]',
+                  'default = [500, 800]')
+        found = [change[:3] for change in self.watcher.check()]
+        expected = [('app_config', 'app_size', 'default')]
+        self.assertEqual(expected, found, msg.format(expected, found))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_deferred_doc_not_parsed(self):
+        """
+        Test that a check does not parse a deferred doc in memory, only
+        the main thread may do that.
+        """
+        self.watcher.start()
+        self.watcher.stop()
+        BaseSystemData._DEFERRED['panel_config'] = (self.panel_path,
+                                                    PANEL_DOC)
+        self.edit(self.panel_path, '"b"', '"c"')
+        found = [change[:3] for change in self.watcher.check()]
+        expected = [('panel_config', 'budget', 'widgets')]
+        msg = "Expected {}, found {}."
+        self.assertEqual(expected, found, msg.format(expected, found))
+        found = 'panel_config' in BaseSystemData._DEFERRED
+        self.assertTrue(found, msg.format(True, found))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_thread(self):
+        """
+        Test that the background thread finds a change.
+        """
+        self.watcher.subscribe(self.changes.append)
+        self.watcher.start()
+        msg = "Expected {}, found {}."
+        found = self.watcher.running
+        self.assertTrue(found, msg.format(True, found))
+        self.edit(self.panel_path, '"a"', '"d"')
+        end = time.time() + 5
+
+        while not self.changes and time.time() < end:
+            time.sleep(0.05)
+
+        self.watcher.stop()
+        found = [change[:3] for change in self.changes]
+        expected = [('panel_config', 'organization', 'widgets')]
+        self.assertEqual(expected, found, msg.format(expected, found))
+        found = self.watcher.running
+        self.assertFalse(found, msg.format(False, found))
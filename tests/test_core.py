@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+#
+# test/test_core.py
+#
+__docformat__ = "restructuredtext en"
+
+import sys
+import asyncio
+import subprocess
+import unittest
+
+from . import check_flag
+from .base_dir import BASE_DIR
+from src.config import Settings
+from src.core.bahai_database import Database
+from scripts.synthetic_data import SyntheticData
+
+
+class TestHeadlessCore(unittest.TestCase):
+
+    def __init__(self, name):
+        super().__init__(name)
+
+    def setUp(self):
+        check_flag(self.__class__.__name__)
+        self.db = Database()
+        self.db.data_backend = Settings.BACKEND_MEMORY
+        self.db.data_name = 'test-core'
+
+    def tearDown(self):
+        self.db.close_memory_db()
+        self.db.data_backend = Settings.BACKEND_FILE
+        self.db.data_name = None
+
+    #@unittest.skip("Temporarily skipped")
+    def test_no_wx_import(self):
+        """
+        Test that the core can be imported without importing wx.
+        """
+        code = ("import sys, src.core.bahai_database; "
+                "print(sorted(m for m in sys.modules "
+                "if m.split('.')[0] == 'wx'))")
+        proc = subprocess.run([sys.executable, '-c', code], cwd=BASE_DIR,
+                              capture_output=True, text=True)
+        self.assertEqual(0, proc.returncode, proc.stderr[-1000:])
+        found = proc.stdout.strip()
+        msg = f"Expected no wx modules, found {found}."
+        self.assertEqual('[]', found, msg)
+
+    #@unittest.skip("Temporarily skipped")
+    def test_save_data(self):
+        """
+        Test that data can be saved and read back without any panels.
+        """
+        sd = SyntheticData(1)
+        sd.build(self.db)
+        name = sd.field_names[0]
+        error = asyncio.run(self.db.save_data(sd.PANEL, {name: '1234'}))
+        msg = "Expected {}, found {}."
+        self.assertIsNone(error, msg.format(None, error))
+        found = asyncio.run(self.db.panel_data(
+            sd.PANEL, {name: None}, sd.current_year))[name]
+        self.assertEqual('1234', found, msg.format('1234', found))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_value_to_db(self):
+        """
+        Test that the value conversion does not need wx.
+        """
+        data = (('12.34', True, '1234'), (' abc ', False, 'abc'),
+                (5, False, '5'))
+        msg = "Expected {}, found {}."
+
+        for value, financial, expected in data:
+            found = self.db._value_to_db(value, financial=financial)
+            self.assertEqual(expected, found, msg.format(expected, found))
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+#
+# test/test_digest.py
+#
+__docformat__ = "restructuredtext en"
+
+import os
+import gzip
+import shutil
+import asyncio
+import sqlite3
+import tempfile
+import unittest
+
+from . import check_flag
+from src.core.bahai_database import Database
+from src.core.digest import DigestTree
+from scripts.synthetic_data import SyntheticData
+
+
+class TestDigestTree(unittest.TestCase):
+
+    def __init__(self, name):
+        super().__init__(name)
+
+    def setUp(self):
+        check_flag(self.__class__.__name__)
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db = Database()
+        self.db.data_path = os.path.join(self.tmp_dir, 'books.sqlite3')
+        self.copy = os.path.join(self.tmp_dir, 'copy.sqlite3')
+        self.sd = SyntheticData(2)
+        self.sd.build(self.db)
+        shutil.copyfile(self.db.user_data_fullpath, self.copy)
+        self.tree = DigestTree(self.db)
+
+    def tearDown(self):
+        self.db.data_path = None
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def edit(self, path, year, month, field, value):
+        with sqlite3.connect(path) as con:
+            con.execute(
+                f"UPDATE {self.db._T_DATA} SET value = ? WHERE pk = (SELECT "
+                f"d.pk FROM {self.db._T_DATA} AS d JOIN "
+                f"{self.db._T_FISCAL_YEAR} AS y ON y.pk = d.fy1fk JOIN "
+                f"{self.db._T_MONTH} AS m ON m.pk = d.mfk JOIN "
+                f"{self.db._T_FIELD_TYPE} AS f ON f.pk = d.ffk WHERE "
+                "y.year = ? AND m.ord = ? AND f.field = ?);",
+                (value, year, month, field))
+
+    def stale(self):
+        with sqlite3.connect(self.db.user_data_fullpath) as con:
+            return con.execute(f"SELECT year, month FROM {self.db._T_DIGEST} "
+                               "WHERE hash IS NULL;").fetchall()
+
+    #@unittest.skip("Temporarily skipped")
+    def test_incremental(self):
+        """
+        Test that a write through the database hashes only its month again
+        before it commits.
+        """
+        before = asyncio.run(self.tree.months())
+        year = self.sd.current_year
+        rows = asyncio.run(self.db.select_all_config_data(year))
+        y1, month, name, field, value = rows[0]
+        pk = asyncio.run(self.db.select_from_config_data_table(
+            {field: None}, year))[0][0]
+        asyncio.run(self.db.update_config_data_table(
+            year, month, [(pk, f"{value}1")]))
+        found = self.stale()
+        msg = "Expected {}, found {}."
+        self.assertEqual([], found, msg.format([], found))
+        after = asyncio.run(self.tree.months())
+        found = [key for key in before if before[key] != after[key]]
+        self.assertEqual([(year, month)], found,
+                         msg.format([(year, month)], found))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_roll_up(self):
+        """
+        Test that a changed value changes its year and the database digest
+        but not the other years.
+        """
+        years = asyncio.run(self.tree.years())
+        root = asyncio.run(self.tree.root())
+        year = self.sd.first_year
+        self.edit(self.db.user_data_fullpath, year, 1,
+                  self.sd.field_names[0], 'abc')
+        found = asyncio.run(self.tree.years())
+        msg = "Expected {}, found {}."
+        self.assertNotEqual(years[year], found[year],
+                            msg.format('a new digest', found[year]))
+        expected = {key: value for key, value in years.items() if key != year}
+        found.pop(year)
+        self.assertEqual(expected, found, msg.format(expected, found))
+        found = asyncio.run(self.tree.root())
+        self.assertNotEqual(root, found, msg.format('a new digest', found))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_compare(self):
+        """
+        Test that only the changed values are found when comparing copies.
+        """
+        msg = "Expected {}, found {}."
+        found = asyncio.run(self.tree.compare(self.copy))
+        self.assertEqual([], found, msg.format([], found))
+        field = self.sd.field_names[0]
+        expected = [(self.sd.first_year, 3, field),
+                    (self.sd.current_year, 7, field)]
+
+        for year, month, field in expected:
+            self.edit(self.copy, year, month, field, 'abc')
+
+        found = asyncio.run(self.tree.compare(self.copy))
+        self.assertEqual(expected, found, msg.format(expected, found))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_compare_snapshot(self):
+        """
+        Test comparing with a compressed snapshot made before there were
+        digests.
+        """
+        with sqlite3.connect(self.copy) as con:
+            con.execute(f"DROP TABLE {self.db._T_DIGEST};")
+
+        path = f"{self.copy}.gz"
+
+        with open(self.copy, 'rb') as src, gzip.open(path, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+
+        found = asyncio.run(self.tree.compare(path))
+        msg = "Expected {}, found {}."
+        self.assertEqual([], found, msg.format([], found))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_archive(self):
+        """
+        Test that archiving a year does not change the digests.
+        """
+        root = asyncio.run(self.tree.root())
+        year = self.sd.first_year
+        # year, month, day, current, work_on, audit
+        asyncio.run(self.db.update_fiscal_year_table([(year, 1, 1, 0, 0, 1)]))
+        asyncio.run(self.db.archive_year(year))
+        found = asyncio.run(self.tree.root())
+        msg = "Expected {}, found {}."
+        self.assertEqual(root, found, msg.format(root, found))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_archived_fields(self):
+        """
+        Test that the leaves of an archived month are read from its
+        archive, so a compare only finds the field that differs.
+        """
+        year = self.sd.first_year
+        field = self.sd.field_names[0]
+        expected = asyncio.run(self.tree.fields(year, 1))
+        # year, month, day, current, work_on, audit
+        asyncio.run(self.db.update_fiscal_year_table([(year, 1, 1, 0, 0, 1)]))
+        asyncio.run(self.db.archive_year(year))
+        found = asyncio.run(self.tree.fields(year, 1))
+        msg = "Expected {}, found {}."
+        self.assertEqual(expected, found, msg.format(expected, found))
+        self.edit(self.copy, year, 1, field, '999')
+        expected = [(year, 1, field)]
+        found = asyncio.run(self.tree.compare(self.copy))
+        self.assertEqual(expected, found, msg.format(expected, found))
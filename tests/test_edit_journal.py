@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+#
+# test/test_edit_journal.py
+#
+__docformat__ = "restructuredtext en"
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import tomlkit as tk
+
+from . import check_flag
+from .base_dir import BASE_DIR
+from src.config import TomlCreatePanel
+from src.edit_journal import EditJournal
+
+
+class TestEditJournal(unittest.TestCase):
+
+    def __init__(self, name):
+        super().__init__(name)
+
+    def setUp(self):
+        check_flag(self.__class__.__name__)
+        self.tmp_dir = tempfile.mkdtemp()
+        self.tcp = TomlCreatePanel()
+        self.load_panel()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def load_panel(self):
+        full_path = os.path.join(BASE_DIR, 'tests', 'test_panel.toml')
+
+        with open(full_path, mode='r') as f:
+            doc = tk.loads(f.read())
+
+        self.tcp.current_panel = doc['organization']['widgets']
+
+    #@unittest.skip("Temporarily skipped")
+    def test_undo_redo(self):
+        """
+        Test that each kind of edit can be undone and redone.
+        """
+        journal = EditJournal(self.tcp)
+        journal.start('organization')
+        original = self.tcp.panel_index.names
+        journal.add('New Field:')
+        journal.remove('Treasurer:')
+        journal.rename('Locale Name:', 'Locality Name:')
+        journal.move('New Field:', before='Total Membership:')
+        edited = self.tcp.panel_index.names
+        msg = "Expected {}, found {}."
+
+        for count in range(4):
+            self.assertTrue(journal.undo(), msg.format(True, False))
+
+        found = self.tcp.panel_index.names
+        self.assertEqual(original, found, msg.format(original, found))
+        self.assertIsNone(journal.undo(), msg.format(None, 'an op'))
+
+        while journal.can_redo:
+            journal.redo()
+
+        found = self.tcp.panel_index.names
+        self.assertEqual(edited, found, msg.format(edited, found))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_bounded(self):
+        """
+        Test that only max_size edits are kept.
+        """
+        journal = EditJournal(self.tcp, max_size=2)
+        journal.start('organization')
+
+        for idx in range(3):
+            journal.add(f"Field {idx}:")
+
+        journal.undo()
+        journal.undo()
+        msg = "Expected {}, found {}."
+        found = journal.can_undo
+        self.assertFalse(found, msg.format(False, found))
+        found = self.tcp.panel_index.has_name('Field 0:')
+        self.assertTrue(found, msg.format(True, found))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_persist_and_replay(self):
+        """
+        Test that a persisted journal is replayed onto a fresh panel.
+        """
+        journal = EditJournal(self.tcp, journal_dir=self.tmp_dir)
+        journal.start('organization')
+        journal.add('New Field:')
+        journal.remove('Treasurer:')
+        journal.add('Undone Field:')
+        journal.undo()
+        edited = self.tcp.panel_index.names
+        # Simulate a restart.
+        self.load_panel()
+        journal = EditJournal(self.tcp, journal_dir=self.tmp_dir)
+        journal.start('organization')
+        msg = "Expected {}, found {}."
+        found = self.tcp.panel_index.names
+        self.assertEqual(edited, found, msg.format(edited, found))
+        journal.redo()
+        found = self.tcp.panel_index.has_name('Undone Field:')
+        self.assertTrue(found, msg.format(True, found))
+        journal.undo()
+        journal.undo()
+        found = self.tcp.panel_index.has_name('Treasurer:')
+        self.assertTrue(found, msg.format(True, found))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_other_panel_ignored(self):
+        """
+        Test that a journal for another panel is not replayed.
+        """
+        journal = EditJournal(self.tcp, journal_dir=self.tmp_dir)
+        journal.start('organization')
+        journal.add('New Field:')
+        self.load_panel()
+        journal = EditJournal(self.tcp, journal_dir=self.tmp_dir)
+        journal.start('budget')
+        msg = "Expected {}, found {}."
+        found = journal.can_undo
+        self.assertFalse(found, msg.format(False, found))
+        found = journal.panel_name
+        self.assertEqual('budget', found, msg.format('budget', found))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_journal_per_panel(self):
+        """
+        Test that each panel is persisted to its own file, so editing
+        another panel keeps the first one's journal.
+        """
+        journal = EditJournal(self.tcp, journal_dir=self.tmp_dir)
+        journal.start('organization')
+        journal.add('New Field:')
+        edited = self.tcp.panel_index.names
+        msg = "Expected {}, found {}."
+        found = journal.path
+        expected = os.path.join(self.tmp_dir, 'organization.json')
+        self.assertEqual(expected, found, msg.format(expected, found))
+        journal.start('budget')
+        journal.clear()
+        self.load_panel()
+        journal = EditJournal(self.tcp, journal_dir=self.tmp_dir)
+        journal.start('organization')
+        found = self.tcp.panel_index.names
+        self.assertEqual(edited, found, msg.format(edited, found))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_clear_after_save(self):
+        """
+        Test that a cleared journal is not replayed.
+        """
+        journal = EditJournal(self.tcp, journal_dir=self.tmp_dir)
+        journal.start('organization')
+        original = self.tcp.panel_index.names
+        journal.add('New Field:')
+        journal.clear()
+        self.load_panel()
+        journal = EditJournal(self.tcp, journal_dir=self.tmp_dir)
+        journal.start('organization')
+        msg = "Expected {}, found {}."
+        found = self.tcp.panel_index.names
+        self.assertEqual(original, found, msg.format(original, found))
+        found = journal.can_undo
+        self.assertFalse(found, msg.format(False, found))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_select_panel_twice(self):
+        """
+        Test that starting the same panel again after an edit keeps the
+        edits and does not replay the journal a second time.
+        """
+        full_path = os.path.join(BASE_DIR, 'tests', 'test_panel.toml')
+
+        with open(full_path, mode='r') as f:
+            widgets = tk.loads(f.read())['organization']['widgets']
+
+        journal = EditJournal(self.tcp, journal_dir=self.tmp_dir)
+        journal.start('organization', widgets)
+        journal.add('New Field:')
+        journal.rename('Locale Name:', 'Locality Name:')
+        edited = self.tcp.panel_index.names
+        msg = "Expected {}, found {}."
+
+        for count in range(2):
+            journal.start('organization', widgets)
+            found = self.tcp.panel_index.names
+            self.assertEqual(edited, found, msg.format(edited, found))
+            found = found.count('New Field:')
+            self.assertEqual(1, found, msg.format(1, found))
+
+        journal.start('budget', widgets)
+        journal.start('organization', widgets)
+        found = self.tcp.panel_index.names
+        self.assertEqual(edited, found, msg.format(edited, found))
+        self.assertTrue(journal.undo(), msg.format(True, False))
+        self.assertTrue(journal.undo(), msg.format(True, False))
+        found = journal.can_undo
+        self.assertFalse(found, msg.format(False, found))
+        found = self.tcp.panel_index.has_name('Locale Name:')
+        self.assertTrue(found, msg.format(True, found))
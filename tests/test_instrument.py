@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+#
+# test/test_instrument.py
+#
+__docformat__ = "restructuredtext en"
+
+import os
+import json
+import shutil
+import asyncio
+import tempfile
+import unittest
+
+from . import check_flag
+from src.instrument import Instrumentation, timed
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def __init__(self, name):
+        super().__init__(name)
+
+    def setUp(self):
+        check_flag(self.__class__.__name__)
+        self.tmp_dir = tempfile.mkdtemp()
+        self.inst = Instrumentation()
+        self.inst.reset()
+
+    def tearDown(self):
+        self.inst.enable(False)
+        self.inst.reset()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    #@unittest.skip("Temporarily skipped")
+    def test_disabled(self):
+        """
+        Test that nothing is recorded when not enabled.
+        """
+        with self.inst.measure('nothing') as result:
+            result['rows'] = 3
+
+        msg = "Expected {}, found {}."
+        self.assertEqual({}, self.inst.stats, msg.format(
+            {}, self.inst.stats))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_measure(self):
+        """
+        Test that calls, rows, and the normalized query are recorded.
+        """
+        self.inst.enable()
+        queries = ("SELECT * FROM data WHERE year = 181",
+                   "SELECT *  FROM data WHERE year = 182")
+
+        for query in queries:
+            with self.inst.measure('_do_select_query', query) as result:
+                result['rows'] = 2
+
+        stats = self.inst.stats
+        key = "_do_select_query: SELECT * FROM data WHERE year = ?"
+        msg = "Expected {}, found {}."
+        self.assertEqual(2, len(stats), msg.format(2, stats))
+        self.assertIn(key, stats, msg.format(key, stats))
+        found = stats[key]['calls']
+        self.assertEqual(2, found, msg.format(2, found))
+        found = stats['_do_select_query']['rows']
+        self.assertEqual(4, found, msg.format(4, found))
+        found = sum(stats[key]['histogram'].values())
+        self.assertEqual(2, found, msg.format(2, found))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_timed(self):
+        """
+        Test that the decorator works with normal and async functions.
+        """
+        @timed()
+        def sync_func():
+            return [1, 2, 3]
+
+        @timed('async_name')
+        async def async_func():
+            return None
+
+        self.inst.enable()
+        value = sync_func()
+        asyncio.run(async_func())
+        stats = self.inst.stats
+        msg = "Expected {}, found {}."
+        self.assertEqual([1, 2, 3], value, msg.format([1, 2, 3], value))
+        found = stats['sync_func']['rows']
+        self.assertEqual(3, found, msg.format(3, found))
+        found = stats['async_name']['calls']
+        self.assertEqual(1, found, msg.format(1, found))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_report_and_export(self):
+        """
+        Test that the text report and the JSON export have the data.
+        """
+        self.inst.enable()
+
+        with self.inst.measure('save_to_database'):
+            pass
+
+        report = self.inst.report()
+        path = os.path.join(self.tmp_dir, 'stats.json')
+        self.inst.export(path)
+
+        with open(path, 'r') as f:
+            data = json.load(f)
+
+        msg = "Expected {}, found {}."
+        self.assertIn('save_to_database', report, msg.format(
+            'save_to_database', report))
+        self.assertIn('save_to_database', data['stats'], msg.format(
+            'save_to_database', data))
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+#
+# test/test_lazy_import.py
+#
+__docformat__ = "restructuredtext en"
+
+import sys
+import json
+import subprocess
+import unittest
+
+from . import check_flag
+from .base_dir import BASE_DIR
+from src.lazy_import import LazyModule, lazy_import, call_once
+
+
+class TestLazyImport(unittest.TestCase):
+
+    def __init__(self, name):
+        super().__init__(name)
+
+    def setUp(self):
+        check_flag(self.__class__.__name__)
+
+    #@unittest.skip("Temporarily skipped")
+    def test_lazy_import(self):
+        """
+        Test that the module is only imported when an attribute is used.
+        """
+        module = lazy_import('json')
+        msg = "Expected {}, found {}."
+        self.assertIsInstance(module, LazyModule, msg.format(
+            LazyModule, type(module)))
+        self.assertFalse(module.is_loaded, msg.format(False, True))
+        value = module.dumps([1])
+        self.assertEqual('[1]', value, msg.format('[1]', value))
+        self.assertTrue(module.is_loaded, msg.format(True, False))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_call_once(self):
+        """
+        Test that the wrapped function is only run one time.
+        """
+        calls = []
+
+        @call_once
+        def setup():
+            calls.append(1)
+            return len(calls)
+
+        msg = "Expected {}, found {}."
+        self.assertFalse(setup.has_run(), msg.format(False, True))
+        values = (setup(), setup())
+
+        for value in values:
+            self.assertEqual(1, value, msg.format(1, value))
+
+        self.assertEqual(1, len(calls), msg.format(1, len(calls)))
+        self.assertTrue(setup.has_run(), msg.format(True, False))
+
+
+class TestStartupImports(unittest.TestCase):
+    """
+    Regression tests for the modules imported with the database modules
+    which are loaded on every launch of the application.
+    """
+    # Modules that should never be imported at startup.
+    _DEFERRED = ('geopy', 'timezonefinder')
+    _MODULE = 'src.bahai_database'
+    _CORE_MODULE = 'src.core.bahai_database'
+    # The only packages, other than the standard library, that the wx-free
+    # database may import. Anything badidatetime imports itself is allowed.
+    _ALLOWED = ('src', 'aiosqlite', 'appdirs', 'badidatetime', 'tomlkit')
+
+    def __init__(self, name):
+        super().__init__(name)
+
+    def setUp(self):
+        check_flag(self.__class__.__name__)
+
+    def imported_packages(self, module):
+        """
+        Import the module in a new interpreter and get what is in
+        `sys.modules` afterwards.
+
+        :param str module: The module to import.
+        :returns: The top level package names.
+        :rtype: set
+        """
+        code = (f"import sys, json, {module}; "
+                "print(json.dumps(sorted(sys.modules)))")
+        proc = subprocess.run([sys.executable, '-c', code], cwd=BASE_DIR,
+                              capture_output=True, text=True)
+        self.assertEqual(0, proc.returncode, proc.stderr[-1000:])
+        names = json.loads(proc.stdout.splitlines()[-1])
+        return {name.split('.')[0] for name in names}
+
+    #@unittest.skip("Temporarily skipped")
+    def test_deferred_modules_not_imported(self):
+        """
+        Test that the geocoding packages are not imported at startup. A
+        package that badidatetime itself imports eagerly is not checked.
+        """
+        eager = self.imported_packages('badidatetime') & set(self._DEFERRED)
+        deferred = set(self._DEFERRED) - eager
+
+        if not deferred:
+            self.skipTest(f"badidatetime imports {sorted(eager)} itself.")
+
+        found = sorted(self.imported_packages(self._MODULE) & deferred)
+        msg = f"Expected no deferred modules at startup, found {found}."
+        self.assertEqual([], found, msg)
+
+    #@unittest.skip("Temporarily skipped")
+    def test_import_budget(self):
+        """
+        Test that the wx-free database only imports the allowed packages
+        and the standard library, so a new eager import is caught.
+        """
+        allowed = set(self._ALLOWED) | self.imported_packages('badidatetime')
+        found = sorted(
+            name for name in self.imported_packages(self._CORE_MODULE)
+            if name not in sys.stdlib_module_names
+            and not name.startswith('_') and name not in allowed)
+        msg = f"Expected only the allowed packages, also found {found}."
+        self.assertEqual([], found, msg)
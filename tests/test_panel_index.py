@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+#
+# test/test_panel_index.py
+#
+__docformat__ = "restructuredtext en"
+
+import os
+import unittest
+
+import tomlkit as tk
+
+from . import check_flag
+from .base_dir import BASE_DIR
+from src.bases import find_dict
+from src.panel_index import PanelIndex
+
+
+class TestPanelIndex(unittest.TestCase):
+
+    def __init__(self, name):
+        super().__init__(name)
+
+    def setUp(self):
+        check_flag(self.__class__.__name__)
+        full_path = os.path.join(BASE_DIR, 'tests', 'test_panel.toml')
+
+        with open(full_path, mode='r') as f:
+            doc = tk.loads(f.read())
+
+        self.widgets = doc['organization']['widgets']
+        self.index = PanelIndex(self.widgets.copy())
+
+    def field(self, name):
+        return [tk.item(['StaticText', 'w_fg_color_1',
+                         {'args': ['self', 'ID_ANY', name],
+                          'pos': [0, 0]}]),
+                tk.item(['TextCtrl', 'w_bg_color_1', 'w_fg_color_1',
+                         {'args': ['self', 'ID_ANY', ''], 'pos': [0, 1]}])]
+
+    def rows(self, table):
+        return {find_dict(value)['args'][2]: find_dict(value)['pos'][0]
+                for value in table.values()
+                if value[0] == 'StaticText'}
+
+    #@unittest.skip("Temporarily skipped")
+    def test_commit_unchanged(self):
+        """
+        Test that committing an unchanged index returns the same table.
+        """
+        table = self.index.commit()
+        msg = "Expected {}, found {}."
+        self.assertEqual(self.widgets, table, msg.format(
+            self.widgets, table))
+        self.assertFalse(self.index.dirty, msg.format(False, True))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_remove_and_restore(self):
+        """
+        Test that a removed row group is restored to where it was.
+        """
+        names = self.index.names
+        size = len(self.index)
+        record = self.index.remove('Total Membership:')
+        msg = "Expected {}, found {}."
+        self.assertEqual(size - 2, len(self.index), msg.format(
+            size - 2, len(self.index)))
+        self.assertFalse(self.index.has_name('Total Membership:'),
+                         msg.format(False, True))
+        table = self.index.commit()
+        rows = self.rows(table)
+        # The rows after the removed row move up.
+        self.assertEqual(2, rows['Treasurer:'], msg.format(
+            2, rows['Treasurer:']))
+        self.assertEqual('widget_04', list(table)[4], msg.format(
+            'widget_04', list(table)[4]))
+        self.index.restore(record)
+        self.assertEqual(names, self.index.names, msg.format(
+            names, self.index.names))
+        rows = self.rows(self.index.commit())
+        self.assertEqual(3, rows['Treasurer:'], msg.format(
+            3, rows['Treasurer:']))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_insert_and_move(self):
+        """
+        Test that new fields are added after the last row and that rows can
+        be moved.
+        """
+        self.index.insert(self.field('New Field:'))
+        msg = "Expected {}, found {}."
+        name = self.index.names[-1]
+        self.assertEqual('New Field:', name, msg.format('New Field:', name))
+        self.index.move('New Field:', before='Locale Name:')
+        rows = self.rows(self.index.commit())
+        self.assertEqual(1, rows['New Field:'], msg.format(
+            1, rows['New Field:']))
+        self.assertEqual(2, rows['Locale Name:'], msg.format(
+            2, rows['Locale Name:']))
+        name = self.index.names[-1]
+        self.assertEqual('Location (City name):', name, msg.format(
+            'Location (City name):', name))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_insert_respace(self):
+        """
+        Test that many inserts at the same place respace the index and keep
+        the order.
+        """
+        for idx in range(40):
+            self.index.insert(self.field(f"Field {idx}:"),
+                              before='Locale Name:')
+
+        names = self.index.names
+        found = names.index('Field 39:') < names.index('Locale Name:')
+        msg = "Expected {}, found {}."
+        self.assertTrue(found, msg.format(True, found))
+        found = names.index('Field 0:') < names.index('Field 1:')
+        self.assertTrue(found, msg.format(True, found))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_rename_and_update_keys(self):
+        """
+        Test that renaming works and that `update` key references follow
+        the renumbered keys.
+        """
+        self.index.rename('Treasurer:', 'Secretary:')
+        self.index.remove('Locale Name:')
+        table = self.index.commit()
+        msg = "Expected {}, found {}."
+        self.assertIn('Secretary:', self.rows(table), msg.format(
+            'Secretary:', self.rows(table)))
+        update = find_dict(table['widget_00']).get('update')
+        self.assertEqual('widget_01', update, msg.format('widget_01', update))
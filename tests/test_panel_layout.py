@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+#
+# test/test_panel_layout.py
+#
+__docformat__ = "restructuredtext en"
+
+import unittest
+
+from . import check_flag
+from src.panel_layout import PanelLayout
+
+
+class Panel:
+    """
+    Records the sizing calls made on it.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def SetSize(self, size):
+        self.calls.append(('SetSize', size))
+
+    def SetSizeHints(self, width, height):
+        self.calls.append(('SetSizeHints', (width, height)))
+
+    def Layout(self):
+        self.calls.append(('Layout', None))
+
+
+class TestPanelLayout(unittest.TestCase):
+
+    def __init__(self, name):
+        super().__init__(name)
+
+    def setUp(self):
+        check_flag(self.__class__.__name__)
+        self.timings = []
+        self.layout = PanelLayout(hook=lambda *args: self.timings.append(
+            args))
+        self.panels = {'organization': Panel(), 'budget': Panel(),
+                       'monthly': Panel()}
+
+    #@unittest.skip("Temporarily skipped")
+    def test_resize_active_only(self):
+        """
+        Test that only the active panel is laid out and the others are
+        marked stale.
+        """
+        self.layout.activate('budget', self.panels['budget'])
+        self.layout.resize(self.panels, 500, 700)
+        msg = "Expected {}, found {}."
+        found = self.panels['budget'].calls
+        expected = [('SetSize', (500, 700)), ('SetSizeHints', (500, 700)),
+                    ('Layout', None)]
+        self.assertEqual(expected, found, msg.format(expected, found))
+
+        for name in ('organization', 'monthly'):
+            found = self.panels[name].calls
+            self.assertEqual([], found, msg.format([], found))
+
+        expected = {'organization', 'monthly'}
+        found = self.layout.stale
+        self.assertEqual(expected, found, msg.format(expected, found))
+        found = [name for name, elapsed in self.timings]
+        self.assertEqual(['budget'], found, msg.format(['budget'], found))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_stale_laid_out_once(self):
+        """
+        Test that a stale panel is laid out once when it is shown.
+        """
+        self.layout.resize(self.panels, 500, 700)
+        self.layout.resize(self.panels, 600, 800)
+        panel = self.panels['monthly']
+        self.layout.activate('monthly', panel)
+        self.layout.deactivate()
+        self.layout.activate('monthly', panel)
+        msg = "Expected {}, found {}."
+        found = panel.calls
+        expected = [('SetSize', (600, 800)), ('SetSizeHints', (600, 800)),
+                    ('Layout', None)]
+        self.assertEqual(expected, found, msg.format(expected, found))
+        found = self.layout.active
+        self.assertEqual('monthly', found, msg.format('monthly', found))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_replace(self):
+        """
+        Test that a rebuilt panel is laid out only if it is active.
+        """
+        self.layout.activate('budget', self.panels['budget'])
+        self.layout.resize(self.panels, 500, 700)
+        new = Panel()
+        self.layout.replace('organization', new)
+        msg = "Expected {}, found {}."
+        self.assertEqual([], new.calls, msg.format([], new.calls))
+        self.layout.replace('budget', new)
+        found = len(new.calls)
+        self.assertEqual(3, found, msg.format(3, found))
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+#
+# test/test_profiler.py
+#
+__docformat__ = "restructuredtext en"
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+from . import check_flag
+from src.profiler import StartupProfiler
+
+
+class TestStartupProfiler(unittest.TestCase):
+
+    def __init__(self, name):
+        super().__init__(name)
+
+    def setUp(self):
+        check_flag(self.__class__.__name__)
+        self.tmp_dir = tempfile.mkdtemp()
+        self.profiler = StartupProfiler()
+
+    def tearDown(self):
+        StartupProfiler._enabled = False
+        StartupProfiler._cprofile = None
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    #@unittest.skip("Temporarily skipped")
+    def test_disabled(self):
+        """
+        Test that nothing is recorded when the profiler is not enabled.
+        """
+        with self.profiler.span('nothing'):
+            pass
+
+        path = self.profiler.write_report(self.tmp_dir)
+        msg = "Expected {}, found {}."
+        self.assertEqual([], self.profiler.spans, msg.format(
+            [], self.profiler.spans))
+        self.assertIsNone(path, msg.format(None, path))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_spans(self):
+        """
+        Test that spans are recorded with a context manager and with the
+        start and end methods.
+        """
+        self.profiler.enable()
+
+        with self.profiler.span('phase_1'):
+            pass
+
+        self.profiler.start_span('phase_2')
+        self.profiler.end_span('phase_2')
+        names = [span['name'] for span in StartupProfiler().spans]
+        expected = ['phase_1', 'phase_2']
+        msg = f"Expected {expected}, found {names}."
+        self.assertEqual(expected, names, msg)
+
+    #@unittest.skip("Temporarily skipped")
+    def test_write_report(self):
+        """
+        Test that a JSON report and the cProfile data are written.
+        """
+        self.profiler.enable(cprofile=True)
+
+        with self.profiler.span('phase_1'):
+            pass
+
+        path = self.profiler.write_report(self.tmp_dir)
+        msg = "Expected {}, found {}."
+        self.assertTrue(os.path.isfile(path), msg.format(path, None))
+
+        with open(path) as f:
+            report = json.load(f)
+
+        names = [span['name'] for span in report['spans']]
+        self.assertEqual(['phase_1'], names, msg.format(['phase_1'], names))
+        prof = report['cprofile']
+        self.assertTrue(os.path.isfile(prof), msg.format(prof, None))
+        self.assertFalse(self.profiler.enabled, msg.format(False, True))
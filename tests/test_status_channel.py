@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+#
+# test/test_status_channel.py
+#
+__docformat__ = "restructuredtext en"
+
+import unittest
+
+from . import check_flag
+from src.status_channel import StatusChannel
+
+
+class TestStatusChannel(unittest.TestCase):
+
+    def __init__(self, name):
+        super().__init__(name)
+
+    def setUp(self):
+        check_flag(self.__class__.__name__)
+        self.now = 100.0
+        self.painted = []
+        self.scheduled = []
+        self.channel = StatusChannel(
+            lambda *args: self.painted.append(args),
+            lambda ms, func: self.scheduled.append((ms, func)),
+            clock=lambda: self.now)
+
+    def run_scheduled(self):
+        scheduled, self.scheduled = self.scheduled, []
+
+        for ms, func in scheduled:
+            func()
+
+    #@unittest.skip("Temporarily skipped")
+    def test_single_message(self):
+        """
+        Test that a single message is painted as is.
+        """
+        self.channel.post(StatusChannel.MESSAGE, "Saved.")
+        msg = "Expected {}, found {}."
+        found = len(self.scheduled)
+        self.assertEqual(1, found, msg.format(1, found))
+        self.run_scheduled()
+        expected = [("Saved.", StatusChannel.MESSAGE)]
+        found = self.painted
+        self.assertEqual(expected, found, msg.format(expected, found))
+
+        with self.assertRaises(AssertionError) as cm:
+            self.channel.post('invalid', "Bad.")
+
+    #@unittest.skip("Temporarily skipped")
+    def test_burst_merged(self):
+        """
+        Test that a burst is merged into one summary with the highest
+        severity and only one repaint is scheduled.
+        """
+        for idx in range(12):
+            self.channel.post(StatusChannel.WARNING, f"Warning {idx}")
+
+        self.channel.post(StatusChannel.MESSAGE, "Saved.")
+        self.channel.post(StatusChannel.ERROR, "Error")
+        msg = "Expected {}, found {}."
+        found = len(self.scheduled)
+        self.assertEqual(1, found, msg.format(1, found))
+        self.run_scheduled()
+        expected = [("1 error, 12 warnings, see log", StatusChannel.ERROR)]
+        found = self.painted
+        self.assertEqual(expected, found, msg.format(expected, found))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_rate_limited(self):
+        """
+        Test that the next repaint waits for the rest of the interval.
+        """
+        self.channel.post(StatusChannel.MESSAGE, "One")
+        self.run_scheduled()
+        self.now += 0.1
+        self.channel.post(StatusChannel.MESSAGE, "Two")
+        msg = "Expected {}, found {}."
+        found = self.scheduled[0][0]
+        self.assertEqual(150, found, msg.format(150, found))
+        self.run_scheduled()
+        self.now += 1
+        self.channel.post(StatusChannel.MESSAGE, "Three")
+        found = self.scheduled[0][0]
+        self.assertEqual(0, found, msg.format(0, found))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_fields(self):
+        """
+        Test that the persistent fields make the idle text.
+        """
+        self.channel.add_field('year', "2024-2025")
+        self.channel.add_field('month', "March")
+        msg = "Expected {}, found {}."
+        expected = "2024-2025 | March"
+        found = self.channel.idle_text
+        self.assertEqual(expected, found, msg.format(expected, found))
+        self.channel.remove_field('year')
+        self.channel.remove_field('invalid')
+        found = self.channel.fields
+        expected = {'month': "March"}
+        self.assertEqual(expected, found, msg.format(expected, found))
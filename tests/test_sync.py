@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+#
+# test/test_sync.py
+#
+__docformat__ = "restructuredtext en"
+
+import io
+import os
+import shutil
+import asyncio
+import sqlite3
+import tempfile
+import unittest
+
+from . import check_flag
+from src.core.bahai_database import Database
+from src.core.sync import SyncManager
+from scripts.synthetic_data import SyntheticData
+
+
+class TestSyncManager(unittest.TestCase):
+
+    def __init__(self, name):
+        super().__init__(name)
+
+    def setUp(self):
+        check_flag(self.__class__.__name__)
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db = Database()
+        self.path_a = os.path.join(self.tmp_dir, 'books-a.sqlite3')
+        self.path_b = os.path.join(self.tmp_dir, 'books-b.sqlite3')
+        self.db.data_path = self.path_a
+        SyntheticData(1).build(self.db)
+        shutil.copyfile(self.path_a, self.path_b)
+        self.use(self.path_b)
+        self.sm = SyncManager(self.db)
+        asyncio.run(self.sm.new_site())
+
+    def tearDown(self):
+        self.db.data_path = None
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def use(self, path):
+        self.db.data_path = path
+
+    def edit(self, path, pk, value, m_time):
+        with sqlite3.connect(path) as con:
+            con.execute(f"UPDATE {self.db._T_DATA} SET value = ?, m_time = ? "
+                        "WHERE pk = ?;", (value, m_time, pk))
+
+    def insert(self, path, field, value, m_time):
+        db = self.db
+
+        with sqlite3.connect(path) as con:
+            con.execute(f"INSERT OR IGNORE INTO {db._T_FIELD_TYPE} (field, "
+                        "c_time, m_time) VALUES (?, ?, ?);",
+                        (field, m_time, m_time))
+            con.execute(
+                f"INSERT INTO {db._T_DATA} (value, fy1fk, fy2fk, mfk, ffk, "
+                "c_time, m_time) SELECT ?, y.pk, y.pk, m.pk, f.pk, ?, ? "
+                f"FROM {db._T_FISCAL_YEAR} AS y, {db._T_MONTH} AS m, "
+                f"{db._T_FIELD_TYPE} AS f WHERE y.year = (SELECT MIN(year) "
+                f"FROM {db._T_FISCAL_YEAR}) AND m.ord = 1 AND f.field = ?;",
+                (value, m_time, m_time, field))
+
+    def values(self, path, field):
+        db = self.db
+
+        with sqlite3.connect(path) as con:
+            return con.execute(
+                f"SELECT d.value FROM {db._T_DATA} AS d JOIN "
+                f"{db._T_FIELD_TYPE} AS f ON f.pk = d.ffk "
+                "WHERE f.field = ?;", (field,)).fetchall()
+
+    def value(self, path, pk):
+        with sqlite3.connect(path) as con:
+            return con.execute(f"SELECT value FROM {self.db._T_DATA} "
+                               "WHERE pk = ?;", (pk,)).fetchone()[0]
+
+    def sync(self, src, dst, peer='default'):
+        out = io.StringIO()
+        self.use(src)
+        count = asyncio.run(self.sm.export(out, peer))
+        self.use(dst)
+        out.seek(0)
+        return count, asyncio.run(self.sm.apply(out))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_sites(self):
+        """
+        Test that a file copy given a new site id has its own site.
+        """
+        self.use(self.path_a)
+        site_a = asyncio.run(self.sm.site())
+        self.use(self.path_b)
+        site_b = asyncio.run(self.sm.site())
+        msg = "Expected {}, found {}."
+        self.assertEqual(32, len(site_a), msg.format(32, len(site_a)))
+        self.assertNotEqual(site_a, site_b, msg.format('new site', site_b))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_export_apply(self):
+        """
+        Test that an edit on one copy is applied to the other and only new
+        changes are sent the next time.
+        """
+        self.edit(self.path_a, 1, 'abc', '2099-01-01T00:00:00')
+        count, counts = self.sync(self.path_a, self.path_b)
+        msg = "Expected {}, found {}."
+        self.assertEqual(count, sum(counts.values()),
+                         msg.format(count, counts))
+        found = self.value(self.path_b, 1)
+        self.assertEqual('abc', found, msg.format('abc', found))
+        self.edit(self.path_a, 2, 'def', '2099-01-01T00:00:00')
+        count, counts = self.sync(self.path_a, self.path_b)
+        self.assertEqual(1, count, msg.format(1, count))
+        expected = {'inserted': 0, 'updated': 1, 'skipped': 0}
+        self.assertEqual(expected, counts, msg.format(expected, counts))
+        found = self.value(self.path_b, 2)
+        self.assertEqual('def', found, msg.format('def', found))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_new_rows(self):
+        """
+        Test that a new year and its values are inserted on the other copy.
+        """
+        self.use(self.path_a)
+        years = asyncio.run(self.db.select_from_fiscal_year_table())
+        year = max(row[1] for row in years) + 1
+        asyncio.run(self.db.insert_into_fiscal_year_table(
+            [(year, 1, 1, 0, 0, 0)]))
+        count, counts = self.sync(self.path_a, self.path_b)
+        msg = "Expected {}, found {}."
+        self.assertEqual(1, counts['inserted'], msg.format(1, counts))
+        found = asyncio.run(self.db.select_from_fiscal_year_table(year=year))
+        self.assertEqual(1, len(found), msg.format(1, found))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_conflict(self):
+        """
+        Test that both copies keep the same value when both changed it.
+        """
+        self.edit(self.path_a, 1, 'old', '2099-01-01T00:00:00')
+        self.edit(self.path_b, 1, 'new', '2099-01-02T00:00:00')
+        changes = io.StringIO()
+        self.use(self.path_b)
+        asyncio.run(self.sm.export(changes))
+        self.sync(self.path_a, self.path_b)
+        changes.seek(0)
+        self.use(self.path_a)
+        asyncio.run(self.sm.apply(changes))
+        msg = "Expected {}, found {}."
+
+        for path in (self.path_a, self.path_b):
+            found = self.value(path, 1)
+            self.assertEqual('new', found, msg.format('new', found))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_same_key(self):
+        """
+        Test that a value entered on both copies stays one value and both
+        copies keep the newer one.
+        """
+        self.insert(self.path_a, 'new_field', '100', '2099-01-02T00:00:00')
+        self.insert(self.path_b, 'new_field', '200', '2099-01-01T00:00:00')
+        changes = io.StringIO()
+        self.use(self.path_b)
+        asyncio.run(self.sm.export(changes))
+        count, counts = self.sync(self.path_a, self.path_b)
+        msg = "Expected {}, found {}."
+        self.assertEqual(0, counts['inserted'], msg.format(0, counts))
+        changes.seek(0)
+        self.use(self.path_a)
+        counts = asyncio.run(self.sm.apply(changes))
+        self.assertEqual(0, counts['inserted'], msg.format(0, counts))
+
+        for path in (self.path_a, self.path_b):
+            found = self.values(path, 'new_field')
+            self.assertEqual([('100',)], found, msg.format([('100',)], found))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_same_site(self):
+        """
+        Test that a changeset is not applied to the copy that made it.
+        """
+        out = io.StringIO()
+        asyncio.run(self.sm.export(out))
+        out.seek(0)
+
+        with self.assertRaises(AssertionError) as cm:
+            asyncio.run(self.sm.apply(out))
+
+        self.assertIn('site', str(cm.exception))
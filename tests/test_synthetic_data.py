@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+#
+# test/test_synthetic_data.py
+#
+__docformat__ = "restructuredtext en"
+
+import asyncio
+import unittest
+
+from . import check_flag
+from src.config import Settings
+from src.bahai_database import Database
+from scripts.synthetic_data import SyntheticData
+from scripts.bench_database import compare
+
+
+class TestSyntheticData(unittest.TestCase):
+
+    def __init__(self, name):
+        super().__init__(name)
+
+    def setUp(self):
+        check_flag(self.__class__.__name__)
+        self.db = Database()
+        self.db.data_backend = Settings.BACKEND_MEMORY
+        self._mf = self.db._mf
+
+    def tearDown(self):
+        for name in ('test-synthetic-0', 'test-synthetic-1'):
+            self.db.data_name = name
+            self.db.close_memory_db()
+
+        self.db.data_backend = Settings.BACKEND_FILE
+        self.db.data_name = None
+        self.db._mf = self._mf
+
+    def build(self, name, years, seed=0):
+        self.db.data_name = name
+        sd = SyntheticData(years, seed=seed)
+        sd.build(self.db)
+        return sd
+
+    def dump(self):
+        return asyncio.run(self.db._do_select_query(
+            "SELECT * FROM config_data ORDER BY pk;"))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_build(self):
+        """
+        Test that the database has all the years, months, and fields.
+        """
+        sd = self.build('test-synthetic-0', 2)
+        msg = "Expected {}, found {}."
+        found = len(asyncio.run(self.db.select_from_fiscal_year_table()))
+        self.assertEqual(3, found, msg.format(3, found))
+        found = len(self.dump())
+        expected = 2 * SyntheticData.MONTHS * len(sd.fields)
+        self.assertEqual(expected, found, msg.format(expected, found))
+        found = asyncio.run(self.db._get_current_fiscal_year())[0]
+        self.assertEqual(sd.current_year, found,
+                         msg.format(sd.current_year, found))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_deterministic(self):
+        """
+        Test that the same seed gives the same data.
+        """
+        self.build('test-synthetic-0', 1)
+        data0 = self.dump()
+        self.build('test-synthetic-1', 1)
+        data1 = self.dump()
+        msg = "Expected the same data for the same seed."
+        self.assertEqual(data0, data1, msg)
+        self.db.close_memory_db()
+        self.build('test-synthetic-1', 1, seed=1)
+        data1 = self.dump()
+        msg = "Expected different data for a different seed."
+        self.assertNotEqual(data0, data1, msg)
+
+    #@unittest.skip("Temporarily skipped")
+    def test_save_to_database(self):
+        """
+        Test that the synthetic panel can be saved and populated.
+        """
+        sd = self.build('test-synthetic-0', 1)
+        self.db._mf = sd.make_frame()
+        panel = self.db._mf.panels[sd.PANEL]
+        name = sd.field_names[0]
+        panel.set_values({name: '12.34'})
+        error = asyncio.run(self.db.save_to_database(sd.PANEL, panel))
+        msg = "Expected {}, found {}."
+        self.assertIsNone(error, msg.format(None, error))
+        rows = asyncio.run(self.db.select_from_config_data_table(
+            {name: None}, sd.current_year))
+        found = rows[-1][2]
+        self.assertEqual('1234', found, msg.format('1234', found))
+
+    #@unittest.skip("Temporarily skipped")
+    def test_compare(self):
+        """
+        Test that a slow down over the factor is flagged.
+        """
+        old = {'results': {'a': {'1': {'min': 1.0}, '10': {'min': 2.0}},
+                           'b': {'1': {'min': 1.0}}}}
+        new = {'results': {'a': {'1': {'min': 1.1}, '10': {'min': 3.0}},
+                           'c': {'1': {'min': 1.0}}}}
+        found = [(item[0], item[1], item[-1])
+                 for item in compare(old, new, 1.2)]
+        expected = [('a', '1', False), ('a', '10', True)]
+        msg = f"Expected {expected}, found {found}."
+        self.assertEqual(expected, found, msg)
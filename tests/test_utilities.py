@@ -293,6 +293,113 @@ class TestGridBagSizer(BaseTests):
             self.assertEqual(expected_color, found_color, msg)
 
 
+class TestGridBagSizerRows(unittest.TestCase):
+    """
+    Test the batched row methods of the GridBagSizer. Each test starts
+    with five rows of two widgets labeled 'Widget <row>.<col>'.
+    """
+
+    def __init__(self, name):
+        super().__init__(name)
+
+    def setUp(self):
+        check_flag(self.__class__.__name__)
+        self.app = wx.GetApp() or wx.App()
+        self.frame = wx.Frame(None)
+        self.gbs = GridBagSizer()
+        self.frame.SetSizer(self.gbs)
+
+        for row in range(5):
+            for col in range(2):
+                widget = EventStaticText(self.frame, wx.ID_ANY,
+                                         f"Widget {row}.{col}", style=0)
+                self.gbs.Add(widget, (row, col), (1, 1), wx.ALL, 6)
+
+    def tearDown(self):
+        self.frame.Destroy()
+
+    def row_labels(self):
+        rows = {}
+
+        for item in self.gbs.GetChildren():
+            row, col = item.GetPos()
+            rows.setdefault(row, []).append(
+                (col, item.GetWindow().GetLabel()))
+
+        return [[label for col, label in sorted(rows[row])]
+                for row in sorted(rows)]
+
+    def firsts(self):
+        return [labels[0].split()[1][0] for labels in self.row_labels()]
+
+    #@unittest.skip("Temporarily skipped")
+    def test_move_row(self):
+        """
+        Test that a row moves and the rows in between shift by one.
+        """
+        self.gbs.move_row(0, 3)
+        expected = ['1', '2', '3', '0', '4']
+        found = self.firsts()
+        msg = f"Expected {expected}, found {found}."
+        self.assertEqual(expected, found, msg)
+        self.gbs.move_row(3, 0)
+        expected = ['0', '1', '2', '3', '4']
+        found = self.firsts()
+        msg = f"Expected {expected}, found {found}."
+        self.assertEqual(expected, found, msg)
+        # The columns stay together.
+        found = self.row_labels()[0]
+        expected = ['Widget 0.0', 'Widget 0.1']
+        msg = f"Expected {expected}, found {found}."
+        self.assertEqual(expected, found, msg)
+
+    #@unittest.skip("Temporarily skipped")
+    def test_remove_row(self):
+        """
+        Test that a row is removed and the rows after it move up.
+        """
+        windows = self.gbs.remove_row(1, destroy=False)
+        expected = ['0', '2', '3', '4']
+        found = self.firsts()
+        msg = f"Expected {expected}, found {found}."
+        self.assertEqual(expected, found, msg)
+        msg = f"Expected 2 windows, found {len(windows)}."
+        self.assertEqual(2, len(windows), msg)
+        [w.Destroy() for w in windows]
+        self.gbs.remove_row(0)
+        found = self.gbs.row_count
+        msg = f"Expected 3 rows, found {found}."
+        self.assertEqual(3, found, msg)
+
+    #@unittest.skip("Temporarily skipped")
+    def test_insert_row(self):
+        """
+        Test that an empty row is made.
+        """
+        self.gbs.insert_row(2)
+        found = self.gbs.FindItemAtPosition((2, 0))
+        msg = f"Expected None, found {found}."
+        self.assertIsNone(found, msg)
+        found = self.gbs.row_count
+        msg = f"Expected 6 rows, found {found}."
+        self.assertEqual(6, found, msg)
+        label = self.gbs.FindItemAtPosition((3, 0)).GetWindow().GetLabel()
+        msg = f"Expected 'Widget 2.0', found {label}."
+        self.assertEqual('Widget 2.0', label, msg)
+
+    #@unittest.skip("Temporarily skipped")
+    def test_move_rows_invalid(self):
+        """
+        Test that moving a row onto a row that is not moving fails.
+        """
+        msg = "The rows [2] are not empty."
+
+        with self.assertRaises(AssertionError) as cm:
+            self.gbs.move_rows({0: 2})
+
+        self.assertEqual(msg, str(cm.exception))
+
+
 class TestConfirmationDialog(unittest.TestCase):
 
     def __init__(self, name):